@@ -1,32 +1,378 @@
 #!/usr/bin/env python3
-from textual import on
-from textual.app import App, ComposeResult
-from textual.containers import Horizontal, Vertical, Container
-from textual.widgets import Header, Footer, Static, Button, Label, Input, TabbedContent
-from license_manager.widgets.signing_authority import SigningAuthorityPane
-from license_manager.widgets.license_table import LicenseTablePane
 from license_manager.utils.app_context import AppContext
+import argparse
+import os
+import sys
+import time
 
-class RightHandLicenseManager(App):
-    
-    CSS_PATH = "style.tcss"
+def issue(args: argparse.Namespace) -> int:
+    from license_manager.utils.issue import issue_licenses, read_records, IssueStats
+    from license_manager.utils.license_db import LicenseDB
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.ctx = AppContext("rhlm")
+    ctx = AppContext("rhlm")
+    db_path = args.db or ctx["license_db"]
+    keys = _signing_keys("issue", args, ctx)
+    if not db_path or not keys:
+        print("rhlm issue: a license database (--db) and signing key (--key) are required", file=sys.stderr)
+        return 2
+    signing_key, product_keys = keys
 
-    def compose(self) -> ComposeResult:
-        yield Header(show_clock=True)
-        with TabbedContent():
-            yield LicenseTablePane(title="Licenses")
-            yield SigningAuthorityPane(title="Signing Authority")
-        yield Footer()
+    fmt = args.format
+    if fmt is None:
+        fmt = "jsonl" if args.input.lower().endswith((".jsonl", ".ndjson")) else "csv"
 
-    def on_mount(self) -> None:
-        self.title = "RightHand License Manager"
+    def progress(stats: IssueStats) -> None:
+        print(f"\rissued {stats.issued} licenses ({stats.rate:.0f} licenses/sec)", end="", file=sys.stderr, flush=True)
 
-def main():
-    RightHandLicenseManager().run()
+    db = LicenseDB(db_path)
+    stream = sys.stdin if args.input == "-" else open(args.input, "r", newline="")
+    try:
+        stats = issue_licenses(read_records(stream, fmt), db, signing_key, jobs=args.jobs, chunk_size=args.chunk_size, progress=progress,
+                               product_keys=product_keys)
+    finally:
+        if stream is not sys.stdin: stream.close()
+        db.close()
+
+    print(f"\rissued {stats.issued} licenses in {stats.elapsed:.2f}s ({stats.rate:.0f} licenses/sec), skipped {stats.skipped} without hwid", file=sys.stderr)
+    return 0
+
+def _signing_keys(command: str, args: argparse.Namespace, ctx: AppContext) -> tuple[str, dict[str, str]]|None:
+    """The default signing key and the signing key of each product, None without a default key."""
+    key_file = args.key or ctx["last_key"]
+    if not key_file: return None
+    with open(key_file, "r") as f:
+        signing_key = f.read().strip()
+    # products keep the keys the UI's keyring assigned them unless given on the command line
+    product_key_files = {product: entry["file"] for entry in ctx["keyring"] or [] for product in entry["products"]}
+    for assignment in args.product_key:
+        product, _, product_key_file = assignment.partition("=")
+        if not product_key_file:
+            print(f"rhlm {command}: --product-key expects PRODUCT=KEYFILE, got {assignment!r}", file=sys.stderr)
+            sys.exit(2)
+        product_key_files[product] = product_key_file
+    product_keys = {}
+    for product, product_key_file in product_key_files.items():
+        with open(product_key_file, "r") as f:
+            product_keys[product] = f.read().strip()
+    return signing_key, product_keys
+
+def serve(args: argparse.Namespace) -> int:
+    from license_manager.utils.keyring import Keyring
+    from license_manager.utils.service import LicenseService
+    import asyncio
+    import signal
+
+    ctx = AppContext("rhlm")
+    db_path = args.db or ctx["license_db"]
+    keys = _signing_keys("serve", args, ctx)
+    if not db_path or not keys:
+        print("rhlm serve: a license database (--db) and signing key (--key) are required", file=sys.stderr)
+        return 2
+    service = LicenseService(db_path, Keyring.from_keys(*keys), readers=args.readers)
+
+    async def run() -> None:
+        server = await service.start(args.host, args.port, args.socket)
+        where = args.socket or ", ".join(f"http://{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+        print(f"serving licenses from {db_path} on {where}", file=sys.stderr)
+        stopped = asyncio.Event()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopped.set)
+        except NotImplementedError:
+            pass  # Windows, Ctrl+C still stops the server
+        try:
+            await stopped.wait()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def expiring(args: argparse.Namespace) -> int:
+    from license_manager.utils.license_db import LicenseDB
+    from license_manager.utils.renew import expiry_window
+
+    db_path = args.db or AppContext("rhlm")["license_db"]
+    if not db_path:
+        print("rhlm expiring: a license database (--db) is required", file=sys.stderr)
+        return 2
+    since, until = expiry_window(args.within, args.today)
+    columns = {column: index for index, column in enumerate(LicenseDB.DISPLAY_COLUMNS)}
+    db = LicenseDB(db_path)
+    try:
+        after = None
+        while rows := db.expiring_licenses(since, until, after, 5000):
+            for row in rows:
+                print("\t".join(str(row[columns[column]]) for column in ("id", "expires_at", "hwid", "customer", "product")))
+            after = (rows[-1][columns["expires_at"]], rows[-1][0])
+        count = db.count_expiring(since, until)
+    finally:
+        db.close()
+    print(f"{count} licenses expire by {until}", file=sys.stderr)
+    return 0
+
+def features(args: argparse.Namespace) -> int:
+    from license_manager.utils.license_db import LicenseDB
+
+    db_path = args.db or AppContext("rhlm")["license_db"]
+    if not db_path:
+        print("rhlm features: a license database (--db) is required", file=sys.stderr)
+        return 2
+    columns = {column: index for index, column in enumerate(LicenseDB.DISPLAY_COLUMNS)}
+    db = LicenseDB(db_path)
+    try:
+        if args.feature is None:
+            counts = db.feature_counts() or []
+            for feature, count in counts:
+                print(f"{feature}\t{count}")
+            print(f"{len(counts)} features", file=sys.stderr)
+            return 0
+        after = None
+        while rows := db.licenses_with_feature(args.feature, after, 5000):
+            for row in rows:
+                print("\t".join(str(row[columns[column]]) for column in ("id", "customer", "product", "hwid", "expires_at")))
+            after = rows[-1][0]
+        count = db.count_feature(args.feature)
+    finally:
+        db.close()
+    print(f"{count} licenses with {args.feature}", file=sys.stderr)
+    return 0
+
+def lookup(args: argparse.Namespace) -> int:
+    from license_manager.utils.federation import FederatedLicenseDB
+    from license_manager.utils.license_db import LicenseDB
+    import sqlite3
+
+    ctx = AppContext("rhlm")
+    db_paths = args.db or ctx["federated_dbs"] or ([ctx["license_db"]] if ctx["license_db"] else [])
+    if not db_paths:
+        print("rhlm lookup: at least one license database (--db) is required", file=sys.stderr)
+        return 2
+    # rows start with their source, the display columns follow
+    columns = {column: index + 1 for index, column in enumerate(LicenseDB.DISPLAY_COLUMNS)}
+    try:
+        federated = FederatedLicenseDB(db_paths)
+    except (sqlite3.Error, RuntimeError, OSError, ValueError) as e:
+        print(f"rhlm lookup: {e}", file=sys.stderr)
+        return 1
+    try:
+        rows = federated.find_licenses(args.hwid) or []
+    finally:
+        federated.close()
+    for row in rows:
+        print("\t".join([row[0], *(str(row[columns[column]]) for column in ("id", "hwid", "customer", "product", "expires_at"))]))
+    print(f"{len(rows)} licenses for {args.hwid} in {len(db_paths)} databases", file=sys.stderr)
+    return 0
+
+def renew(args: argparse.Namespace) -> int:
+    from license_manager.utils.keyring import Keyring
+    from license_manager.utils.license_db import LicenseDB
+    from license_manager.utils.renew import RenewStats, expiring_ids, expiry_window, renew_licenses
+
+    ctx = AppContext("rhlm")
+    db_path = args.db or ctx["license_db"]
+    keys = _signing_keys("renew", args, ctx)
+    if not db_path or not keys:
+        print("rhlm renew: a license database (--db) and signing key (--key) are required", file=sys.stderr)
+        return 2
+    if (args.days is None) == (args.until is None):
+        print("rhlm renew: give either --days or --until", file=sys.stderr)
+        return 2
+
+    db = LicenseDB(db_path)
+    try:
+        ids = args.id or expiring_ids(db, *expiry_window(args.within, args.today))
+    finally:
+        db.close()
+
+    def progress(stats: RenewStats) -> None:
+        print(f"\rrenewed {stats.renewed}/{stats.total} licenses", end="", file=sys.stderr, flush=True)
+
+    stats = renew_licenses(db_path, Keyring.from_keys(*keys), ids, expires_at=args.until, extend_days=args.days, today=args.today,
+                           export_to=args.export, chunk_size=args.chunk_size, progress=progress)
+    exported = f", exported {stats.exported} to {args.export}" if args.export else ""
+    print(f"\rrenewed {stats.renewed} of {stats.total} licenses in {stats.elapsed:.2f}s{exported}, "
+          f"skipped {stats.skipped} without a key or a valid expiry date", file=sys.stderr)
+    return 0
+
+def audit(args: argparse.Namespace) -> int:
+    from license_manager.utils.audit import audit_licenses, AuditReport
+    from license_manager.utils.signing import SigningAuthority
+
+    ctx = AppContext("rhlm")
+    db_path = args.db or ctx["license_db"]
+    verify_key = args.verify_key
+    if verify_key is None and (key_file := args.key or ctx["last_key"]):
+        verify_key = SigningAuthority(signing_key_file=key_file).get_verification_key()
+    if not db_path or not verify_key:
+        print("rhlm audit: a license database (--db) and a key (--key or --verify-key) are required", file=sys.stderr)
+        return 2
+    keyring_keys = args.keyring_key
+    if not keyring_keys:
+        keyring_keys = [SigningAuthority(signing_key_file=entry["file"]).get_verification_key() for entry in ctx["keyring"] or []]
+
+    def progress(report: AuditReport) -> None:
+        print(f"\rchecked {report.checked}/{report.total} licenses, {report.flagged} flagged", end="", file=sys.stderr, flush=True)
+
+    report = audit_licenses(db_path, verify_key, args.foreign_key, jobs=args.jobs, batch_size=args.batch_size,
+                            max_findings=args.max_findings, progress=progress, keyring_keys=keyring_keys)
+    for finding in report.findings:
+        print(f"{finding.id}\t{finding.status}\t{finding.hwid}")
+
+    counts = ", ".join(f"{count} {status}" for status, count in sorted(report.counts.items()))
+    print(f"\rchecked {report.checked} licenses in {report.elapsed:.2f}s: {counts or 'nothing to audit'}", file=sys.stderr)
+    return 1 if report.flagged else 0
+
+def verify(args: argparse.Namespace) -> int:
+    from license_manager.utils.verify import LicenseVerifier, VerifyReport
+    from license_manager.utils.signing import SigningAuthority
+
+    ctx = AppContext("rhlm")
+    verify_keys = list(args.verify_key)
+    if not verify_keys and (key_file := args.key or ctx["last_key"]):
+        verify_keys.append(SigningAuthority(signing_key_file=key_file).get_verification_key())
+        verify_keys += [SigningAuthority(signing_key_file=entry["file"]).get_verification_key() for entry in ctx["keyring"] or []]
+    if not verify_keys:
+        print("rhlm verify: a key (--key or --verify-key) is required", file=sys.stderr)
+        return 2
+    cache_file = None
+    if not args.no_cache:
+        from platformdirs import user_cache_dir
+        cache_file = args.cache or os.path.join(user_cache_dir("rhlm"), "verify_cache.json")
+
+    def progress(report: VerifyReport) -> None:
+        print(f"\rchecked {report.checked} license files, {report.flagged} flagged", end="", file=sys.stderr, flush=True)
+
+    verifier = LicenseVerifier(verify_keys, args.foreign_key, cache_file=cache_file)
+    report = verifier.scan(args.paths, hwid=args.hwid, today=args.today, jobs=args.jobs, max_findings=args.max_findings, progress=progress)
+    for finding in report.findings:
+        print(f"{finding.path}\t{finding.status}\t{finding.hwid}")
+
+    counts = ", ".join(f"{count} {status}" for status, count in sorted(report.counts.items()))
+    print(f"\rchecked {report.checked} license files in {report.elapsed:.2f}s ({report.cached} cached): {counts or 'nothing to verify'}",
+          file=sys.stderr)
+    return 1 if report.flagged else 0
+
+def import_(args: argparse.Namespace) -> int:
+    from license_manager.utils.license_io import import_licenses, ImportStats
+
+    db_path = args.db or AppContext("rhlm")["license_db"]
+    if not db_path:
+        print("rhlm import: a license database (--db) is required", file=sys.stderr)
+        return 2
+
+    def progress(stats: ImportStats) -> None:
+        print(f"\rread {stats.read} licenses, imported {stats.imported}", end="", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    stats = import_licenses(db_path, args.paths, batch_size=args.batch_size, progress=progress)
+    elapsed = time.perf_counter() - start
+    print(f"\rimported {stats.imported} of {stats.read} licenses in {elapsed:.2f}s, "
+          f"skipped {stats.duplicates} duplicates and {stats.invalid} invalid", file=sys.stderr)
+    return 0
+
+def main(argv: list[str]|None = None):
+    parser = argparse.ArgumentParser(prog="rhlm", description="RightHand License Manager")
+    parser.add_argument("--timing-log", help="append the timing of every database query, signature and UI update to this JSONL file")
+    parser.add_argument("--fsync", action="store_true", help="flush the UI state to disk on every save, for machines that may lose power")
+    commands = parser.add_subparsers(dest="command")
+
+    issue_parser = commands.add_parser("issue", help="sign and store licenses from a CSV or JSONL file without the UI")
+    issue_parser.add_argument("input", help="CSV file with a header row or JSONL file, '-' for stdin")
+    issue_parser.add_argument("--format", choices=("csv", "jsonl"), help="input format (default: from the file extension)")
+    issue_parser.add_argument("--db", help="license database (default: the one last opened in the UI)")
+    issue_parser.add_argument("--key", help="signing key file (default: the one last opened in the UI)")
+    issue_parser.add_argument("--product-key", action="append", default=[], metavar="PRODUCT=KEYFILE",
+                              help="sign PRODUCT with the key in KEYFILE instead, can be repeated (default: the UI's keyring assignments)")
+    issue_parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="signing processes")
+    issue_parser.add_argument("--chunk-size", type=int, default=1000, help="licenses per transaction")
+    issue_parser.set_defaults(handler=issue)
+
+    serve_parser = commands.add_parser("serve", help="serve sign, verify, lookup and list requests over HTTP for build pipelines")
+    serve_parser.add_argument("--db", help="license database (default: the one last opened in the UI)")
+    serve_parser.add_argument("--key", help="default signing key file (default: the one last opened in the UI)")
+    serve_parser.add_argument("--product-key", action="append", default=[], metavar="PRODUCT=KEYFILE",
+                              help="sign PRODUCT with the key in KEYFILE instead, can be repeated (default: the UI's keyring assignments)")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    serve_parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    serve_parser.add_argument("--socket", help="listen on this Unix socket instead of TCP")
+    serve_parser.add_argument("--readers", type=int, default=4, help="threads with a read connection each")
+    serve_parser.set_defaults(handler=serve)
+
+    expiring_parser = commands.add_parser("expiring", help="list the licenses expiring within a number of days, soonest first")
+    expiring_parser.add_argument("--db", help="license database (default: the one last opened in the UI)")
+    expiring_parser.add_argument("--within", type=int, default=30, help="days from today")
+    expiring_parser.add_argument("--today", help="count the days from this YYYY-MM-DD date instead")
+    expiring_parser.set_defaults(handler=expiring)
+
+    features_parser = commands.add_parser("features", help="count the licenses of every feature, or list the licenses with one")
+    features_parser.add_argument("feature", nargs="?", help="list the licenses with this feature instead")
+    features_parser.add_argument("--db", help="license database (default: the one last opened in the UI)")
+    features_parser.set_defaults(handler=features)
+
+    lookup_parser = commands.add_parser("lookup", help="find the licenses of a hardware id across several license databases")
+    lookup_parser.add_argument("hwid", help="hardware id to look up")
+    lookup_parser.add_argument("--db", action="append", default=[],
+                               help="license database to search, can be repeated (default: the UI's federated databases or its license database)")
+    lookup_parser.set_defaults(handler=lookup)
+
+    renew_parser = commands.add_parser("renew", help="re-sign expiring licenses with a later expiry date, optionally exporting them")
+    renew_parser.add_argument("--db", help="license database (default: the one last opened in the UI)")
+    renew_parser.add_argument("--key", help="default signing key file (default: the one last opened in the UI)")
+    renew_parser.add_argument("--product-key", action="append", default=[], metavar="PRODUCT=KEYFILE",
+                              help="sign PRODUCT with the key in KEYFILE instead, can be repeated (default: the UI's keyring assignments)")
+    renew_parser.add_argument("--within", type=int, default=30, help="renew the licenses expiring within this many days")
+    renew_parser.add_argument("--id", type=int, action="append", default=[], help="renew this license instead, can be repeated")
+    renew_parser.add_argument("--days", type=int, help="push each expiry date out by this many days")
+    renew_parser.add_argument("--until", help="new YYYY-MM-DD expiry date of every renewed license")
+    renew_parser.add_argument("--today", help="count the days from this YYYY-MM-DD date instead")
+    renew_parser.add_argument("--export", help="also write the renewed .lic files to this folder")
+    renew_parser.add_argument("--chunk-size", type=int, default=500, help="licenses per transaction")
+    renew_parser.set_defaults(handler=renew)
+
+    audit_parser = commands.add_parser("audit", help="verify every stored license signature and list the flagged ones")
+    audit_parser.add_argument("--db", help="license database (default: the one last opened in the UI)")
+    audit_parser.add_argument("--key", help="signing key file to audit against (default: the one last opened in the UI)")
+    audit_parser.add_argument("--verify-key", help="verification key to audit against instead of a signing key file")
+    audit_parser.add_argument("--keyring-key", action="append", default=[],
+                              help="verification key whose licenses are valid too, can be repeated (default: the keys in the UI's keyring)")
+    audit_parser.add_argument("--foreign-key", action="append", default=[], help="other verification key to recognise, can be repeated")
+    audit_parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="verification processes")
+    audit_parser.add_argument("--batch-size", type=int, default=2000, help="licenses read and verified per batch")
+    audit_parser.add_argument("--max-findings", type=int, default=10000, help="flagged licenses to list, the rest are only counted")
+    audit_parser.set_defaults(handler=audit)
+
+    verify_parser = commands.add_parser("verify", help="verify exported .lic files offline, one file or whole directory trees")
+    verify_parser.add_argument("paths", nargs="+", help=".lic files or directories to scan recursively")
+    verify_parser.add_argument("--key", help="signing key file to verify against (default: the one last opened in the UI and its keyring)")
+    verify_parser.add_argument("--verify-key", action="append", default=[], help="verification key to verify against instead, can be repeated")
+    verify_parser.add_argument("--foreign-key", action="append", default=[], help="other verification key to recognise, can be repeated")
+    verify_parser.add_argument("--hwid", help="flag licenses issued for any other hardware id")
+    verify_parser.add_argument("--today", help="check expiry as of this YYYY-MM-DD date (default: today)")
+    verify_parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="verification processes")
+    verify_parser.add_argument("--max-findings", type=int, default=10000, help="flagged files to list, the rest are only counted")
+    verify_parser.add_argument("--cache", help="verdict cache file (default: verify_cache.json in the user cache folder)")
+    verify_parser.add_argument("--no-cache", action="store_true", help="verify every file again and don't keep a cache")
+    verify_parser.set_defaults(handler=verify)
+
+    import_parser = commands.add_parser("import", help="import .lic files, JSONL files or zip archives of either")
+    import_parser.add_argument("paths", nargs="+", help="files or directories to import, directories are walked recursively")
+    import_parser.add_argument("--db", help="license database (default: the one last opened in the UI)")
+    import_parser.add_argument("--batch-size", type=int, default=5000, help="licenses per transaction")
+    import_parser.set_defaults(handler=import_)
+
+    args = parser.parse_args(argv)
+    if args.timing_log:
+        from license_manager.utils.instrumentation import instrumentation
+        instrumentation.stream_to(args.timing_log)
+    if args.command is None:
+        # textual is only imported for the UI, the subcommands start without it
+        from license_manager.app import RightHandLicenseManager
+        RightHandLicenseManager(fsync=args.fsync).run()
+    else:
+        sys.exit(args.handler(args))
 
 if __name__ == "__main__":
     main()
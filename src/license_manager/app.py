@@ -0,0 +1,32 @@
+from textual.app import App, ComposeResult
+from textual.widgets import Header, Footer, TabbedContent
+from license_manager.widgets.signing_authority import SigningAuthorityPane
+from license_manager.widgets.license_table import LicenseTablePane
+from license_manager.widgets.expiring import ExpiringPane
+from license_manager.widgets.federated import FederatedPane
+from license_manager.widgets.performance import PerformancePane
+from license_manager.utils.app_context import AppContext
+
+class RightHandLicenseManager(App):
+
+    CSS_PATH = "style.tcss"
+
+    def __init__(self, fsync: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.ctx = AppContext("rhlm", fsync=fsync)
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)
+        with TabbedContent():
+            yield LicenseTablePane(title="Licenses")
+            yield ExpiringPane(title="Expiring")
+            yield FederatedPane(title="Federated")
+            yield SigningAuthorityPane(title="Signing Authority")
+            yield PerformancePane(title="Performance")
+        yield Footer()
+
+    def on_mount(self) -> None:
+        self.title = "RightHand License Manager"
+
+    def on_unmount(self) -> None:
+        self.ctx.flush()
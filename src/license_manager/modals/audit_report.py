@@ -0,0 +1,43 @@
+from textual.app import ComposeResult
+from textual.events import Key
+from textual.screen import ModalScreen
+from textual.containers import Grid, HorizontalGroup, VerticalGroup
+from textual.widgets import Button, DataTable, Label
+from license_manager.utils.audit import AuditReport
+
+class AuditReportModal(ModalScreen[None]):
+    def __init__(self, report: AuditReport, **kargs) -> None:
+        super().__init__(**kargs)
+        self.report = report
+
+    def compose(self) -> ComposeResult:
+        with Grid():
+            with VerticalGroup(id="body"):
+                yield Label(self._summary(), id="summary")
+                yield DataTable(zebra_stripes=True, cursor_type="row", id="findings")
+            with HorizontalGroup(id="buttons"):
+                yield Button("Close", variant="primary", id="close")
+
+    def on_mount(self) -> None:
+        table = self.query_one(DataTable)
+        table.add_columns("Id", "Status", "Hwid")
+        for finding in self.report.findings:
+            table.add_row(finding.id, finding.status, finding.hwid)
+
+    def on_key(self, event: Key):
+        if event.key == "escape":
+            event.stop()
+            self.dismiss()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        event.stop()
+        self.dismiss()
+
+    def _summary(self) -> str:
+        report = self.report
+        summary = f"Checked {report.checked} licenses in {report.elapsed:.1f}s, {report.flagged} flagged"
+        counts = ", ".join(f"{count} {status}" for status, count in sorted(report.counts.items()))
+        if counts: summary += f"\n{counts}"
+        if report.flagged > len(report.findings):
+            summary += f"\nShowing the first {len(report.findings)} flagged licenses"
+        return summary
@@ -0,0 +1,29 @@
+from textual.app import ComposeResult
+from textual.events import Key
+from textual.screen import ModalScreen
+from textual.containers import Grid, HorizontalGroup, VerticalGroup
+from textual.widgets import Button, Label
+
+class ConfirmDeleteModal(ModalScreen[bool]):
+    """Asks before deleting the marked licenses, dismisses with True to delete them."""
+
+    def __init__(self, count: int, **kargs) -> None:
+        super().__init__(**kargs)
+        self.count = count
+
+    def compose(self) -> ComposeResult:
+        with Grid():
+            with VerticalGroup(id="body"):
+                yield Label(f"Delete {self.count} marked licenses? This can't be undone.")
+            with HorizontalGroup(id="buttons"):
+                yield Button("Cancel", variant="primary", id="cancel")
+                yield Button("Delete", variant="error", id="accept")
+
+    def on_key(self, event: Key):
+        if event.key == "escape":
+            event.stop()
+            self.dismiss(False)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        event.stop()
+        self.dismiss(event.button.id == "accept")
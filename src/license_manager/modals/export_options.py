@@ -0,0 +1,45 @@
+from textual.app import ComposeResult
+from textual.events import Key
+from textual.screen import ModalScreen
+from textual.containers import Grid, HorizontalGroup, VerticalGroup
+from textual.widgets import Button, Label, RadioButton, RadioSet
+
+class ExportOptionsModal(ModalScreen[tuple[str, str]]):
+    """Asks what to export and in which format, dismisses with (scope, format)."""
+
+    def __init__(self, marked: int, searching: bool, **kargs) -> None:
+        super().__init__(**kargs)
+        self.marked = marked
+        self.searching = searching
+
+    def compose(self) -> ComposeResult:
+        with Grid():
+            with VerticalGroup(id="body"):
+                yield Label("Export")
+                with RadioSet(id="scope"):
+                    yield RadioButton(f"Marked licenses ({self.marked})", id="marked", value=self.marked > 0, disabled=not self.marked)
+                    yield RadioButton("Search results", id="search", value=not self.marked and self.searching, disabled=not self.searching)
+                    yield RadioButton("All licenses", id="all", value=not self.marked and not self.searching)
+                yield Label("As")
+                with RadioSet(id="format"):
+                    yield RadioButton("One .lic file per license", id="lic", value=True)
+                    yield RadioButton("JSONL file", id="jsonl")
+                    yield RadioButton("Zip archive", id="zip")
+            with HorizontalGroup(id="buttons"):
+                yield Button("Cancel", variant="error", id="cancel")
+                yield Button("Export", variant="primary", id="accept")
+
+    def on_key(self, event: Key):
+        if event.key == "escape":
+            event.stop()
+            self.dismiss(None)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        event.stop()
+        if event.button.id != "accept":
+            self.dismiss(None)
+            return
+        scope = self.query_one("#scope", RadioSet).pressed_button
+        fmt = self.query_one("#format", RadioSet).pressed_button
+        if scope and fmt:
+            self.dismiss((str(scope.id), str(fmt.id)))
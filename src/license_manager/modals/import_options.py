@@ -0,0 +1,32 @@
+from textual.app import ComposeResult
+from textual.events import Key
+from textual.screen import ModalScreen
+from textual.containers import Grid, HorizontalGroup, VerticalGroup
+from textual.widgets import Button, Label, RadioButton, RadioSet
+
+class ImportOptionsModal(ModalScreen[str]):
+    """Asks whether to import a single file or a whole folder, dismisses with "file" or "folder"."""
+
+    def compose(self) -> ComposeResult:
+        with Grid():
+            with VerticalGroup(id="body"):
+                yield Label("Import licenses from")
+                with RadioSet(id="source"):
+                    yield RadioButton("A folder of .lic, .jsonl and .zip files", id="folder", value=True)
+                    yield RadioButton("A single .lic, .jsonl or .zip file", id="file")
+            with HorizontalGroup(id="buttons"):
+                yield Button("Cancel", variant="error", id="cancel")
+                yield Button("Import", variant="primary", id="accept")
+
+    def on_key(self, event: Key):
+        if event.key == "escape":
+            event.stop()
+            self.dismiss(None)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        event.stop()
+        source = self.query_one("#source", RadioSet).pressed_button
+        if event.button.id == "accept" and source:
+            self.dismiss(str(source.id))
+        else:
+            self.dismiss(None)
@@ -6,19 +6,19 @@ from textual.containers import HorizontalGroup, VerticalGroup, Grid
 from textual.widgets import Button, Input, Static, Label
 from textual.validation import Function
 from textual_timepiece.pickers import DatePicker, DateInput
-from license_manager.widgets.signing_authority import SigningAuthority, SigningAuthorityPane
+from license_manager.widgets.signing_authority import SigningAuthorityPane
+from license_manager.utils.keyring import Keyring
 from datetime import date
-import json
 
 DateInput.PATTERN = "0000-b0-00"
 
 class LicenseDataFormModal(ModalScreen[dict]):
     def __init__(self, **kargs) -> None:
         super().__init__(**kargs)
-        self.signer: SigningAuthority|None = self.app.query_one(SigningAuthorityPane).signing_authority
+        self.keyring: Keyring = self.app.query_one(SigningAuthorityPane).keyring
 
     def do_sign(self) -> None:
-        if not self.signer:
+        if not len(self.keyring):
             self.notify("No signing authority available", severity="warning")
             return
         
@@ -36,10 +36,10 @@ class LicenseDataFormModal(ModalScreen[dict]):
             "features": self.query_one("#features", Input).value,
             "hwid": self.query_one("#hwid", Input).value
         }
-        canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
-        signature = self.signer.sign(canonical)
-        data["signature"] = signature
-        data["canonical"] = canonical
+        # signed with the key of the product, or the default key
+        if self.keyring.sign(data) is None:
+            self.notify(f"No signing key for product {data['product']!r}", severity="warning")
+            return
 
         # return the signed data to the caller
         self.dismiss(data)
@@ -0,0 +1,41 @@
+from textual.app import ComposeResult
+from textual.events import Key
+from textual.screen import ModalScreen
+from textual.containers import Grid, HorizontalGroup, VerticalGroup
+from textual.widgets import Button, Checkbox, Input, Label
+
+class RenewOptionsModal(ModalScreen[tuple[int, bool]]):
+    """Asks how far to push out the expiry of the expiring licenses, dismisses with (days, export)."""
+
+    def __init__(self, count: int, days: int = 365, **kargs) -> None:
+        super().__init__(**kargs)
+        self.count = count
+        self.days = days
+
+    def compose(self) -> ComposeResult:
+        with Grid():
+            with VerticalGroup(id="body"):
+                yield Label(f"Renew {self.count} expiring licenses by")
+                with HorizontalGroup():
+                    yield Input(str(self.days), type="integer", id="renew_days")
+                    yield Label("days", classes="unit")
+                yield Checkbox("Export the renewed .lic files to a folder", value=True, id="export")
+            with HorizontalGroup(id="buttons"):
+                yield Button("Cancel", variant="error", id="cancel")
+                yield Button("Renew", variant="primary", id="accept")
+
+    def on_key(self, event: Key):
+        if event.key == "escape":
+            event.stop()
+            self.dismiss(None)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        event.stop()
+        if event.button.id != "accept":
+            self.dismiss(None)
+            return
+        days = self.query_one("#renew_days", Input).value
+        if days.isdigit() and int(days) > 0:
+            self.dismiss((int(days), self.query_one("#export", Checkbox).value))
+        else:
+            self.notify("Renew by a positive number of days", severity="warning")
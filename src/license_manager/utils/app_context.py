@@ -1,32 +1,81 @@
 from platformdirs import user_config_dir
-import json, os, tempfile
+from contextlib import contextmanager
+from typing import Iterator
+from license_manager.utils.instrumentation import instrumented
+import atexit, json, os, tempfile, threading
 
 class AppContext:
-    def __init__(self, app_name: str) -> None:
+    def __init__(self, app_name: str, flush_delay: float = 0.5, fsync: bool = False) -> None:
+        """Persistent key/value state in the user's config folder.
+
+        Changes are written at most once per `flush_delay` seconds from a background timer
+        (0 writes on every change), and always on exit. With `fsync` each write is flushed
+        to disk before it replaces the previous state file.
+        """
         self.app_name = app_name
         self.config_dir = user_config_dir(app_name)
         os.makedirs(self.config_dir, exist_ok=True)
         self._clean_temp_files()
         self.state_file = os.path.join(self.config_dir, "context.json")
         self.context: dict = self._load()
+        self.flush_delay = flush_delay
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._batch_depth = 0
+        self._timer: threading.Timer|None = None
+        atexit.register(self.flush)
 
     def get(self, key, default=None):
         return self.context.get(key, default)
-    
+
     def set(self, key, value):
-        self.context[key] = value
-        self._save()
+        with self._lock:
+            self.context[key] = value
+            self._changed()
 
     def update(self, **kwargs):
-        self.context.update(kwargs)
-        self._save()
+        with self._lock:
+            self.context.update(kwargs)
+            self._changed()
 
     def __getitem__(self, key):
         return self.context.get(key)
 
     def __setitem__(self, key, value):
-        self.context[key] = value
-        self._save()
+        self.set(key, value)
+
+    @contextmanager
+    def batch(self) -> Iterator["AppContext"]:
+        """Defer writes until the outermost batch exits, then persist all changes at once."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._dirty: self._changed()
+
+    def flush(self) -> None:
+        """Write pending changes now."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if self._dirty:
+                self._save()
+                self._dirty = False
+
+    def _changed(self) -> None:
+        self._dirty = True
+        if self._batch_depth: return
+        if self.flush_delay <= 0:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True  # exit doesn't wait for it, atexit flushes instead
+            self._timer.start()
 
     def _load(self) -> dict:
         if os.path.exists(self.state_file):
@@ -38,16 +87,35 @@ class AppContext:
                 return {}
         return {}
 
+    @instrumented("app_context.save")
     def _save(self):
         # Write atomically using tempfile
         fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.config_dir)
         try:
             with os.fdopen(fd, "w") as tmp_file:
                 json.dump(self.context, tmp_file)
+                if self.fsync:
+                    tmp_file.flush()
+                    os.fsync(tmp_file.fileno())
             os.replace(tmp_path, self.state_file)  # atomic replace
         except Exception:
             os.remove(tmp_path)  # cleanup on failure
             raise
+        if self.fsync:
+            self._fsync_dir()
+
+    def _fsync_dir(self):
+        # make the rename itself durable, not supported everywhere (e.g. Windows)
+        try:
+            dir_fd = os.open(self.config_dir, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
 
     def _clean_temp_files(self):
         for fname in os.listdir(self.config_dir):
@@ -55,4 +123,4 @@ class AppContext:
                 try:
                     os.remove(os.path.join(self.config_dir, fname))
                 except OSError:
-                    pass  # ignore files that can't be removed
\ No newline at end of file
+                    pass  # ignore files that can't be removed
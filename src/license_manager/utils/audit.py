@@ -0,0 +1,144 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Collection, Dict, List, Sequence
+from nacl import signing, encoding
+from nacl.exceptions import BadSignatureError
+from license_manager.utils.license_db import LicenseDB
+from license_manager.utils.signing import LICENSE_FIELDS, canonical_json, key_id
+import base64
+import multiprocessing
+import time
+
+# signature verifies and the row matches its canonical payload
+OK = "ok"
+# signature verifies but the row columns no longer match the signed payload
+MISMATCH = "mismatch"
+# signature does not verify against any known key
+TAMPERED = "tampered"
+# signature verifies against one of the other known keys but not the audited ones
+FOREIGN = "foreign"
+# signature cannot be decoded
+MALFORMED = "malformed"
+
+AUDIT_COLUMNS = ("id", *LICENSE_FIELDS, "signature", "canonical", "key_id")
+
+@dataclass
+class AuditFinding:
+    id: int
+    hwid: str
+    status: str
+
+@dataclass
+class AuditReport:
+    total: int = 0
+    checked: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+    # only the first `max_findings` flagged rows are kept, counts cover all of them
+    findings: List[AuditFinding] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def flagged(self) -> int:
+        return self.checked - self.counts.get(OK, 0)
+
+def audit_licenses(db_path: str, verify_key: str, foreign_keys: Sequence[str] = (), jobs: int = 1, batch_size: int = 2000,
+                   max_findings: int = 1000, progress: Callable[[AuditReport], None]|None = None,
+                   keyring_keys: Sequence[str] = ()) -> AuditReport:
+    """Verify every stored license signature against `verify_key`.
+
+    Licenses signed with one of the `keyring_keys` (the other keys of a keyring, one per product)
+    are as valid as those signed with `verify_key`. Each license is verified against the key its
+    key id names first, the remaining keys are only tried when that fails or the id is unknown.
+    Rows are streamed out of the database a batch at a time and verified across `jobs` processes,
+    with at most two batches per process in flight.
+    """
+    report = AuditReport()
+    start = time.perf_counter()
+    db = LicenseDB(db_path)
+    try:
+        report.total = db.count_licenses()
+        batches = db.iter_license_batches(AUDIT_COLUMNS, batch_size)
+
+        def collect(checked: int, flagged: List[tuple]) -> None:
+            report.checked += checked
+            report.counts[OK] = report.counts.get(OK, 0) + checked - len(flagged)
+            for license_id, hwid, status in flagged:
+                report.counts[status] = report.counts.get(status, 0) + 1
+                if len(report.findings) < max_findings:
+                    report.findings.append(AuditFinding(license_id, hwid, status))
+            report.elapsed = time.perf_counter() - start
+            if progress: progress(report)
+
+        verify_keys = [verify_key, *keyring_keys]
+        if jobs <= 1:
+            _init_worker(verify_keys, foreign_keys)
+            for batch in batches:
+                collect(len(batch), _audit_batch(batch))
+        else:
+            # spawn rather than fork, audits also run from a thread of the UI process
+            with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker, initargs=(verify_keys, list(foreign_keys))) as pool:
+                in_flight: deque[tuple[int, Future]] = deque()
+                for batch in batches:
+                    in_flight.append((len(batch), pool.submit(_audit_batch, batch)))
+                    if len(in_flight) >= jobs * 2:
+                        checked, future = in_flight.popleft()
+                        collect(checked, future.result())
+                while in_flight:
+                    checked, future = in_flight.popleft()
+                    collect(checked, future.result())
+    finally:
+        db.close()
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+def check_license(row: Sequence, keys: Dict[str, signing.VerifyKey], audited: Collection[str]) -> str:
+    """Audit status of one row laid out as AUDIT_COLUMNS.
+
+    `keys` holds every known verification key by key id, audited ones first, `audited` the ids of
+    the keys whose licenses are valid.
+    """
+    license_data = dict(zip(AUDIT_COLUMNS, row))
+    try:
+        signature = base64.urlsafe_b64decode(license_data["signature"] or "")
+    except ValueError:
+        return MALFORMED
+    if len(signature) != 64:
+        return MALFORMED
+
+    canonical = (license_data["canonical"] or "").encode("utf-8")
+    stated = license_data["key_id"]
+    candidates = [stated, *(known for known in keys if known != stated)] if stated in keys else keys
+    for candidate in candidates:
+        if _verifies(keys[candidate], canonical, signature):
+            if candidate not in audited: return FOREIGN
+            return OK if canonical_json(license_data) == license_data["canonical"] else MISMATCH
+    return TAMPERED
+
+def _verifies(key: signing.VerifyKey, message: bytes, signature: bytes) -> bool:
+    try:
+        key.verify(message, signature)
+        return True
+    except BadSignatureError:
+        return False
+
+_keys: Dict[str, signing.VerifyKey] = {}
+_audited: frozenset[str] = frozenset()
+
+def _init_worker(verify_keys: Sequence[str], foreign_keys: Sequence[str]) -> None:
+    global _keys, _audited
+    _keys = {key_id(key): signing.VerifyKey(key.encode("utf-8"), encoder=encoding.URLSafeBase64Encoder)
+             for key in [*verify_keys, *foreign_keys]}
+    _audited = frozenset(key_id(key) for key in verify_keys)
+
+def _audit_batch(rows: List[tuple]) -> List[tuple]:
+    # only flagged rows travel back to the parent process
+    assert _audited
+    flagged = []
+    for row in rows:
+        status = check_license(row, _keys, _audited)
+        if status != OK:
+            flagged.append((row[0], row[AUDIT_COLUMNS.index("hwid")], status))
+    return flagged
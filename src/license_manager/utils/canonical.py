@@ -0,0 +1,18 @@
+from json.encoder import encode_basestring_ascii
+import json
+
+# license fields covered by the signature, as collected by LicenseDataFormModal
+LICENSE_FIELDS = ("customer", "product", "issued_at", "expires_at", "features", "hwid")
+
+# json.dumps(..., sort_keys=True, separators=(",", ":")) of the fields, spelled out because it runs for
+# every stored license read back with its canonical payload
+_SORTED_FIELDS = tuple(sorted(LICENSE_FIELDS))
+_CANONICAL_TEMPLATE = "{" + ",".join(f"{json.dumps(field)}:%s" for field in _SORTED_FIELDS) + "}"
+
+def canonical_json(license_data: dict) -> str:
+    """Build the canonical JSON payload that gets signed for a license."""
+    return _CANONICAL_TEMPLATE % tuple(encode_basestring_ascii(_field_value(license_data.get(field)))
+                                       for field in _SORTED_FIELDS)
+
+def _field_value(value) -> str:
+    return "" if value is None else str(value)
@@ -0,0 +1,128 @@
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+from urllib.parse import quote
+from license_manager.utils.instrumentation import count_rows, instrumented
+from license_manager.utils.license_db import MIGRATIONS, LicenseDB
+import sqlite3
+
+class FederatedLicenseDB:
+    """Read-only queries across several license databases attached to one connection.
+
+    Every file is attached read-only under its own schema name. Nothing is created or migrated, so
+    the databases of other installs are left exactly as they are. Queries are UNION ALL statements
+    with one branch per file, so each branch runs against that file's own indexes, and every row
+    starts with the name of the database it came from (the file name without its suffix).
+    """
+
+    # oldest schema version queried, the licenses table and its full-text index
+    MIN_SCHEMA_VERSION = 2
+
+    def __init__(self, db_paths: Sequence[str] = ()) -> None:
+        self.conn: Optional[sqlite3.Connection] = None
+        # (name, path) of the attached databases, in the order their rows come out
+        self.sources: List[Tuple[str, str]] = []
+        if db_paths: self.change_sources(db_paths)
+
+    def connected(self) -> bool:
+        return self.conn is not None and bool(self.sources)
+
+    @instrumented("federation.change_sources")
+    def change_sources(self, db_paths: Sequence[str]) -> List[str]:
+        """Attach these databases instead, returns their source names.
+
+        Raises ValueError past SQLite's limit on attached databases, FileNotFoundError for missing
+        files, sqlite3.DatabaseError for files that aren't databases and RuntimeError for databases
+        without a supported license schema, leaving nothing attached.
+        """
+        self.close()
+        conn = sqlite3.connect("file::memory:", uri=True)
+        try:
+            limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) if hasattr(conn, "getlimit") else 10
+            if len(db_paths) > limit:
+                raise ValueError(f"at most {limit} license databases can be queried together, got {len(db_paths)}")
+            sources: List[Tuple[str, str]] = []
+            for index, db_path in enumerate(db_paths):
+                # a mistyped path is an error rather than an empty source
+                if not Path(db_path).is_file():
+                    raise FileNotFoundError(f"no license database at {db_path}")
+                conn.execute(f"ATTACH DATABASE ? AS src{index}", (f"file:{quote(str(Path(db_path).resolve()))}?mode=ro",))
+                version = conn.execute(f"PRAGMA src{index}.user_version").fetchone()[0]
+                if not self.MIN_SCHEMA_VERSION <= version <= len(MIGRATIONS):
+                    raise RuntimeError(f"{db_path} has schema version {version}, only license databases with versions "
+                                       f"{self.MIN_SCHEMA_VERSION} to {len(MIGRATIONS)} can be queried")
+                sources.append((self._source_name(db_path, [name for name, _ in sources]), db_path))
+        except BaseException:
+            conn.close()
+            raise
+        self.conn, self.sources = conn, sources
+        return [name for name, _ in sources]
+
+    @instrumented("federation.find_licenses", rows=count_rows)
+    def find_licenses(self, hwid: str) -> Optional[List[tuple]]:
+        """(source, *LicenseDB.DISPLAY_COLUMNS) rows of every license issued for `hwid`, by source and id."""
+        if not self.conn or not self.sources: return None
+        columns = ", ".join(LicenseDB.DISPLAY_COLUMNS)
+        branches = [f"SELECT * FROM (SELECT ? AS source, {columns} FROM src{index}.licenses WHERE hwid = ? ORDER BY id)"
+                    for index in range(len(self.sources))]
+        params = [param for name, _ in self.sources for param in (name, hwid)]
+        return [tuple(row) for row in self.conn.execute(" UNION ALL ".join(branches), params).fetchall()]
+
+    @instrumented("federation.list_license_page", rows=count_rows)
+    def list_license_page(self, after: tuple|None = None, limit: int = 200, search: str|None = None) -> Optional[List[tuple]]:
+        """Up to `limit` (source, *LicenseDB.DISPLAY_COLUMNS) rows following the (source, id) `after`.
+
+        Rows come by source and then by id. Sources before the one of `after` are left out of the
+        statement, each branch is an id range (or a full-text match) limited on its own.
+        """
+        if not self.conn or not self.sources: return None
+        names = [name for name, _ in self.sources]
+        first = names.index(after[0]) if after else 0
+        branches, params = [], []
+        for index in range(first, len(self.sources)):
+            after_id = after[1] if after and index == first else -1
+            if search:
+                branches.append(
+                    f"SELECT * FROM (SELECT ? AS source, {self._columns('l.')} FROM src{index}.licenses_fts AS f "
+                    f"JOIN src{index}.licenses AS l ON l.id = f.rowid WHERE f.licenses_fts MATCH ? AND f.rowid > ? "
+                    f"ORDER BY f.rowid LIMIT ?)"
+                )
+                params += [names[index], search, after_id, limit]
+            else:
+                branches.append(
+                    f"SELECT * FROM (SELECT ? AS source, {self._columns()} FROM src{index}.licenses "
+                    f"WHERE id > ? ORDER BY id LIMIT ?)"
+                )
+                params += [names[index], after_id, limit]
+        # UNION ALL runs its branches in order, the outer LIMIT stops at the first `limit` rows
+        cur = self.conn.execute(" UNION ALL ".join(branches) + " LIMIT ?", (*params, limit))
+        return [tuple(row) for row in cur.fetchall()]
+
+    @instrumented("federation.count_licenses")
+    def count_licenses(self, search: str|None = None) -> int:
+        if not self.conn or not self.sources: return 0
+        if search:
+            branches = [f"SELECT COUNT(*) FROM src{index}.licenses_fts AS f WHERE f.licenses_fts MATCH ?" for index in range(len(self.sources))]
+            params = [search] * len(self.sources)
+        else:
+            branches = [f"SELECT COUNT(*) FROM src{index}.licenses" for index in range(len(self.sources))]
+            params = []
+        return sum(row[0] for row in self.conn.execute(" UNION ALL ".join(branches), params).fetchall())
+
+    def close(self) -> None:
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+        self.sources = []
+
+    @staticmethod
+    def _columns(prefix: str = "") -> str:
+        return ", ".join(prefix + column for column in LicenseDB.DISPLAY_COLUMNS)
+
+    @staticmethod
+    def _source_name(db_path: str, taken: List[str]) -> str:
+        # the file name without its suffix, numbered when two files share a name
+        name = Path(db_path).stem or "licenses"
+        unique, number = name, 2
+        while unique in taken:
+            unique, number = f"{name}-{number}", number + 1
+        return unique
@@ -0,0 +1,122 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, TextIO
+import atexit
+import json
+import threading
+import time
+
+# upper bounds of the latency histogram buckets in milliseconds, the last bucket takes the rest
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 10000)
+
+@dataclass
+class TimingStats:
+    count: int = 0
+    # rows read, written or rendered, for the hooks that report them
+    rows: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(BUCKETS_MS) + 1))
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total / self.count * 1000 if self.count else 0.0
+
+    def percentile_ms(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (0..1), capped at the slowest call."""
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target and count:
+                return min(bound, self.max * 1000)
+        return self.max * 1000
+
+class _Timing:
+    """Handed out by `Instrumentation.timer`, set `rows` before the block ends to record a row count."""
+    __slots__ = ("rows",)
+
+    def __init__(self, rows: int|None) -> None:
+        self.rows = rows
+
+class Instrumentation:
+    """Latency histograms and row counts per hook name, optionally streamed to a JSONL file.
+
+    Hooks record from any thread. Each JSONL line holds one call: wall clock time, name,
+    milliseconds, rows (or null) and the recording thread.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, TimingStats] = {}
+        self._log: TextIO|None = None
+        self.log_path: str|None = None
+        atexit.register(self.stream_to, None)
+
+    def record(self, name: str, seconds: float, rows: int|None = None) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = TimingStats()
+            stats.count += 1
+            stats.total += seconds
+            if seconds > stats.max: stats.max = seconds
+            if rows: stats.rows += rows
+            stats.buckets[bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+            if self._log:
+                self._log.write(json.dumps({
+                    "t": round(time.time(), 6), "name": name, "ms": round(seconds * 1000, 4),
+                    "rows": rows, "thread": threading.current_thread().name,
+                }) + "\n")
+
+    @contextmanager
+    def timer(self, name: str, rows: int|None = None) -> Iterator[_Timing]:
+        timing = _Timing(rows)
+        start = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            self.record(name, time.perf_counter() - start, timing.rows)
+
+    def instrument(self, name: str, rows: Callable[[Any], int|None]|None = None) -> Callable:
+        """Decorator timing every call, `rows` maps the return value to a row count."""
+        def decorator(function: Callable) -> Callable:
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                result = function(*args, **kwargs)
+                self.record(name, time.perf_counter() - start, rows(result) if rows else None)
+                return result
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, TimingStats]:
+        """A copy of the stats so far, by hook name."""
+        with self._lock:
+            return {name: TimingStats(stats.count, stats.rows, stats.total, stats.max, list(stats.buckets))
+                    for name, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def stream_to(self, path: str|None) -> None:
+        """Append every call from now on to the JSONL file at `path`, None stops streaming."""
+        with self._lock:
+            if self._log:
+                self._log.close()
+            self._log = open(path, "a", buffering=1) if path else None
+            self.log_path = path
+
+def count_rows(result: Any) -> int|None:
+    """Row count of a hooked call's result: list length, 1 for a single row, None otherwise."""
+    if isinstance(result, list): return len(result)
+    if isinstance(result, dict): return 1
+    return None
+
+# process wide, hooks in worker processes record into their own copy
+instrumentation = Instrumentation()
+instrumented = instrumentation.instrument
+timer = instrumentation.timer
@@ -0,0 +1,116 @@
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from collections import deque
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, List, TextIO
+from license_manager.utils.keyring import Keyring
+from license_manager.utils.license_db import LicenseDB
+from license_manager.utils.signing import LICENSE_FIELDS, canonical_json
+import csv
+import json
+import time
+
+@dataclass
+class IssueStats:
+    issued: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.issued / self.elapsed if self.elapsed > 0 else 0.0
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[dict]:
+    """Stream license records out of a CSV (with a header row) or JSONL source."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported input format: {fmt}")
+
+def build_license(record: dict, issued_at: str) -> dict|None:
+    """Build an unsigned license like LicenseDataFormModal.do_sign does, None if the record has no hwid."""
+    data = {field: record.get(field) or "" for field in LICENSE_FIELDS}
+    if not data["hwid"]: return None
+    data["issued_at"] = data["issued_at"] or issued_at
+    data["canonical"] = canonical_json(data)
+    return data
+
+def issue_licenses(records: Iterable[dict], db: LicenseDB, signing_key: str, jobs: int = 1, chunk_size: int = 1000,
+                   progress: Callable[[IssueStats], None]|None = None,
+                   product_keys: Dict[str, str]|None = None) -> IssueStats:
+    """Sign `records` and store them in `db`, one transaction per chunk.
+
+    Licenses are signed with `signing_key`, or with the signing key `product_keys` maps their
+    product to. With `jobs` > 1 chunks are signed across a process pool while earlier chunks
+    are written, keeping at most two chunks per worker in flight so memory stays bounded.
+    """
+    product_keys = product_keys or {}
+    keyring = Keyring.from_keys(signing_key, product_keys)
+    stats = IssueStats()
+    issued_at = date.today().strftime("%Y-%m-%d")
+    start = time.perf_counter()
+
+    def store(chunk: List[dict], signatures: List[str]) -> None:
+        for license_data, signature in zip(chunk, signatures):
+            license_data["signature"] = signature
+        stats.issued += db.add_licenses(chunk)
+        stats.elapsed = time.perf_counter() - start
+        if progress: progress(stats)
+
+    def chunks() -> Iterator[List[dict]]:
+        chunk: List[dict] = []
+        for record in records:
+            license_data = build_license(record, issued_at)
+            if license_data is None:
+                stats.skipped += 1
+                continue
+            key = keyring.key_for(license_data["product"])
+            # from_keys always sets a default key
+            assert key is not None
+            license_data["key_id"] = key[0]
+            chunk.append(license_data)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk: yield chunk
+
+    if jobs <= 1:
+        _init_worker(signing_key, product_keys)
+        for chunk in chunks():
+            store(chunk, _sign_batch(_signing_jobs(chunk)))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(signing_key, product_keys)) as pool:
+            _pipeline(pool, chunks(), store, max_in_flight=jobs * 2)
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+def _pipeline(pool: Executor, chunks: Iterator[List[dict]], store: Callable[[List[dict], List[str]], None], max_in_flight: int) -> None:
+    # chunks are stored in submission order so ids follow the input order
+    in_flight: deque[tuple[List[dict], Future]] = deque()
+    for chunk in chunks:
+        in_flight.append((chunk, pool.submit(_sign_batch, _signing_jobs(chunk))))
+        if len(in_flight) >= max_in_flight:
+            done, future = in_flight.popleft()
+            store(done, future.result())
+    while in_flight:
+        done, future = in_flight.popleft()
+        store(done, future.result())
+
+def _signing_jobs(chunk: List[dict]) -> List[tuple[str, str]]:
+    return [(license_data["key_id"], license_data["canonical"]) for license_data in chunk]
+
+_keyring: Keyring|None = None
+
+def _init_worker(signing_key: str, product_keys: Dict[str, str]) -> None:
+    global _keyring
+    _keyring = Keyring.from_keys(signing_key, product_keys)
+
+def _sign_batch(jobs: List[tuple[str, str]]) -> List[str]:
+    # (key id, canonical payload) pairs, the key ids come from the parent's copy of the keyring
+    assert _keyring is not None
+    return [_keyring[key_id].sign(canonical) for key_id, canonical in jobs]
@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, Iterator, List, Tuple
+from license_manager.utils.signing import SigningAuthority, canonical_json
+import os
+
+class Keyring:
+    """Signing authorities kept loaded by key id, with the products each one signs.
+
+    Key files are read once, signing picks the key assigned to a license's product (or the
+    default key) straight from memory. Every signed license carries the key id of its key.
+    """
+
+    def __init__(self) -> None:
+        self._authorities: Dict[str, SigningAuthority] = {}
+        # key file (real path) → key id, so reopening a file doesn't read it again
+        self._files: Dict[str, str] = {}
+        self._products: Dict[str, str] = {}
+        self.default: str|None = None
+
+    @classmethod
+    def from_keys(cls, signing_key: str, product_keys: Dict[str, str]|None = None) -> "Keyring":
+        """A keyring with `signing_key` as the default key and the signing key of each product in `product_keys`."""
+        keyring = cls()
+        keyring.add(SigningAuthority(signing_key_str=signing_key))
+        products: Dict[str, List[str]] = {}
+        for product, product_key in (product_keys or {}).items():
+            products.setdefault(product_key, []).append(product)
+        for product_key, assigned in products.items():
+            keyring.assign(keyring.add(SigningAuthority(signing_key_str=product_key)), assigned)
+        return keyring
+
+    def __len__(self) -> int:
+        return len(self._authorities)
+
+    def __contains__(self, key_id: str) -> bool:
+        return key_id in self._authorities
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._authorities)
+
+    def add(self, authority: SigningAuthority, key_file: str|None = None) -> str:
+        """Keep `authority` loaded and return its key id, the first key added becomes the default."""
+        key_id = authority.get_key_id()
+        self._authorities.setdefault(key_id, authority)
+        if key_file:
+            self._files[os.path.realpath(key_file)] = key_id
+        if self.default is None:
+            self.default = key_id
+        return key_id
+
+    def load(self, key_file: str) -> str:
+        """Load a signing key file unless it already is, returns its key id."""
+        key_id = self._files.get(os.path.realpath(key_file))
+        if key_id is None:
+            key_id = self.add(SigningAuthority(signing_key_file=key_file), key_file)
+        return key_id
+
+    def remove(self, key_id: str) -> None:
+        self._authorities.pop(key_id, None)
+        self._files = {path: known for path, known in self._files.items() if known != key_id}
+        self._products = {product: known for product, known in self._products.items() if known != key_id}
+        if self.default == key_id:
+            self.default = next(iter(self._authorities), None)
+
+    def __getitem__(self, key_id: str) -> SigningAuthority:
+        return self._authorities[key_id]
+
+    def get(self, key_id: str|None) -> SigningAuthority|None:
+        return self._authorities.get(key_id) if key_id else None
+
+    def key_file(self, key_id: str) -> str|None:
+        return next((path for path, known in self._files.items() if known == key_id), None)
+
+    def assign(self, key_id: str, products: Iterable[str]) -> None:
+        """Sign `products` with `key_id` from now on, replacing the products it signed before."""
+        if key_id not in self._authorities:
+            raise KeyError(key_id)
+        self._products = {product: known for product, known in self._products.items() if known != key_id}
+        for product in products:
+            self._products[product] = key_id
+
+    def products(self, key_id: str) -> List[str]:
+        return [product for product, known in self._products.items() if known == key_id]
+
+    def key_for(self, product: str|None) -> Tuple[str, SigningAuthority]|None:
+        """The key id and authority signing `product`, the default key for unassigned products."""
+        key_id = self._products.get(product or "", self.default)
+        authority = self.get(key_id)
+        return (key_id, authority) if key_id and authority else None
+
+    def sign(self, license_data: dict) -> dict|None:
+        """Add the canonical payload, signature and key id to `license_data`, None without a key for its product."""
+        key = self.key_for(license_data.get("product"))
+        if key is None: return None
+        key_id, authority = key
+        license_data["canonical"] = canonical_json(license_data)
+        license_data["signature"] = authority.sign(license_data["canonical"])
+        license_data["key_id"] = key_id
+        return license_data
+
+    def verification_keys(self) -> Dict[str, str]:
+        return {key_id: authority.get_verification_key() for key_id, authority in self._authorities.items()}
+
+    def signing_keys(self) -> Dict[str, str]:
+        """Signing keys by key id, for signing in worker processes."""
+        return {key_id: authority.get_signing_key() for key_id, authority in self._authorities.items()}
+
+    def product_keys(self) -> Dict[str, str]:
+        return dict(self._products)
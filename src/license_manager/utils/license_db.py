@@ -0,0 +1,860 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Iterable, Iterator, List, Dict, Optional, Sequence, Any
+from license_manager.utils.instrumentation import count_rows, instrumented, timer
+from license_manager.utils.canonical import LICENSE_FIELDS, canonical_json
+import asyncio
+import base64
+import queue
+import sqlite3
+import threading
+import os
+import zlib
+
+# keep the full-text index in sync with the licenses table
+FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS licenses_fts_ai AFTER INSERT ON licenses BEGIN
+        INSERT INTO licenses_fts (rowid, customer, product, features, hwid)
+        VALUES (new.id, new.customer, new.product, new.features, new.hwid);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS licenses_fts_ad AFTER DELETE ON licenses BEGIN
+        INSERT INTO licenses_fts (licenses_fts, rowid, customer, product, features, hwid)
+        VALUES ('delete', old.id, old.customer, old.product, old.features, old.hwid);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS licenses_fts_au AFTER UPDATE OF customer, product, features, hwid ON licenses BEGIN
+        INSERT INTO licenses_fts (licenses_fts, rowid, customer, product, features, hwid)
+        VALUES ('delete', old.id, old.customer, old.product, old.features, old.hwid);
+        INSERT INTO licenses_fts (rowid, customer, product, features, hwid)
+        VALUES (new.id, new.customer, new.product, new.features, new.hwid);
+    END
+    """,
+)
+
+# log every insert, update and delete of a license for the UIs watching the database
+CHANGE_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS licenses_changes_ai AFTER INSERT ON licenses BEGIN
+        INSERT INTO license_changes (license_id, op) VALUES (new.id, 'insert');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS licenses_changes_ad AFTER DELETE ON licenses BEGIN
+        INSERT INTO license_changes (license_id, op) VALUES (old.id, 'delete');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS licenses_changes_au AFTER UPDATE ON licenses BEGIN
+        INSERT INTO license_changes (license_id, op) VALUES (new.id, 'update');
+    END
+    """,
+)
+
+# trimmed from both ends of feature names, in Python and as an SQL expression
+FEATURE_BLANKS = " \t\n\r"
+FEATURE_BLANKS_SQL = "' ' || char(9, 10, 13)"
+
+def split_features_sql(features: str, license_id: str, table: str|None = None) -> str:
+    """SELECT of the (license_id, name) of each comma separated feature in the `features` SQL expression,
+    for every row of `table` when given.
+
+    Names are trimmed of FEATURE_BLANKS and empty ones dropped. Plain SQL, so triggers keep the feature
+    tables right for writes from any connection: the features are quoted as a JSON string and every
+    comma closes one string and opens the next, which json_each reads back as an array.
+    """
+    rows = f"{table}, " if table else ""
+    return (
+        f"SELECT {license_id} AS license_id, trim(value, {FEATURE_BLANKS_SQL}) AS name "
+        f"FROM {rows}json_each('[' || replace(json_quote({features}), ',', '\",\"') || ']') "
+        f"WHERE trim(value, {FEATURE_BLANKS_SQL}) <> ''"
+    )
+
+def _feature_rows_sql(source: str) -> tuple[str, str]:
+    # names first, then the (feature, license) pairs of the rows split by `source`
+    return (
+        f"INSERT OR IGNORE INTO feature_names (name) SELECT name FROM ({source})",
+        f"""
+        INSERT OR IGNORE INTO license_features (feature_id, license_id)
+        SELECT n.id, s.license_id FROM ({source}) AS s JOIN feature_names AS n ON n.name = s.name
+        """,
+    )
+
+# keep the feature tables in sync with the features column of licenses
+FEATURE_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS license_features_ai AFTER INSERT ON licenses BEGIN
+        {'; '.join(_feature_rows_sql(split_features_sql('new.features', 'new.id')))};
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS license_features_ad AFTER DELETE ON licenses BEGIN
+        DELETE FROM license_features WHERE license_id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS license_features_au AFTER UPDATE OF features ON licenses BEGIN
+        DELETE FROM license_features WHERE license_id = old.id;
+        {'; '.join(_feature_rows_sql(split_features_sql('new.features', 'new.id')))};
+    END
+    """,
+)
+
+# schema migrations in order, PRAGMA user_version holds how many have been applied
+MIGRATIONS: List[Sequence[str]] = [
+    # 1: licenses table, databases created before versioning already have it
+    (
+        """
+        CREATE TABLE IF NOT EXISTS licenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer TEXT,
+            product TEXT,
+            issued_at TEXT,
+            expires_at TEXT,
+            features TEXT,
+            hwid TEXT NOT NULL,
+            signature TEXT NOT NULL,
+            canonical TEXT NOT NULL
+        )
+        """,
+    ),
+    # 2: full-text index over the searchable columns, kept in sync by triggers
+    (
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS licenses_fts USING fts5(
+            customer, product, features, hwid,
+            content='licenses', content_rowid='id'
+        )
+        """,
+        *FTS_TRIGGERS,
+        # index rows written before the full-text table existed
+        "INSERT INTO licenses_fts (licenses_fts) VALUES ('rebuild')",
+    ),
+    # 3: lookup indexes
+    (
+        "CREATE INDEX IF NOT EXISTS licenses_hwid ON licenses (hwid)",
+        "CREATE INDEX IF NOT EXISTS licenses_customer_product ON licenses (customer, product)",
+        "CREATE INDEX IF NOT EXISTS licenses_expires_at ON licenses (expires_at)",
+    ),
+    # 4: duplicate lookups on import, the hwid index is a prefix of this one
+    (
+        "CREATE INDEX IF NOT EXISTS licenses_hwid_product_issued_at ON licenses (hwid, product, issued_at)",
+        "DROP INDEX IF EXISTS licenses_hwid",
+    ),
+    # 5: sorting the table by product or issue date, customer, hwid and expires_at are covered by
+    # the indexes above and features are left to a full scan
+    (
+        "CREATE INDEX IF NOT EXISTS licenses_product ON licenses (product)",
+        "CREATE INDEX IF NOT EXISTS licenses_issued_at ON licenses (issued_at)",
+    ),
+    # 6: compact storage, signatures as raw bytes and canonical payloads only when they differ from
+    # the columns (zlib compressed), NULL otherwise. Rebuilds the table, SQLite can't change column
+    # types or constraints in place
+    (
+        """
+        CREATE TABLE licenses_compact (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer TEXT,
+            product TEXT,
+            issued_at TEXT,
+            expires_at TEXT,
+            features TEXT,
+            hwid TEXT NOT NULL,
+            signature BLOB NOT NULL,
+            canonical BLOB
+        )
+        """,
+        """
+        INSERT INTO licenses_compact (id, customer, product, issued_at, expires_at, features, hwid, signature, canonical)
+        SELECT id, customer, product, issued_at, expires_at, features, hwid, signature_blob(signature),
+               canonical_blob(canonical, customer, product, issued_at, expires_at, features, hwid)
+        FROM licenses
+        """,
+        # keep ids of deleted licenses from being handed out again, sqlite_sequence has no unique name
+        "DELETE FROM sqlite_sequence WHERE name = 'licenses_compact'",
+        "UPDATE sqlite_sequence SET name = 'licenses_compact' WHERE name = 'licenses'",
+        # takes the indexes and triggers with it
+        "DROP TABLE licenses",
+        "ALTER TABLE licenses_compact RENAME TO licenses",
+        "CREATE INDEX licenses_customer_product ON licenses (customer, product)",
+        "CREATE INDEX licenses_expires_at ON licenses (expires_at)",
+        "CREATE INDEX licenses_hwid_product_issued_at ON licenses (hwid, product, issued_at)",
+        "CREATE INDEX licenses_product ON licenses (product)",
+        "CREATE INDEX licenses_issued_at ON licenses (issued_at)",
+        *FTS_TRIGGERS,
+    ),
+    # 7: id of the key each license was signed with (see signing.key_id), NULL for older licenses
+    (
+        "ALTER TABLE licenses ADD COLUMN key_id TEXT",
+    ),
+    # 8: change log read by LicenseDB.license_changes, only the latest CHANGE_LOG_SIZE entries are kept
+    (
+        """
+        CREATE TABLE IF NOT EXISTS license_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            license_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        )
+        """,
+        *CHANGE_TRIGGERS,
+    ),
+    # 9: renewals only rewrite expires_at and the signature, leave the full-text index alone for them
+    (
+        "DROP TRIGGER IF EXISTS licenses_fts_au",
+        FTS_TRIGGERS[2],
+    ),
+    # 10: features normalized into a dictionary of names and a (feature, license) table kept by
+    # triggers, so licenses with a feature and per-feature counts are index range scans
+    (
+        """
+        CREATE TABLE IF NOT EXISTS feature_names (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS license_features (
+            feature_id INTEGER NOT NULL,
+            license_id INTEGER NOT NULL,
+            PRIMARY KEY (feature_id, license_id)
+        ) WITHOUT ROWID
+        """,
+        # removing a license's features on delete and update
+        "CREATE INDEX IF NOT EXISTS license_features_license_id ON license_features (license_id)",
+        *FEATURE_TRIGGERS,
+        # features of the licenses stored before the tables existed
+        *_feature_rows_sql(split_features_sql("l.features", "l.id", "licenses AS l")),
+    ),
+    # 11: feature names trimmed of tabs and line breaks too, the licenses with any in their features
+    # are split again
+    (
+        "DROP TRIGGER IF EXISTS license_features_ai",
+        FEATURE_TRIGGERS[0],
+        "DROP TRIGGER IF EXISTS license_features_au",
+        FEATURE_TRIGGERS[2],
+        """
+        DELETE FROM license_features WHERE license_id IN (
+            SELECT id FROM licenses WHERE features GLOB '*[' || char(9, 10, 13) || ']*'
+        )
+        """,
+        *_feature_rows_sql(split_features_sql(
+            "l.features", "l.id",
+            "(SELECT id, features FROM licenses WHERE features GLOB '*[' || char(9, 10, 13) || ']*') AS l")),
+    ),
+    # 12: sorting the table by features, the last sortable column migration 5 left to a full scan
+    (
+        "CREATE INDEX IF NOT EXISTS licenses_features ON licenses (features)",
+    ),
+]
+
+# migrations that free enough space to be worth a VACUUM afterwards
+VACUUM_AFTER = {6}
+
+# every stored column, signature and canonical read back as the urlsafe base64 and JSON text they
+# were before compact storage
+LICENSE_COLUMNS = ("id", *LICENSE_FIELDS, "signature", "canonical", "key_id")
+
+def signature_blob(signature: str|bytes) -> str|bytes:
+    """Stored form of a signature: its raw bytes, or the text as is if it isn't valid urlsafe base64."""
+    if not isinstance(signature, str): return signature
+    try:
+        raw = base64.urlsafe_b64decode(signature)
+    except ValueError:
+        return signature
+    # only when it decodes back to the same text, so export output never changes
+    return raw if base64.urlsafe_b64encode(raw).decode("ascii") == signature else signature
+
+def signature_text(signature: str|bytes|None) -> str|None:
+    if isinstance(signature, bytes): return base64.urlsafe_b64encode(signature).decode("ascii")
+    return signature
+
+def canonical_blob(canonical: str|bytes|None, *fields) -> bytes|None:
+    """Stored form of a canonical payload: NULL when the columns rebuild it, compressed otherwise."""
+    if canonical is None or isinstance(canonical, bytes): return canonical
+    if canonical == canonical_json(dict(zip(LICENSE_FIELDS, fields))): return None
+    return zlib.compress(canonical.encode("utf-8"))
+
+def canonical_text(canonical: bytes|str|None, *fields) -> str:
+    if canonical is None: return canonical_json(dict(zip(LICENSE_FIELDS, fields)))
+    if isinstance(canonical, bytes): return zlib.decompress(canonical).decode("utf-8")
+    return canonical
+
+class LicenseDB:
+    # prepared statements kept per connection, the table pages and searches reuse a handful of queries
+    CACHED_STATEMENTS = 256
+    # ids bound per "id IN (...)" statement, well below SQLite's host parameter limit
+    MAX_IN_PARAMS = 500
+    # change log entries kept, a watcher further behind than that reloads instead
+    CHANGE_LOG_SIZE = 10000
+    # full license rows get_license keeps, least recently used ones are dropped first
+    ROW_CACHE_SIZE = 1024
+    # columns shown by LicenseTablePane, in display order
+    DISPLAY_COLUMNS = ("id", "customer", "product", "issued_at", "expires_at", "features", "hwid")
+
+    def __init__(self, db_path: str = "") -> None:
+        """Initialize connection to a SQLite3 database, none for an empty path."""
+        self.conn: Optional[sqlite3.Connection] = None
+        # license id → row of get_license, valid while data_version stays at _cache_version
+        self._row_cache: OrderedDict[int, Dict[str, Any]] = OrderedDict()
+        self._cache_version: int|None = None
+        if db_path and len(db_path):
+            self.db_path = db_path
+            self._open()
+
+    def connected(self) -> bool:
+        return self.conn is not None
+
+    @instrumented("db.change_db")
+    def change_db(self, new_path: str|Path) -> None:
+        """Switch to a different database file.
+
+        Raises sqlite3.DatabaseError for files that aren't databases and RuntimeError for newer
+        schema versions, leaving no database open.
+        """
+        self.db_path = str(new_path)
+        self._open()
+
+    @instrumented("db.add_license", rows=lambda license_id: 1 if license_id else 0)
+    def add_license(self, license_data: dict) -> int|None:
+        if not self.conn: return None
+
+        with self.conn:
+            cur = self.conn.execute(
+                """
+                INSERT INTO licenses (customer, product, issued_at, expires_at, features, hwid, signature, canonical, key_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (license_data.get("customer", ""),
+                 license_data.get("product", ""), 
+                 license_data.get("issued_at", ""), 
+                 license_data.get("expires_at", ""), 
+                 license_data.get("features", ""), 
+                 license_data.get("hwid", ""),
+                 *self._stored(license_data),
+                 license_data.get("key_id"))
+            )
+
+            return cur.lastrowid
+
+    @instrumented("db.get_license", rows=count_rows)
+    def get_license(self, license_id: int) -> Optional[Dict[str, Any]]:
+        if not self.conn: return None
+        """Retrieve a license by its ID, from the row cache unless another connection wrote since."""
+        data_version = self.data_version()
+        if data_version != self._cache_version:
+            self._row_cache.clear()
+            self._cache_version = data_version
+        license_data = self._row_cache.get(license_id)
+        if license_data is None:
+            cur = self.conn.execute(f"SELECT {self._selected(LICENSE_COLUMNS)} FROM licenses WHERE id = ?", (license_id,))
+            row = cur.fetchone()
+            if not row: return None
+            license_data = self._row_cache[license_id] = dict(row)
+            if len(self._row_cache) > self.ROW_CACHE_SIZE:
+                self._row_cache.popitem(last=False)
+        else:
+            self._row_cache.move_to_end(license_id)
+        # callers may change the returned dict, the cached one stays as stored
+        return dict(license_data)
+
+    @instrumented("db.add_licenses", rows=lambda added: added)
+    def add_licenses(self, licenses: Iterable[dict]) -> int:
+        """Insert many licenses in a single transaction. Returns the number of rows inserted."""
+        if not self.conn: return 0
+
+        with self.conn:
+            added = self._insert_licenses(licenses)
+            self._prune_changes()
+            return added
+
+    @instrumented("db.store_licenses", rows=len)
+    def store_licenses(self, licenses: Sequence[dict]) -> List[int]:
+        """Insert licenses in a single transaction like `add_licenses`, returning their ids in order."""
+        if not self.conn or not licenses: return []
+        with self.conn:
+            self._insert_licenses(licenses)
+            # AUTOINCREMENT hands the rows of one write transaction consecutive ids
+            last_id = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'licenses'").fetchone()[0]
+            self._prune_changes()
+        return list(range(last_id - len(licenses) + 1, last_id + 1))
+
+    def _insert_licenses(self, licenses: Iterable[dict]) -> int:
+        # inside the caller's transaction
+        assert self.conn is not None
+        cur = self.conn.executemany(
+            """
+            INSERT INTO licenses (customer, product, issued_at, expires_at, features, hwid, signature, canonical, key_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            ((license_data.get("customer", ""),
+              license_data.get("product", ""),
+              license_data.get("issued_at", ""),
+              license_data.get("expires_at", ""),
+              license_data.get("features", ""),
+              license_data.get("hwid", ""),
+              *self._stored(license_data),
+              license_data.get("key_id")) for license_data in licenses)
+        )
+        return cur.rowcount
+
+    @instrumented("db.find_licenses", rows=count_rows)
+    def find_licenses(self, hwid: str) -> Optional[List[Dict[str, Any]]]:
+        """Every license issued for `hwid`, oldest first."""
+        if not self.conn: return None
+        cur = self.conn.execute(f"SELECT {self._selected(LICENSE_COLUMNS)} FROM licenses WHERE hwid = ? ORDER BY id", (hwid,))
+        return [dict(row) for row in cur.fetchall()]
+
+    @instrumented("db.import_licenses", rows=lambda imported: imported)
+    def import_licenses(self, licenses: Iterable[dict]) -> int:
+        """Insert many licenses in a single transaction, skipping any whose (hwid, product, issued_at)
+        is already stored. Returns the number of rows inserted."""
+        if not self.conn: return 0
+
+        with self.conn:
+            cur = self.conn.executemany(
+                """
+                INSERT INTO licenses (customer, product, issued_at, expires_at, features, hwid, signature, canonical, key_id)
+                SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?
+                WHERE NOT EXISTS (SELECT 1 FROM licenses WHERE hwid = ? AND product IS ? AND issued_at IS ?)
+                """,
+                ((license_data.get("customer", ""),
+                  license_data.get("product", ""),
+                  license_data.get("issued_at", ""),
+                  license_data.get("expires_at", ""),
+                  license_data.get("features", ""),
+                  license_data.get("hwid", ""),
+                  *self._stored(license_data),
+                  license_data.get("key_id"),
+                  license_data.get("hwid", ""),
+                  license_data.get("product", ""),
+                  license_data.get("issued_at", "")) for license_data in licenses)
+            )
+            self._prune_changes()
+            return cur.rowcount
+
+    @instrumented("db.list_licenses", rows=count_rows)
+    def list_licenses(self) -> Optional[List[Dict[str, Any]]]:
+        if not self.conn: return None
+        """Retrieve all licenses."""
+        cur = self.conn.execute(f"SELECT {self._selected(LICENSE_COLUMNS)} FROM licenses")
+        return [dict(row) for row in cur.fetchall()]
+
+    @instrumented("db.list_license_page", rows=count_rows)
+    def list_license_page(self, after: tuple|None = None, limit: int = 200, search: str|None = None,
+                          sort: str = "id", descending: bool = False, before: tuple|None = None) -> Optional[List[tuple]]:
+        """Retrieve up to `limit` licenses following `after` in the given order, display columns only.
+
+        Licenses are ordered by the `sort` column (one of DISPLAY_COLUMNS, NULLs first) and then by
+        id, reversed with `descending`. `after` and `before` are the (sort value, id) of a row already
+        shown, with `before` the page is the `limit` licenses right before that row instead, still in
+        display order. `search` is an FTS5 query (see `fts_query`) matched against the full-text index.
+        """
+        if not self.conn: return None
+        if sort not in self.DISPLAY_COLUMNS:
+            raise ValueError(f"Unknown sort column: {sort}")
+        backwards = before is not None
+        boundary = before if backwards else after
+        # walking the table backwards in descending order is walking it forwards in id order
+        ascending = descending == backwards
+        if sort == "id":
+            rows = self._select_page(self.DISPLAY_COLUMNS, boundary[1] if boundary else None, limit, search,
+                                     backwards=not ascending)
+        else:
+            rows = self._select_sorted_page(self.DISPLAY_COLUMNS, sort, ascending, boundary, limit, search)
+        return rows[::-1] if backwards else rows
+
+    def iter_license_batches(self, columns: Sequence[str], batch_size: int = 1000,
+                             ids: Iterable[int]|None = None, search: str|None = None) -> Iterator[List[tuple]]:
+        """Stream licenses in id order as batches of tuples, only holding one batch at a time.
+
+        Limited to the given `ids` or to the rows matching an FTS5 `search` when either is set.
+        """
+        if not self.conn: return
+        if "id" not in columns:
+            raise ValueError("columns must include id")
+        if ids is not None:
+            ordered = sorted(ids)
+            batch_size = min(batch_size, self.MAX_IN_PARAMS)
+            for start in range(0, len(ordered), batch_size):
+                chunk = ordered[start:start + batch_size]
+                with timer("db.iter_license_batches") as timing:
+                    rows = [tuple(row) for row in self.conn.execute(
+                        f"SELECT {self._selected(columns)} FROM licenses WHERE id IN ({', '.join('?' * len(chunk))}) ORDER BY id",
+                        chunk
+                    )]
+                    timing.rows = len(rows)
+                if rows: yield rows
+            return
+
+        id_index = list(columns).index("id")
+        last_id = None
+        while True:
+            with timer("db.iter_license_batches") as timing:
+                rows = self._select_page(columns, last_id, batch_size, search)
+                timing.rows = len(rows)
+            if not rows: break
+            yield rows
+            last_id = rows[-1][id_index]
+
+    def _select_page(self, columns: Sequence[str], after_id: int|None, limit: int, search: str|None,
+                     backwards: bool = False) -> List[tuple]:
+        # backwards pages walk down from after_id (or the last row) and come out in descending id order
+        assert self.conn is not None
+        compare, order = ("<", "DESC") if backwards else (">", "")
+        if after_id is None:
+            after_id = -1 if not backwards else 2**63 - 1
+        selected = self._selected(columns, "l.")
+        if search:
+            cur = self.conn.execute(
+                f"""
+                SELECT {selected} FROM licenses_fts JOIN licenses l ON l.id = licenses_fts.rowid
+                WHERE licenses_fts MATCH ? AND licenses_fts.rowid {compare} ?
+                ORDER BY licenses_fts.rowid {order} LIMIT ?
+                """,
+                (search, after_id, limit)
+            )
+        else:
+            cur = self.conn.execute(
+                f"SELECT {selected} FROM licenses l WHERE l.id {compare} ? ORDER BY l.id {order} LIMIT ?",
+                (after_id, limit)
+            )
+        return [tuple(row) for row in cur.fetchall()]
+
+    def _select_sorted_page(self, columns: Sequence[str], sort: str, ascending: bool, boundary: tuple|None,
+                            limit: int, search: str|None) -> List[tuple]:
+        # keyset paging on (sort, id): SQLite only seeks an index on the first column of a row value
+        # comparison, so the rows past the boundary are read as consecutive index ranges instead,
+        # the rest of the boundary's ties first, then the following values
+        assert self.conn is not None
+        order = "ASC" if ascending else "DESC"
+        ranges: List[tuple[str, tuple]]
+        if boundary is None:
+            ranges = [("1", ())]
+        else:
+            value, license_id = boundary
+            if ascending and value is None:
+                ranges = [(f"{sort} IS NULL AND id > ?", (license_id,)), (f"{sort} IS NOT NULL", ())]
+            elif ascending:
+                ranges = [(f"{sort} = ? AND id > ?", (value, license_id)), (f"{sort} > ?", (value,))]
+            elif value is None:
+                ranges = [(f"{sort} IS NULL AND id < ?", (license_id,))]
+            else:
+                ranges = [(f"{sort} = ? AND id < ?", (value, license_id)), (f"{sort} < ?", (value,)), (f"{sort} IS NULL", ())]
+
+        # matching ids are collected once per range instead of probing the full-text index per row
+        matching = " AND id IN (SELECT rowid FROM licenses_fts WHERE licenses_fts MATCH ?)" if search else ""
+        rows: List[tuple] = []
+        for where, params in ranges:
+            cur = self.conn.execute(
+                f"SELECT {self._selected(columns)} FROM licenses WHERE {where}{matching} "
+                f"ORDER BY {sort} {order}, id {order} LIMIT ?",
+                (*params, *((search,) if search else ()), limit - len(rows))
+            )
+            rows.extend(tuple(row) for row in cur.fetchall())
+            if len(rows) >= limit: break
+        return rows
+
+    @staticmethod
+    def _selected(columns: Sequence[str], prefix: str = "") -> str:
+        """Select list for `columns`, with signature and canonical converted back from their stored form."""
+        selected = []
+        for column in columns:
+            if column == "signature":
+                selected.append(f"signature_text({prefix}signature) AS signature")
+            elif column == "canonical":
+                fields = ", ".join(prefix + field for field in LICENSE_FIELDS)
+                selected.append(f"canonical_text({prefix}canonical, {fields}) AS canonical")
+            else:
+                selected.append(prefix + column)
+        return ", ".join(selected)
+
+    @staticmethod
+    def _stored(license_data: dict) -> tuple:
+        """Signature and canonical payload of a license as they are stored."""
+        canonical = license_data.get("canonical", "")
+        fields = (license_data.get(field, "") for field in LICENSE_FIELDS)
+        return signature_blob(license_data.get("signature", "")), canonical_blob(canonical, *fields)
+
+    @instrumented("db.count_licenses")
+    def count_licenses(self, search: str|None = None) -> int:
+        if not self.conn: return 0
+        if search:
+            return self.conn.execute("SELECT COUNT(*) FROM licenses_fts WHERE licenses_fts MATCH ?", (search,)).fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM licenses").fetchone()[0]
+
+    @instrumented("db.expiring_licenses", rows=count_rows)
+    def expiring_licenses(self, since: str, until: str, after: tuple|None = None, limit: int = 200) -> Optional[List[tuple]]:
+        """Display rows of the licenses expiring from `since` through `until` (YYYY-MM-DD), soonest first.
+
+        A range scan of the expires_at index in (expires_at, id) order, continuing after the
+        (expires_at, id) of `after`. Licenses without an expiry date never expire and aren't listed.
+        """
+        if not self.conn: return None
+        # licenses without an expiry date store "", which sorts before every date
+        since = since or "0"
+        if after is None:
+            ranges = [("expires_at >= ? AND expires_at <= ?", (since, until))]
+        else:
+            value, license_id = after
+            ranges = [("expires_at = ? AND id > ?", (value, license_id)), ("expires_at > ? AND expires_at <= ?", (value, until))]
+        rows: List[tuple] = []
+        for where, params in ranges:
+            cur = self.conn.execute(
+                f"SELECT {self._selected(self.DISPLAY_COLUMNS)} FROM licenses WHERE {where} ORDER BY expires_at, id LIMIT ?",
+                (*params, limit - len(rows))
+            )
+            rows.extend(tuple(row) for row in cur.fetchall())
+            if len(rows) >= limit: break
+        return rows
+
+    @instrumented("db.count_expiring")
+    def count_expiring(self, since: str, until: str) -> int:
+        if not self.conn: return 0
+        return self.conn.execute("SELECT COUNT(*) FROM licenses WHERE expires_at >= ? AND expires_at <= ?",
+                                 (since or "0", until)).fetchone()[0]
+
+    @instrumented("db.store_renewals", rows=lambda renewed: renewed)
+    def store_renewals(self, licenses: Iterable[dict]) -> int:
+        """Store the new expiry date, signature, canonical payload and key id of re-signed licenses in one
+        transaction. Returns the number of licenses updated."""
+        if not self.conn: return 0
+        licenses = list(licenses)
+        with self.conn:
+            cur = self.conn.executemany(
+                "UPDATE licenses SET expires_at = ?, signature = ?, canonical = ?, key_id = ? WHERE id = ?",
+                ((license_data["expires_at"], *self._stored(license_data), license_data.get("key_id"), license_data["id"])
+                 for license_data in licenses)
+            )
+            self._prune_changes()
+        for license_data in licenses:
+            self._row_cache.pop(license_data["id"], None)
+        return cur.rowcount
+
+    @instrumented("db.feature_counts", rows=count_rows)
+    def feature_counts(self) -> Optional[List[tuple]]:
+        """(feature, number of licenses) of every feature in use, by name."""
+        if not self.conn: return None
+        cur = self.conn.execute(
+            """
+            SELECT n.name, COUNT(*) FROM feature_names AS n JOIN license_features AS f ON f.feature_id = n.id
+            GROUP BY n.id ORDER BY n.name
+            """
+        )
+        return [tuple(row) for row in cur.fetchall()]
+
+    @instrumented("db.count_feature")
+    def count_feature(self, feature: str) -> int:
+        if not self.conn: return 0
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM license_features WHERE feature_id = (SELECT id FROM feature_names WHERE name = ?)",
+            (feature.strip(FEATURE_BLANKS),)
+        ).fetchone()[0]
+
+    @instrumented("db.licenses_with_feature", rows=count_rows)
+    def licenses_with_feature(self, feature: str, after: int|None = None, limit: int = 200) -> Optional[List[tuple]]:
+        """Display rows of the licenses that have `feature`, in id order following the id `after`.
+
+        A range scan of the feature's (feature, license) rows, joined to licenses by id.
+        """
+        if not self.conn: return None
+        cur = self.conn.execute(
+            f"""
+            SELECT {self._selected(self.DISPLAY_COLUMNS, "l.")} FROM license_features AS f JOIN licenses AS l ON l.id = f.license_id
+            WHERE f.feature_id = (SELECT id FROM feature_names WHERE name = ?) AND f.license_id > ?
+            ORDER BY f.license_id LIMIT ?
+            """,
+            (feature.strip(FEATURE_BLANKS), after if after is not None else -1, limit)
+        )
+        return [tuple(row) for row in cur.fetchall()]
+
+    @staticmethod
+    def fts_query(text: str) -> str|None:
+        """Turn free text into an FTS5 query matching rows that contain every term as a prefix."""
+        terms = ['"' + term.replace('"', '""') + '"*' for term in text.split()]
+        return " ".join(terms) if terms else None
+
+    @instrumented("db.get_license_rows", rows=count_rows)
+    def get_license_rows(self, ids: Iterable[int], search: str|None = None) -> Optional[List[tuple]]:
+        """Display rows of the licenses with the given ids that match the FTS5 `search`, in id order."""
+        if not self.conn: return None
+        matching = " AND id IN (SELECT rowid FROM licenses_fts WHERE licenses_fts MATCH ?)" if search else ""
+        ordered = sorted(ids)
+        rows: List[tuple] = []
+        for start in range(0, len(ordered), self.MAX_IN_PARAMS):
+            chunk = ordered[start:start + self.MAX_IN_PARAMS]
+            cur = self.conn.execute(
+                f"SELECT {self._selected(self.DISPLAY_COLUMNS)} FROM licenses "
+                f"WHERE id IN ({', '.join('?' * len(chunk))}){matching} ORDER BY id",
+                (*chunk, *((search,) if search else ()))
+            )
+            rows.extend(tuple(row) for row in cur.fetchall())
+        return rows
+
+    def data_version(self) -> int:
+        """Changes whenever another connection commits to the database, a cheap check for outside writes."""
+        if not self.conn: return 0
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def last_license_change(self) -> int:
+        """Sequence number of the latest logged change, 0 before the first one."""
+        if not self.conn: return 0
+        row = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'license_changes'").fetchone()
+        return row[0] if row else 0
+
+    @instrumented("db.license_changes", rows=count_rows)
+    def license_changes(self, after: int, limit: int = 1000) -> Optional[List[tuple]]:
+        """Up to `limit` (seq, license id, op) changes logged after sequence number `after`, oldest first.
+
+        op is "insert", "update" or "delete". None when the log was pruned past `after`, the
+        changes since then are no longer known.
+        """
+        if not self.conn: return None
+        oldest = self.conn.execute("SELECT MIN(seq) FROM license_changes").fetchone()[0]
+        if oldest is not None and oldest > after + 1: return None
+        if oldest is None and after < self.last_license_change(): return None
+        cur = self.conn.execute("SELECT seq, license_id, op FROM license_changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                                (after, limit))
+        return [tuple(row) for row in cur.fetchall()]
+
+    def _prune_changes(self) -> None:
+        # bulk writes log a change per row, keep the log bounded
+        assert self.conn is not None
+        self.conn.execute("DELETE FROM license_changes WHERE seq <= (SELECT MAX(seq) FROM license_changes) - ?",
+                          (self.CHANGE_LOG_SIZE,))
+
+    @instrumented("db.delete_license", rows=int)
+    def delete_license(self, license_id: int) -> bool:
+        if not self.conn: return False
+        """Delete a license. Returns True if deleted."""
+        with self.conn:
+            cur = self.conn.execute("DELETE FROM licenses WHERE id = ?", (license_id,))
+        self._row_cache.pop(license_id, None)
+        return cur.rowcount > 0
+
+    @instrumented("db.delete_licenses", rows=lambda deleted: deleted)
+    def delete_licenses(self, ids: Iterable[int]) -> int:
+        """Delete many licenses in a single transaction, MAX_IN_PARAMS ids per statement. Returns the number deleted."""
+        if not self.conn: return 0
+        ordered = sorted(set(ids))
+        deleted = 0
+        with self.conn:
+            for start in range(0, len(ordered), self.MAX_IN_PARAMS):
+                chunk = ordered[start:start + self.MAX_IN_PARAMS]
+                cur = self.conn.execute(f"DELETE FROM licenses WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+                deleted += cur.rowcount
+            self._prune_changes()
+        for license_id in ordered:
+            self._row_cache.pop(license_id, None)
+        return deleted
+
+    def close(self) -> None:
+        self._row_cache.clear()
+        self._cache_version = None
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def _open(self) -> None:
+        self._connect()
+        try:
+            self._migrate()
+        except BaseException:
+            self.close()
+            raise
+
+    def _connect(self) -> None:
+        self.close()
+        db_folder = os.path.dirname(self.db_path)
+        if db_folder:
+            os.makedirs(db_folder, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, cached_statements=self.CACHED_STATEMENTS)
+        try:
+            conn.row_factory = sqlite3.Row  # results as dict-like rows
+            # conversions between the stored and the text form of signatures and canonical payloads
+            conn.create_function("signature_blob", 1, signature_blob, deterministic=True)
+            conn.create_function("signature_text", 1, signature_text, deterministic=True)
+            conn.create_function("canonical_blob", 1 + len(LICENSE_FIELDS), canonical_blob, deterministic=True)
+            conn.create_function("canonical_text", 1 + len(LICENSE_FIELDS), canonical_text, deterministic=True)
+            # WAL lets readers on other connections (audits, scripts) run alongside writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except BaseException:
+            conn.close()
+            raise
+        self.conn = conn
+
+    def schema_version(self) -> int:
+        if not self.conn: return 0
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def _migrate(self) -> None:
+        if not self.conn: return
+        """Apply pending schema migrations, all of them in a single transaction."""
+        if self.schema_version() == len(MIGRATIONS): return
+        # take the write lock before reading the version again, another process may be migrating
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = self.schema_version()
+            if version > len(MIGRATIONS):
+                raise RuntimeError(f"{self.db_path} has schema version {version}, newer than this version supports ({len(MIGRATIONS)})")
+            for migration in MIGRATIONS[version:]:
+                for statement in migration:
+                    self.conn.execute(statement)
+            self.conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        # give the space freed by a rebuild back to the file system, VACUUM can't run in a transaction
+        if VACUUM_AFTER & set(range(version + 1, len(MIGRATIONS) + 1)):
+            self.conn.execute("VACUUM")
+
+class AsyncLicenseDB:
+    """A LicenseDB owned by a dedicated thread, its methods are awaitable from the event loop.
+
+    Calls are queued and run one at a time on the database thread, so the connection never
+    crosses threads and the UI keeps running while queries are in flight. Generator methods
+    such as `iter_license_batches` can't be used through this wrapper.
+    Open a database with `await change_db(path)`. Any other class whose instances start out
+    without a database, such as FederatedLicenseDB, can be owned the same way through `db_class`.
+    """
+
+    def __init__(self, db_class: type|None = None) -> None:
+        self._db_class = db_class or LicenseDB
+        self._requests: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="license-db", daemon=True)
+        self._thread.start()
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or not callable(getattr(self._db_class, name, None)):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.wrap_future(self.submit(name, *args, **kwargs))
+        return call
+
+    def submit(self, method: str, *args, **kwargs) -> Future:
+        """Queue a database method call, the returned future resolves on the database thread."""
+        future: Future = Future()
+        self._requests.put((method, args, kwargs, future))
+        return future
+
+    def close(self) -> None:
+        if not self._thread.is_alive(): return
+        self.submit("close")
+        self._requests.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        db = self._db_class()
+        while (request := self._requests.get()) is not None:
+            method, args, kwargs, future = request
+            if not future.set_running_or_notify_cancel(): continue
+            try:
+                future.set_result(getattr(db, method)(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
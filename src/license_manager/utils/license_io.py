@@ -0,0 +1,167 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List
+from license_manager.utils.license_db import LicenseDB
+from license_manager.utils.signing import LICENSE_FIELDS, canonical_json
+import json
+import zipfile
+
+# fields written to a .lic file, in the order on_export_license has always written them
+LICENSE_FILE_FIELDS = (*LICENSE_FIELDS, "signature")
+
+EXPORT_FORMATS = ("lic", "jsonl", "zip")
+EXPORT_COLUMNS = ("id", *LICENSE_FILE_FIELDS)
+IMPORT_SUFFIXES = (".lic", ".jsonl", ".zip")
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    imported: int = 0
+    invalid: int = 0
+
+    @property
+    def duplicates(self) -> int:
+        return self.read - self.invalid - self.imported
+
+def license_file_data(license_data: dict) -> dict:
+    """The content of a .lic file for a stored license."""
+    return {field: license_data.get(field, "") for field in LICENSE_FILE_FIELDS}
+
+def license_file_text(license_data: dict) -> str:
+    return json.dumps(license_file_data(license_data), indent=4)
+
+def export_licenses(db_path: str, target: str|Path, fmt: str, ids: Iterable[int]|None = None, search: str|None = None,
+                    batch_size: int = 500, jobs: int = 8, progress: Callable[[int], None]|None = None) -> int:
+    """Export licenses to a directory of <hwid>.lic files, a JSONL file or a zip archive of .lic files.
+
+    Exports the given `ids`, the rows matching an FTS5 `search` or the whole database, streaming
+    them out of the database a batch at a time. Returns the number of licenses exported.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    exported = 0
+    names = LicenseFileNames()
+    db = LicenseDB(db_path)
+    try:
+        batches = db.iter_license_batches(EXPORT_COLUMNS, batch_size, ids=ids, search=search)
+        if fmt == "lic":
+            folder = Path(target)
+            folder.mkdir(parents=True, exist_ok=True)
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                for batch in batches:
+                    licenses = [dict(zip(EXPORT_COLUMNS, row)) for row in batch]
+                    paths = [folder / names.next(license_data) for license_data in licenses]
+                    # consume the results so write errors surface here
+                    list(pool.map(_write_license_file, paths, licenses))
+                    exported += len(batch)
+                    if progress: progress(exported)
+        elif fmt == "jsonl":
+            with open(target, "w") as f:
+                for batch in batches:
+                    for row in batch:
+                        f.write(json.dumps(license_file_data(dict(zip(EXPORT_COLUMNS, row)))) + "\n")
+                    exported += len(batch)
+                    if progress: progress(exported)
+        else:
+            with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for batch in batches:
+                    for row in batch:
+                        license_data = dict(zip(EXPORT_COLUMNS, row))
+                        archive.writestr(names.next(license_data), license_file_text(license_data))
+                    exported += len(batch)
+                    if progress: progress(exported)
+    finally:
+        db.close()
+    return exported
+
+def import_licenses(db_path: str, sources: Iterable[str|Path], batch_size: int = 5000,
+                    progress: Callable[[ImportStats], None]|None = None) -> ImportStats:
+    """Import .lic files, JSONL streams and zip archives of either into a license database.
+
+    Directories are walked recursively. The canonical payload is rebuilt from the license fields,
+    licenses already stored with the same (hwid, product, issued_at) are skipped and each batch is
+    inserted in one transaction.
+    """
+    stats = ImportStats()
+    db = LicenseDB(db_path)
+    try:
+        batch: List[dict] = []
+        for record in _read_license_records(sources):
+            stats.read += 1
+            license_data = _license_from_record(record)
+            if license_data is None:
+                stats.invalid += 1
+                continue
+            batch.append(license_data)
+            if len(batch) >= batch_size:
+                stats.imported += db.import_licenses(batch)
+                batch = []
+                if progress: progress(stats)
+        if batch:
+            stats.imported += db.import_licenses(batch)
+        if progress: progress(stats)
+    finally:
+        db.close()
+    return stats
+
+def _read_license_records(sources: Iterable[str|Path]) -> Iterator[object]:
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file() and child.suffix.lower() in IMPORT_SUFFIXES:
+                    yield from _read_license_file(child)
+        else:
+            yield from _read_license_file(path)
+
+def _read_license_file(path: Path) -> Iterator[object]:
+    suffix = path.suffix.lower()
+    if suffix == ".zip":
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                if name.lower().endswith(".lic"):
+                    yield _parse_json(archive.read(name))
+                elif name.lower().endswith(".jsonl"):
+                    with archive.open(name) as f:
+                        yield from (_parse_json(line) for line in f if line.strip())
+    elif suffix == ".jsonl":
+        with open(path, "rb") as f:
+            yield from (_parse_json(line) for line in f if line.strip())
+    else:
+        yield _parse_json(path.read_bytes())
+
+def _parse_json(data: bytes) -> object:
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
+
+def _license_from_record(record: object) -> dict|None:
+    if not isinstance(record, dict): return None
+    license_data = {field: record.get(field) or "" for field in LICENSE_FILE_FIELDS}
+    if not license_data["hwid"] or not license_data["signature"]: return None
+    license_data["canonical"] = canonical_json(license_data)
+    return license_data
+
+def _write_license_file(path: Path, license_data: dict) -> None:
+    path.write_text(license_file_text(license_data))
+
+class LicenseFileNames:
+    """Names licenses <hwid>.lic, falling back to <hwid>-<id>.lic when a hwid has several licenses."""
+
+    def __init__(self) -> None:
+        self._used: set[str] = set()
+
+    def next(self, license_data: dict) -> str:
+        hwid = _safe_name(str(license_data["hwid"]))
+        name = f"{hwid}.lic"
+        if name in self._used:
+            name = f"{hwid}-{license_data['id']}.lic"
+        self._used.add(name)
+        return name
+
+def _safe_name(name: str) -> str:
+    # hwids end up as file names, keep them inside the export folder
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name).lstrip(".") or "license"
@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Iterable, List
+from license_manager.utils.keyring import Keyring
+from license_manager.utils.license_db import LICENSE_COLUMNS, LicenseDB
+from license_manager.utils.license_io import LicenseFileNames, license_file_text
+import time
+
+@dataclass
+class RenewStats:
+    total: int = 0
+    renewed: int = 0
+    # licenses without a key for their product, or whose expiry date isn't a date
+    skipped: int = 0
+    exported: int = 0
+    elapsed: float = 0.0
+
+def expiry_window(days: int, today: str|None = None) -> tuple[str, str]:
+    """(since, until) of the licenses expiring within `days` days from `today`, for LicenseDB.expiring_licenses."""
+    start = date.fromisoformat(today) if today else date.today()
+    return start.isoformat(), (start + timedelta(days=days)).isoformat()
+
+def expiring_ids(db: LicenseDB, since: str, until: str, page_size: int = 5000) -> List[int]:
+    """Ids of every license expiring from `since` through `until`, soonest first."""
+    ids: List[int] = []
+    after = None
+    while rows := db.expiring_licenses(since, until, after, page_size):
+        ids.extend(row[0] for row in rows)
+        after = (rows[-1][LicenseDB.DISPLAY_COLUMNS.index("expires_at")], rows[-1][0])
+    return ids
+
+def renewed_expiry(expires_at: str, extend_days: int, today: str) -> str:
+    """`extend_days` after a license's expiry date, or after `today` for a license that already expired."""
+    start = max(expires_at or today, today)
+    return (date.fromisoformat(start[:10]) + timedelta(days=extend_days)).isoformat()
+
+def renew_licenses(db_path: str, keyring: Keyring, ids: Iterable[int], expires_at: str|None = None,
+                   extend_days: int|None = None, today: str|None = None, export_to: str|Path|None = None,
+                   chunk_size: int = 500, progress: Callable[[RenewStats], None]|None = None) -> RenewStats:
+    """Re-sign licenses with a new expiry date, one transaction per chunk.
+
+    Each license gets `expires_at`, or its expiry date pushed out by `extend_days`. Its canonical
+    payload is rebuilt and signed by the keyring key of its product, the rest of the license is
+    kept. With `export_to` the renewed .lic files are written to that folder as each chunk is
+    stored, named like export_licenses names them.
+    """
+    if (expires_at is None) == (extend_days is None):
+        raise ValueError("give either expires_at or extend_days")
+    # only read when expires_at isn't given
+    days = extend_days or 0
+    ids = list(ids)
+    stats = RenewStats(total=len(ids))
+    today = today or date.today().isoformat()
+    start = time.perf_counter()
+    folder = Path(export_to) if export_to is not None else None
+    if folder is not None: folder.mkdir(parents=True, exist_ok=True)
+    names = LicenseFileNames()
+
+    db = LicenseDB(db_path)
+    try:
+        for batch in db.iter_license_batches(LICENSE_COLUMNS, chunk_size, ids=ids):
+            renewed = []
+            for row in batch:
+                license_data = dict(zip(LICENSE_COLUMNS, row))
+                try:
+                    license_data["expires_at"] = expires_at or renewed_expiry(license_data["expires_at"], days, today)
+                except ValueError:
+                    stats.skipped += 1
+                    continue
+                if keyring.sign(license_data) is None:
+                    stats.skipped += 1
+                    continue
+                renewed.append(license_data)
+            stats.renewed += db.store_renewals(renewed)
+            if folder is not None:
+                for license_data in renewed:
+                    (folder / names.next(license_data)).write_text(license_file_text(license_data))
+                stats.exported += len(renewed)
+            stats.elapsed = time.perf_counter() - start
+            if progress: progress(stats)
+    finally:
+        db.close()
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
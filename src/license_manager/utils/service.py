@@ -0,0 +1,265 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+from nacl import signing, encoding
+from license_manager.utils.audit import AUDIT_COLUMNS, check_license
+from license_manager.utils.issue import build_license
+from license_manager.utils.keyring import Keyring
+from license_manager.utils.license_db import LICENSE_COLUMNS, LicenseDB
+from license_manager.utils.license_io import license_file_data
+from license_manager.utils.signing import LICENSE_FIELDS, canonical_json
+import asyncio
+import json
+import threading
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+class LicenseService:
+    """Sign, verify and look up licenses over HTTP/1.1 with JSON bodies, for build pipelines.
+
+        POST /sign             license fields → the stored license with its id, signature and key id
+        POST /verify           {"id": ...} or a license with its signature → {"status": ...}
+        GET  /lookup?hwid=...  every license issued for a hardware id
+        GET  /licenses?after=&limit=&search=  a page of licenses in id order
+        GET  /licenses?feature=&after=&limit=  a page of the licenses with a feature in id order
+        GET  /features         number of licenses with each feature
+
+    Reads run on a pool of threads with a connection each. Sign requests are queued for a single
+    writer thread, which signs and stores everything queued while it was busy in one transaction,
+    so concurrent requests share commits. The same protocol is served on TCP or a Unix socket,
+    connections are kept alive between requests.
+    """
+
+    # licenses signed and stored per transaction at most
+    MAX_BATCH = 1000
+    # largest request body accepted
+    MAX_BODY = 1 << 20
+    # page size of /licenses when the request doesn't set one, and the most it may ask for
+    PAGE_SIZE = 200
+    MAX_PAGE_SIZE = 5000
+
+    def __init__(self, db_path: str, keyring: Keyring, readers: int = 4) -> None:
+        self.db_path = db_path
+        self.keyring = keyring
+        # verification keys of the keyring by key id, signatures of any of them are valid
+        self._keys = {key_id: signing.VerifyKey(key.encode("utf-8"), encoder=encoding.URLSafeBase64Encoder)
+                      for key_id, key in keyring.verification_keys().items()}
+        # each reader thread opens its own connection, they are closed when the threads exit
+        self._local = threading.local()
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="service-reader")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="service-writer")
+        self._writer_db: LicenseDB|None = None
+        self._pending: asyncio.Queue|None = None
+        self._batcher: asyncio.Task|None = None
+        self._server: asyncio.Server|None = None
+        self._connections: set[asyncio.Task] = set()
+
+    async def start(self, host: str|None = None, port: int|None = None, path: str|None = None) -> asyncio.Server:
+        """Listen on the Unix socket at `path`, or on `host`:`port`."""
+        loop = asyncio.get_running_loop()
+        # opening the database applies pending migrations once, before any request comes in
+        self._writer_db = await loop.run_in_executor(self._writer, LicenseDB, self.db_path)
+        self._pending = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._write_batches())
+        if path:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=path)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host=host, port=port)
+        return self._server
+
+    async def close(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        # kept-alive connections idle in readline(), the server doesn't close them
+        for task in self._connections:
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._batcher:
+            self._batcher.cancel()
+        if self._writer_db:
+            await asyncio.get_running_loop().run_in_executor(self._writer, self._writer_db.close)
+        self._readers.shutdown()
+        self._writer.shutdown()
+
+    async def sign_license(self, body: Any) -> Dict[str, Any]:
+        if not isinstance(body, dict):
+            raise RequestError(400, "expected a JSON object of license fields")
+        # checked before queueing, one value SQLite can't bind would fail the whole batch it lands in
+        for field in LICENSE_FIELDS:
+            if not isinstance(body.get(field), (str, type(None))):
+                raise RequestError(400, f"{field} must be a string")
+        license_data = build_license(body, date.today().strftime("%Y-%m-%d"))
+        if license_data is None:
+            raise RequestError(400, "hwid is required")
+        key = self.keyring.key_for(license_data["product"])
+        if key is None:
+            raise RequestError(503, f"no signing key for product {license_data['product']!r}")
+        license_data["key_id"] = key[0]
+        assert self._pending is not None
+        future = asyncio.get_running_loop().create_future()
+        await self._pending.put((license_data, future))
+        license_id = await future
+        return {"id": license_id, **license_file_data(license_data), "key_id": license_data["key_id"]}
+
+    async def verify_license(self, body: Any) -> Dict[str, Any]:
+        if not isinstance(body, dict):
+            raise RequestError(400, "expected a JSON object")
+        if "id" in body:
+            license_data = await self._read(LicenseDB.get_license, _int(body["id"], "id"))
+            if license_data is None:
+                raise RequestError(404, f"no license {body['id']}")
+        else:
+            if not body.get("signature"):
+                raise RequestError(400, "expected a license id or a license with its signature")
+            license_data = {**{field: body.get(field, "") for field in LICENSE_FIELDS},
+                            "signature": body["signature"], "key_id": body.get("key_id")}
+            license_data["canonical"] = canonical_json(license_data)
+        row = tuple(license_data.get(column) for column in AUDIT_COLUMNS)
+        status = await asyncio.get_running_loop().run_in_executor(self._readers, check_license, row, self._keys, self._keys.keys())
+        return {"id": license_data.get("id"), "status": status}
+
+    async def lookup_licenses(self, query: Dict[str, str]) -> Dict[str, Any]:
+        if not query.get("hwid"):
+            raise RequestError(400, "hwid is required")
+        licenses = await self._read(LicenseDB.find_licenses, query["hwid"])
+        return {"licenses": [self._public(license_data) for license_data in licenses or []]}
+
+    async def list_licenses(self, query: Dict[str, str]) -> Dict[str, Any]:
+        after = _int(query["after"], "after") if "after" in query else None
+        limit = max(1, min(_int(query.get("limit", self.PAGE_SIZE), "limit"), self.MAX_PAGE_SIZE))
+        if query.get("feature"):
+            rows = await self._read(LicenseDB.licenses_with_feature, query["feature"], after, limit)
+        else:
+            search = LicenseDB.fts_query(query.get("search", ""))
+            rows = await self._read(LicenseDB.list_license_page, (after, after) if after is not None else None, limit, search)
+        licenses = [dict(zip(LicenseDB.DISPLAY_COLUMNS, row)) for row in rows or []]
+        return {"licenses": licenses, "next": licenses[-1]["id"] if len(licenses) == limit else None}
+
+    async def feature_counts(self, query: Dict[str, str]) -> Dict[str, Any]:
+        counts = await self._read(LicenseDB.feature_counts)
+        return {"features": dict(counts or [])}
+
+    ROUTES = {
+        ("POST", "/sign"): sign_license,
+        ("POST", "/verify"): verify_license,
+        ("GET", "/lookup"): lookup_licenses,
+        ("GET", "/licenses"): list_licenses,
+        ("GET", "/features"): feature_counts,
+    }
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        """Status and JSON payload answering one request."""
+        url = urlsplit(target)
+        handler = self.ROUTES.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self.ROUTES):
+                return 405, {"error": f"{method} not allowed on {url.path}"}
+            return 404, {"error": f"no such endpoint {url.path}"}
+        try:
+            if method == "POST":
+                try:
+                    argument = json.loads(body or b"null")
+                except ValueError as e:
+                    raise RequestError(400, f"invalid JSON: {e}")
+            else:
+                argument = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            return 200, await handler(self, argument)
+        except RequestError as e:
+            return e.status, {"error": str(e)}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections.add(task)
+        try:
+            while request_line := await reader.readline():
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers: Dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # the body can't be skipped without its length, so the connection is closed
+                    status, payload = 400, {"error": "invalid Content-Length"}
+                    keep_alive = False
+                elif length > self.MAX_BODY:
+                    status, payload = 413, {"error": f"request bodies are limited to {self.MAX_BODY} bytes"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = await self.dispatch(method, target, body)
+                    except Exception as e:
+                        status, payload = 500, {"error": str(e)}
+                    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload).encode("utf-8")
+                head = f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                if not keep_alive: head += "Connection: close\r\n"
+                writer.write(head.encode("latin-1") + b"\r\n" + data)
+                await writer.drain()
+                if not keep_alive: break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _write_batches(self) -> None:
+        # requests queued while a batch is being written go into the next one
+        assert self._pending is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._pending.get()]
+            while len(batch) < self.MAX_BATCH and not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+            try:
+                ids = await loop.run_in_executor(self._writer, self._sign_and_store, [license_data for license_data, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done(): future.set_exception(e)
+                continue
+            for (_, future), license_id in zip(batch, ids):
+                if not future.done(): future.set_result(license_id)
+
+    def _sign_and_store(self, licenses: List[dict]) -> List[int]:
+        assert self._writer_db is not None
+        for license_data in licenses:
+            authority = self.keyring.get(license_data["key_id"])
+            assert authority is not None
+            license_data["signature"] = authority.sign(license_data["canonical"])
+        return self._writer_db.store_licenses(licenses)
+
+    async def _read(self, method, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._readers, self._call_reader, method, args)
+
+    def _call_reader(self, method, args: tuple) -> Any:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = LicenseDB(self.db_path)
+        return method(db, *args)
+
+    @staticmethod
+    def _public(license_data: Dict[str, Any]) -> Dict[str, Any]:
+        # what a client needs of a stored license, the canonical payload is rebuilt from the fields
+        return {column: license_data[column] for column in LICENSE_COLUMNS if column != "canonical"}
+
+def _int(value: Any, name: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RequestError(400, f"{name} must be an integer")
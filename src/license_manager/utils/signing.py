@@ -0,0 +1,41 @@
+from nacl import signing, encoding
+from license_manager.utils.instrumentation import instrumented
+# the payload helpers live apart so the database layer can use them without loading nacl
+from license_manager.utils.canonical import LICENSE_FIELDS, canonical_json
+import base64
+import hashlib
+
+# hex digits of a key id, enough to tell the keys of one license manager apart
+KEY_ID_LENGTH = 16
+
+def key_id(verification_key: str) -> str:
+    """Short id of a verification key, stored with every license signed by its signing key."""
+    raw = base64.urlsafe_b64decode(verification_key.encode("utf-8"))
+    return hashlib.sha256(raw).hexdigest()[:KEY_ID_LENGTH]
+
+class SigningAuthority():
+    def __init__(self, signing_key: signing.SigningKey|None= None, signing_key_str: str|None = None, signing_key_file: str|None = None) -> None:
+        if signing_key:
+            self.signing_key = signing_key
+        elif signing_key_str:
+            self.signing_key = signing.SigningKey(signing_key_str.encode('utf-8'), encoder=encoding.URLSafeBase64Encoder)
+        elif signing_key_file:
+            with open(signing_key_file, 'r') as f:
+                key_data = f.read().strip()
+            self.signing_key = signing.SigningKey(key_data.encode('utf-8'), encoder=encoding.URLSafeBase64Encoder)
+        else:
+            self.signing_key = signing.SigningKey.generate()
+
+    def get_signing_key(self) -> str:
+        return self.signing_key.encode(encoder=encoding.URLSafeBase64Encoder).decode('utf-8')
+
+    def get_verification_key(self) -> str:
+        return self.signing_key.verify_key.encode(encoder=encoding.URLSafeBase64Encoder).decode('utf-8')
+
+    def get_key_id(self) -> str:
+        return key_id(self.get_verification_key())
+
+    @instrumented("signing.sign")
+    def sign(self, data: str) -> str:
+        signed = self.signing_key.sign(data.encode('utf-8')).signature
+        return base64.urlsafe_b64encode(signed).decode('utf-8')
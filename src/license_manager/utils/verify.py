@@ -0,0 +1,275 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+from nacl import signing, encoding
+from license_manager.utils.audit import AUDIT_COLUMNS, FOREIGN, MALFORMED, OK, TAMPERED, check_license
+from license_manager.utils.signing import canonical_json, key_id
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+# file can't be read or isn't a JSON license
+INVALID = "invalid"
+# signature verifies but the license expired before the day of the check
+EXPIRED = "expired"
+# signature verifies but the license was issued for another hardware id
+WRONG_HWID = "wrong_hwid"
+
+# what is remembered of a license file's content: signature status, hwid and expiry date
+Verdict = Tuple[str, str, str]
+
+@dataclass
+class VerifyResult:
+    path: str
+    status: str
+    hwid: str = ""
+    expires_at: str = ""
+
+@dataclass
+class VerifyReport:
+    checked: int = 0
+    # files whose verdict came from the cache without verifying their signature again
+    cached: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+    # only the first `max_findings` flagged files are kept, counts cover all of them
+    findings: List[VerifyResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def flagged(self) -> int:
+        return self.checked - self.counts.get(OK, 0)
+
+class LicenseVerifier:
+    """Verify exported .lic files offline against the verification keys of a license manager.
+
+    The keys are decoded once. A file's canonical payload is rebuilt from its license fields the
+    way LicenseDataFormModal.do_sign built it, its signature is checked against the key it names
+    or else every key, then its hwid and expiry date.
+
+    Signature verdicts are cached by the SHA-256 of the file content, and files by path, mtime
+    and size, so unchanged files are neither read nor verified again. With a `cache_file` the
+    cache is loaded from and saved to disk, it is discarded when the keys change.
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, verify_keys: Sequence[str], foreign_keys: Sequence[str] = (), cache_file: str|None = None) -> None:
+        if not verify_keys:
+            raise ValueError("at least one verification key is required")
+        self.verify_keys = list(verify_keys)
+        self.foreign_keys = list(foreign_keys)
+        self._keys, self._valid = _decode_keys(self.verify_keys, self.foreign_keys)
+        # ties a cache file to the keys its verdicts were reached with
+        self._fingerprint = ",".join(self._valid) + ";" + ",".join(known for known in self._keys if known not in self._valid)
+        self.cache_file = cache_file
+        # path → (mtime_ns, size, content digest)
+        self._files: Dict[str, Tuple[int, int, str]] = {}
+        # content digest → verdict
+        self._verdicts: Dict[str, Verdict] = {}
+        if cache_file: self._load_cache()
+
+    def verify(self, license_data: dict, hwid: str|None = None, today: str|None = None) -> str:
+        """Status of one parsed license, `today` as YYYY-MM-DD defaults to the current date."""
+        return _status(_check_data(license_data, self._keys, self._valid), hwid, today or date.today().isoformat())
+
+    def verify_file(self, path: str|Path, hwid: str|None = None, today: str|None = None) -> VerifyResult:
+        path = str(path)
+        verdict = self._cached(path)
+        if verdict is None:
+            stat, digest, data = _read(path)
+            verdict = self._verdicts.get(digest) if digest else None
+            if verdict is None:
+                verdict = _check_content(data, self._keys, self._valid)
+            self._remember(path, stat, digest, verdict)
+        return _result(path, verdict, hwid, today or date.today().isoformat())
+
+    def scan(self, paths: Iterable[str|Path], hwid: str|None = None, today: str|None = None, jobs: int = 1,
+             batch_size: int = 500, max_findings: int = 10000, progress: Callable[[VerifyReport], None]|None = None) -> VerifyReport:
+        """Verify .lic files and every .lic file in the directory trees among `paths`.
+
+        Files missing from the cache are read and hashed here and verified across `jobs` processes,
+        a batch at a time with at most two batches per process in flight. The processes are only
+        started once a whole batch needs verifying, scans of a mostly cached tree run in-process.
+        """
+        report = VerifyReport()
+        start = time.perf_counter()
+        today = today or date.today().isoformat()
+
+        def collect(results: List[VerifyResult]) -> None:
+            for result in results:
+                report.checked += 1
+                report.counts[result.status] = report.counts.get(result.status, 0) + 1
+                if result.status != OK and len(report.findings) < max_findings:
+                    report.findings.append(result)
+            report.elapsed = time.perf_counter() - start
+            if progress: progress(report)
+
+        def finish(batch: list, verdicts: List[Verdict]) -> None:
+            for (path, stat, digest, _), verdict in zip(batch, verdicts):
+                self._remember(path, stat, digest, verdict)
+            collect([_result(path, verdict, hwid, today) for (path, _, _, _), verdict in zip(batch, verdicts)])
+
+        with ExitStack() as stack:
+            pool: ProcessPoolExecutor|None = None
+            in_flight: deque[tuple[list, Future]] = deque()
+            # (path, stat, digest, content) of files whose content has no verdict yet
+            pending: List[Tuple[str, Tuple[int, int]|None, str|None, bytes|None]] = []
+            cached: List[VerifyResult] = []
+            for path in _license_files(paths):
+                verdict = self._cached(path)
+                if verdict is None:
+                    stat, digest, data = _read(path)
+                    verdict = self._verdicts.get(digest) if digest else None
+                    if verdict is None:
+                        pending.append((path, stat, digest, data))
+                        if len(pending) >= batch_size and jobs > 1:
+                            if pool is None:
+                                # spawn rather than fork, the caller may be running threads
+                                pool = stack.enter_context(ProcessPoolExecutor(
+                                    max_workers=jobs, mp_context=multiprocessing.get_context("spawn"),
+                                    initializer=_init_worker, initargs=(self.verify_keys, self.foreign_keys)))
+                            in_flight.append((pending, pool.submit(_check_batch, [data for _, _, _, data in pending])))
+                            pending = []
+                            if len(in_flight) >= jobs * 2:
+                                done, future = in_flight.popleft()
+                                finish(done, future.result())
+                        elif len(pending) >= batch_size:
+                            finish(pending, [_check_content(data, self._keys, self._valid) for _, _, _, data in pending])
+                            pending = []
+                        continue
+                    self._remember(path, stat, digest, verdict)
+                report.cached += 1
+                cached.append(_result(path, verdict, hwid, today))
+                if len(cached) >= batch_size:
+                    collect(cached)
+                    cached = []
+            collect(cached)
+            while in_flight:
+                done, future = in_flight.popleft()
+                finish(done, future.result())
+            finish(pending, [_check_content(data, self._keys, self._valid) for _, _, _, data in pending])
+
+        if self.cache_file: self.save()
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def save(self) -> None:
+        """Write the cache to `cache_file`, forgetting the verdicts no cached file refers to any more."""
+        if not self.cache_file: return
+        digests = {digest for _, _, digest in self._files.values()}
+        self._verdicts = {digest: verdict for digest, verdict in self._verdicts.items() if digest in digests}
+        state = {"version": self.CACHE_VERSION, "keys": self._fingerprint, "files": self._files, "verdicts": self._verdicts}
+        folder = os.path.dirname(os.path.abspath(self.cache_file))
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump(state, tmp_file, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_file)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def _load_cache(self) -> None:
+        assert self.cache_file
+        try:
+            with open(self.cache_file, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return  # missing or corrupted → start with an empty cache
+        if not isinstance(state, dict) or state.get("version") != self.CACHE_VERSION or state.get("keys") != self._fingerprint:
+            return
+        self._files = {path: tuple(entry) for path, entry in state["files"].items()}  # type: ignore[misc]
+        self._verdicts = {digest: tuple(verdict) for digest, verdict in state["verdicts"].items()}  # type: ignore[misc]
+
+    def _cached(self, path: str) -> Verdict|None:
+        entry = self._files.get(path)
+        if entry is None: return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if (stat.st_mtime_ns, stat.st_size) != entry[:2]: return None
+        return self._verdicts.get(entry[2])
+
+    def _remember(self, path: str, stat: Tuple[int, int]|None, digest: str|None, verdict: Verdict) -> None:
+        # unreadable files are checked again next time
+        if stat is None or digest is None: return
+        self._files[path] = (*stat, digest)
+        self._verdicts[digest] = verdict
+
+def _license_files(paths: Iterable[str|Path]) -> Iterator[str]:
+    # os.walk and plain string sorting, sorting Path objects costs more than reading the files
+    for source in paths:
+        source = str(source)
+        if os.path.isdir(source):
+            for folder, subfolders, names in os.walk(source):
+                subfolders.sort()
+                for name in sorted(names):
+                    if name.lower().endswith(".lic"):
+                        yield os.path.join(folder, name)
+        else:
+            yield source
+
+def _read(path: str) -> Tuple[Tuple[int, int]|None, str|None, bytes|None]:
+    try:
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+    except OSError:
+        return None, None, None
+    return (stat.st_mtime_ns, stat.st_size), hashlib.sha256(data).hexdigest(), data
+
+def _result(path: str, verdict: Verdict, hwid: str|None, today: str) -> VerifyResult:
+    status, license_hwid, expires_at = verdict
+    return VerifyResult(path, _status(verdict, hwid, today), license_hwid, expires_at)
+
+def _status(verdict: Verdict, hwid: str|None, today: str) -> str:
+    status, license_hwid, expires_at = verdict
+    if status != OK: return status
+    if hwid is not None and license_hwid != hwid: return WRONG_HWID
+    # licenses without an expiry date don't expire, dates are YYYY-MM-DD and compare as text
+    if expires_at and expires_at < today: return EXPIRED
+    return OK
+
+def _check_content(data: bytes|None, keys: Dict[str, signing.VerifyKey], valid: frozenset[str]) -> Verdict:
+    if data is None: return INVALID, "", ""
+    try:
+        license_data = json.loads(data)
+    except ValueError:
+        return INVALID, "", ""
+    if not isinstance(license_data, dict): return INVALID, "", ""
+    return _check_data(license_data, keys, valid)
+
+def _check_data(license_data: dict, keys: Dict[str, signing.VerifyKey], valid: frozenset[str]) -> Verdict:
+    license_data = {**license_data, "canonical": canonical_json(license_data)}
+    row = tuple(license_data.get(column) for column in AUDIT_COLUMNS)
+    try:
+        status = check_license(row, keys, valid)
+    except (TypeError, AttributeError):
+        # a signature that isn't a string
+        status = MALFORMED
+    return status, str(license_data.get("hwid") or ""), str(license_data.get("expires_at") or "")
+
+def _decode_keys(verify_keys: Sequence[str], foreign_keys: Sequence[str]) -> Tuple[Dict[str, signing.VerifyKey], frozenset[str]]:
+    keys = {key_id(key): signing.VerifyKey(key.encode("utf-8"), encoder=encoding.URLSafeBase64Encoder)
+            for key in [*verify_keys, *foreign_keys]}
+    return keys, frozenset(key_id(key) for key in verify_keys)
+
+_keys: Dict[str, signing.VerifyKey] = {}
+_valid: frozenset[str] = frozenset()
+
+def _init_worker(verify_keys: Sequence[str], foreign_keys: Sequence[str]) -> None:
+    global _keys, _valid
+    _keys, _valid = _decode_keys(verify_keys, foreign_keys)
+
+def _check_batch(contents: List[bytes|None]) -> List[Verdict]:
+    assert _valid
+    return [_check_content(data, _keys, _valid) for data in contents]
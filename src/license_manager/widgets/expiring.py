@@ -0,0 +1,169 @@
+from textual import on, work
+from textual.app import ComposeResult
+from textual.widgets import TabPane, DataTable, Button, Input, ProgressBar, Static
+from textual.containers import Horizontal
+from license_manager.widgets.signing_authority import SigningAuthorityPane
+from license_manager.utils.license_db import LicenseDB
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+import os
+import sqlite3
+
+# the renewal helpers sign licenses (nacl) and are imported once a renewal starts
+if TYPE_CHECKING:
+    from license_manager.app import RightHandLicenseManager
+    from license_manager.utils.app_context import AppContext
+    from license_manager.utils.keyring import Keyring
+    from license_manager.utils.renew import RenewStats
+
+class ExpiringPane(TabPane):
+    """Licenses expiring within a window of days, found in the background and renewed in bulk."""
+
+    COLUMNS = ("Id", "Expires At", "Days Left", "Customer", "Product", "Hwid")
+    DEFAULT_WINDOW = 30
+    # seconds between background checks
+    REFRESH_INTERVAL = 60.0
+    # rows shown, the count covers the whole window
+    MAX_ROWS = 1000
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        # licenses in the window at the last check
+        self._count: int = 0
+
+    @property
+    def ctx(self) -> "AppContext":
+        """The app's persistent state."""
+        return cast("RightHandLicenseManager", self.app).ctx
+
+    def compose(self) -> ComposeResult:
+        with Horizontal():
+            yield Static("Expiring within", classes="option_label")
+            yield Input(str(self.ctx["expiry_window_days"] or self.DEFAULT_WINDOW), type="integer", id="expiry_days")
+            yield Static("days", classes="option_label")
+            yield Button("Refresh", id="refresh_expiring")
+            yield Button("Renew", id="renew_expiring")
+            yield Static("", id="expiring_status")
+        yield ProgressBar(id="renew_progress", show_eta=False)
+        yield DataTable(zebra_stripes=True, cursor_type="row", id="expiring_table")
+
+    def on_mount(self) -> None:
+        self.query_one("#renew_progress", ProgressBar).display = False
+        table = self.query_one(DataTable)
+        for label in self.COLUMNS:
+            table.add_column(label, key=label)
+        self.set_interval(self.REFRESH_INTERVAL, self._find_expiring)
+
+    def on_show(self) -> None:
+        self._find_expiring()
+
+    @on(Input.Submitted, "#expiry_days")
+    @on(Button.Pressed, "#refresh_expiring")
+    def on_refresh(self, event: Input.Submitted|Button.Pressed) -> None:
+        event.stop()
+        self.ctx["expiry_window_days"] = self.window_days
+        self._find_expiring()
+
+    @property
+    def window_days(self) -> int:
+        days = self.query_one("#expiry_days", Input).value
+        return int(days) if days.isdigit() else self.DEFAULT_WINDOW
+
+    def _find_expiring(self) -> None:
+        if db_path := self.ctx["license_db"]:
+            self._scan_expiring(db_path, self.window_days)
+
+    @work(thread=True, exclusive=True, group="expiring")
+    def _scan_expiring(self, db_path: str, days: int) -> None:
+        # an indexed range scan on its own connection, the UI's database thread isn't held up
+        from license_manager.utils.renew import expiry_window
+        since, until = expiry_window(days)
+        try:
+            db = LicenseDB(db_path)
+        except (sqlite3.Error, RuntimeError, OSError):
+            return  # the licenses pane reports databases that can't be opened
+        try:
+            count = db.count_expiring(since, until)
+            rows = db.expiring_licenses(since, until, limit=self.MAX_ROWS) or []
+        finally:
+            db.close()
+        self.app.call_from_thread(self._show_expiring, count, rows, until)
+
+    def _show_expiring(self, count: int, rows: list[tuple], until: str) -> None:
+        table = self.query_one(DataTable)
+        table.clear()
+        today = date.today()
+        columns = {column: index for index, column in enumerate(LicenseDB.DISPLAY_COLUMNS)}
+        for row in rows:
+            expires_at = row[columns["expires_at"]]
+            try:
+                days_left = str((date.fromisoformat(expires_at[:10]) - today).days)
+            except ValueError:
+                days_left = ""
+            table.add_row(row[0], expires_at, days_left, row[columns["customer"]], row[columns["product"]], row[columns["hwid"]],
+                          key=str(row[0]))
+        shown = f", showing the first {len(rows)}" if count > len(rows) else ""
+        self.query_one("#expiring_status", Static).update(f"{count} licenses expire by {until}{shown}")
+        self._count = count
+
+    @work
+    @on(Button.Pressed, "#renew_expiring")
+    async def on_renew(self, event: Button.Pressed) -> None:
+        event.stop()
+        signing_pane = self.app.query_one(SigningAuthorityPane)
+        if not signing_pane.signing_authority:
+            self.app.notify("No signing authority loaded", severity="warning")
+            return
+        if not self.ctx["license_db"] or not self._count:
+            self.app.notify("No licenses to renew", severity="warning")
+            return
+        from license_manager.modals.renew_options import RenewOptionsModal
+        options = await self.app.push_screen_wait(RenewOptionsModal(self._count, self.ctx["renew_days"] or 365))
+        if not options: return
+        days, export = options
+        self.ctx["renew_days"] = days
+        folder = None
+        if export:
+            from textual_fspicker import SelectDirectory
+            folder = await self.app.push_screen_wait(SelectDirectory(title="Export Renewed Licenses To", location=self._db_folder()))
+            if not folder: return
+        self._renew_licenses(self.ctx["license_db"], signing_pane.keyring, self.window_days, days, str(folder) if folder else None)
+
+    @work(thread=True, exclusive=True, group="renew")
+    def _renew_licenses(self, db_path: str, keyring: "Keyring", window_days: int, days: int, folder: str|None) -> None:
+        from license_manager.utils.renew import expiring_ids, expiry_window, renew_licenses
+        progress = self.query_one("#renew_progress", ProgressBar)
+        self.app.call_from_thread(self._task_started, progress)
+        try:
+            # the window is read up front, renewed licenses may still fall inside it
+            since, until = expiry_window(window_days)
+            db = LicenseDB(db_path)
+            try:
+                ids = expiring_ids(db, since, until)
+            finally:
+                db.close()
+            stats = renew_licenses(
+                db_path, keyring, ids, extend_days=days, export_to=folder,
+                progress=lambda stats: self.app.call_from_thread(progress.update, total=stats.total, progress=stats.renewed + stats.skipped)
+            )
+        finally:
+            self.app.call_from_thread(self._task_finished, progress)
+        self.app.call_from_thread(self._renew_finished, stats, folder)
+
+    def _renew_finished(self, stats: "RenewStats", folder: str|None) -> None:
+        exported = f", exported to {folder}" if folder else ""
+        skipped = f", skipped {stats.skipped} without a key or a valid expiry date" if stats.skipped else ""
+        self.app.notify(f"Renewed {stats.renewed} licenses{exported}{skipped}", severity="information")
+        self._find_expiring()
+
+    def _task_started(self, progress: ProgressBar) -> None:
+        progress.update(total=None, progress=0)
+        progress.display = True
+
+    def _task_finished(self, progress: ProgressBar) -> None:
+        progress.display = False
+
+    def _db_folder(self) -> Path:
+        db_path = self.ctx["license_db"]
+        return Path(os.path.dirname(os.path.realpath(db_path)) if db_path else ".")
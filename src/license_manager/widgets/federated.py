@@ -0,0 +1,152 @@
+from textual import on, work
+from textual.app import ComposeResult
+from textual.widgets import TabPane, DataTable, Button, Input, Static
+from textual.containers import Horizontal
+from license_manager.utils.federation import FederatedLicenseDB
+from license_manager.utils.license_db import LicenseDB, AsyncLicenseDB
+from license_manager.utils.instrumentation import timer
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+import sqlite3
+
+if TYPE_CHECKING:
+    from license_manager.app import RightHandLicenseManager
+    from license_manager.utils.app_context import AppContext
+
+class FederatedPane(TabPane):
+    """Looks up licenses across several license databases at once, each row tagged with its database."""
+
+    COLUMNS = ("Source", "Id", "Customer", "Product", "Issued At", "Expires At", "Features", "Hwid")
+    PAGE_SIZE = 200
+    # fetch the next page when the cursor gets this close to the last loaded row
+    PREFETCH_ROWS = 50
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        # FTS5 query of the listed rows, None lists every license
+        self._search: str|None = None
+        # (source, id) of the last row loaded, None once every page is in
+        self._after: tuple|None = None
+        self._at_end: bool = True
+        self._loading_page: bool = False
+
+    @property
+    def ctx(self) -> "AppContext":
+        """The app's persistent state."""
+        return cast("RightHandLicenseManager", self.app).ctx
+
+    def compose(self) -> ComposeResult:
+        with Horizontal():
+            yield Button("Add Database", id="add_source")
+            yield Button("Clear", id="clear_sources")
+            yield Static("", id="sources")
+        with Horizontal():
+            yield Input("", id="federated_search", placeholder="Hwid or search terms")
+            yield Button("Find Hwid", id="find_hwid")
+            yield Button("Search", id="search_sources")
+            yield Static("", id="federated_status")
+        yield DataTable(fixed_columns=2, zebra_stripes=True, cursor_type="row", id="federated_table")
+
+    async def on_mount(self) -> None:
+        self.federated_db = AsyncLicenseDB(FederatedLicenseDB)
+        table = self.query_one(DataTable)
+        for label in self.COLUMNS:
+            table.add_column(label, key=label)
+        if self.ctx["federated_dbs"]:
+            await self._change_sources(self.ctx["federated_dbs"])
+
+    def on_unmount(self) -> None:
+        self.federated_db.close()
+
+    @work
+    @on(Button.Pressed, "#add_source")
+    async def on_add_source(self, event: Button.Pressed) -> None:
+        event.stop()
+        from textual_fspicker import FileOpen, Filters
+        db_file = await self.app.push_screen_wait(
+            FileOpen(title="Add License Database",
+                     filters=Filters(
+                        ("Sqlite3", lambda p: p.suffix.lower() == ".db"),
+                        ("All", lambda _: True)
+                     ),
+                     location=self._db_folder()))
+        if not db_file: return
+        paths = list(self.ctx["federated_dbs"] or [])
+        if str(db_file) not in paths:
+            await self._change_sources([*paths, str(db_file)])
+
+    @on(Button.Pressed, "#clear_sources")
+    async def on_clear_sources(self, event: Button.Pressed) -> None:
+        event.stop()
+        await self._change_sources([])
+
+    @on(Button.Pressed, "#find_hwid")
+    async def on_find_hwid(self, event: Button.Pressed) -> None:
+        event.stop()
+        hwid = self.query_one("#federated_search", Input).value.strip()
+        if not hwid: return
+        rows = await self.federated_db.find_licenses(hwid)
+        self._at_end = True
+        self._show_rows(rows or [], f"{len(rows or [])} licenses for {hwid}")
+
+    @on(Input.Submitted, "#federated_search")
+    @on(Button.Pressed, "#search_sources")
+    async def on_search(self, event: Input.Submitted|Button.Pressed) -> None:
+        event.stop()
+        self._search = LicenseDB.fts_query(self.query_one("#federated_search", Input).value)
+        await self._list_licenses()
+
+    @on(DataTable.RowHighlighted, "#federated_table")
+    async def on_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+        if event.data_table.cursor_row >= event.data_table.row_count - self.PREFETCH_ROWS:
+            await self._load_next_page()
+
+    async def _change_sources(self, paths: list[str]) -> None:
+        try:
+            names = await self.federated_db.change_sources(paths)
+        except (sqlite3.Error, RuntimeError, OSError, ValueError) as e:
+            self.app.notify(f"Could not open license databases: {e}", severity="error")
+            names = []
+        else:
+            self.ctx["federated_dbs"] = paths
+        self.query_one("#sources", Static).update(", ".join(names) if names else "No databases added")
+        self._search = None
+        await self._list_licenses()
+
+    async def _list_licenses(self) -> None:
+        self._after = None
+        self._at_end = False
+        total = await self.federated_db.count_licenses(self._search)
+        self._show_rows([], f"{total} licenses in {len(self.ctx['federated_dbs'] or [])} databases")
+        await self._load_next_page()
+
+    async def _load_next_page(self) -> None:
+        if self._at_end or self._loading_page: return
+        self._loading_page = True
+        search = self._search
+        try:
+            rows = await self.federated_db.list_license_page(self._after, self.PAGE_SIZE, search) or []
+        finally:
+            self._loading_page = False
+        # a newer search started while the page was read
+        if search != self._search: return
+        if len(rows) < self.PAGE_SIZE: self._at_end = True
+        if not rows: return
+        self._after = (rows[-1][0], rows[-1][1])
+        self._add_rows(rows)
+
+    def _show_rows(self, rows: list[tuple], status: str) -> None:
+        self.query_one(DataTable).clear()
+        self._add_rows(rows)
+        self.query_one("#federated_status", Static).update(status)
+
+    def _add_rows(self, rows: list[tuple]) -> None:
+        table = self.query_one(DataTable)
+        with timer("table.add_rows", rows=len(rows)):
+            for row in rows:
+                # rows are (source, *LicenseDB.DISPLAY_COLUMNS), ids repeat across sources
+                table.add_row(*("" if value is None else value for value in row), key=f"{row[0]}:{row[1]}")
+
+    def _db_folder(self) -> Path:
+        license_db = self.ctx["license_db"]
+        return Path(license_db).resolve().parent if license_db else Path(".")
@@ -1,67 +1,182 @@
 from textual import on, work
 from textual.app import ComposeResult
-from textual.widgets import TabPane, DataTable, Button, Input
+from textual.widgets import TabPane, DataTable, Button, Input, ProgressBar
+from textual.widgets.data_table import ColumnKey
 from textual.containers import Horizontal
-from textual_fspicker import FileSave, FileOpen, Filters
-from license_manager.modals.license_form import LicenseDataFormModal
+from textual.binding import Binding
+from license_manager.widgets.signing_authority import SigningAuthorityPane
+from license_manager.utils.license_db import LicenseDB, AsyncLicenseDB
+from license_manager.utils.instrumentation import timer
 from pathlib import Path
-from typing import List, Dict, Optional, Any
-import sqlite3
-import json
+from rich.text import Text
+from typing import TYPE_CHECKING, cast
+import asyncio
 import os
+import sqlite3
+
+# file pickers, modals and the audit/import/export helpers (which pull in nacl) are imported
+# by the handlers that use them, keeping them out of startup
+if TYPE_CHECKING:
+    from license_manager.app import RightHandLicenseManager
+    from license_manager.utils.app_context import AppContext
+    from license_manager.utils.audit import AuditReport
+    from license_manager.utils.license_io import ImportStats
 
 class LicenseTablePane(TabPane):
     COLUMNS = ("Id", "Customer", "Product", "Issued At", "Expires At", "Features", "Hwid")
+    PAGE_SIZE = 200
+    # pages kept in the table, rows furthest from the cursor are evicted beyond that
+    MAX_PAGES = 5
+    # fetch a page when the cursor or viewport gets this close to either end of the loaded rows
+    PREFETCH_ROWS = 50
+    # seconds to wait for typing to pause before searching
+    SEARCH_DEBOUNCE = 0.25
+    # seconds between checks for changes other connections made to the database
+    WATCH_INTERVAL = 1.0
+    # changes applied row by row, more than that at once (a bulk import) reloads the window instead
+    MAX_CHANGES = 1000
+    MARK = "✓"
+    SORT_ARROWS = {False: " ▲", True: " ▼"}
+
+    BINDINGS = [
+        Binding("space", "toggle_mark", "Mark"),
+        Binding("ctrl+u", "clear_marks", "Unmark all"),
+    ]
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-    
+        # the slice of the (searched) licenses held by the table, as LicenseDB.DISPLAY_COLUMNS rows
+        self._rows: list[tuple] = []
+        self._at_start: bool = True
+        self._at_end: bool = False
+        # set while the table is rebuilt, scrolling then doesn't come from the user
+        self._restoring: bool = False
+        self._search: str|None = None
+        # column the table is ordered by, one of LicenseDB.DISPLAY_COLUMNS
+        self._sort: str = "id"
+        self._descending: bool = False
+        # bumped on every reload so pages fetched for a previous view are dropped
+        self._generation: int = 0
+        self._loading_page: bool = False
+        # ids of the licenses marked for bulk actions
+        self._marked: set[int] = set()
+        # change log position and data_version the table is up to date with
+        self._change_seq: int = 0
+        self._data_version: int|None = None
+        self._watching: bool = False
+
+    @property
+    def ctx(self) -> "AppContext":
+        """The app's persistent state."""
+        return cast("RightHandLicenseManager", self.app).ctx
+
     def compose(self) -> ComposeResult:
         with Horizontal():
             with Horizontal(classes="license_actions"):
                 yield Button("New", id="new_license")
                 yield Button("Delete", id="delete_license")
                 yield Button("Export", id="export_license")
+                yield Button("Bulk Export", id="export_licenses")
+                yield Button("Import", id="import_licenses")
                 yield Button("Load", id="load_licenses")
+                yield Button("Audit", id="audit_licenses")
             with Horizontal(classes="search_container"):
                 yield Input("", id="search_input", placeholder="Search on all columns")
-                yield Button("Search", id="add_license")
-        yield DataTable(fixed_columns=1, zebra_stripes=True, id="license_table", cursor_type="row")
+                yield Button("Search", id="search_licenses")
+        yield ProgressBar(id="task_progress", show_eta=False)
+        yield DataTable(fixed_columns=2, zebra_stripes=True, id="license_table", cursor_type="row")
+
+    async def on_mount(self) -> None:
+        self.license_db_path: str|None = self.ctx["license_db"]
+        if self.ctx["license_sort"] in LicenseDB.DISPLAY_COLUMNS:
+            self._sort, self._descending = self.ctx["license_sort"], bool(self.ctx["license_sort_descending"])
+        self.license_db = AsyncLicenseDB()
+        self.query_one("#task_progress", ProgressBar).display = False
+        table = self.query_one(DataTable)
+        table.add_column("", key="marked", width=1)
+        for label, key in zip(self.COLUMNS, LicenseDB.DISPLAY_COLUMNS):
+            table.add_column(label, key=key)
+        self._update_sort_labels(table)
+        self.watch(table, "scroll_y", self._on_table_scroll, init=False)
+        if self.license_db_path:
+            try:
+                await self.license_db.change_db(self.license_db_path)
+            except (sqlite3.Error, RuntimeError, OSError) as e:
+                # start without a database rather than failing on every launch
+                self.license_db_path = None
+                self.app.notify(f"Could not open license database: {e}", severity="error")
+        await self._load_licenses()
+        self.set_interval(self.WATCH_INTERVAL, self._watch_changes)
 
-    def on_mount(self) -> None:
-        self.license_db_path: str = self.app.ctx["license_db"]
-        self.license_db = LicenseDB(self.license_db_path)
-        self.query_one(DataTable).add_columns(*self.COLUMNS)
-        self._load_licenses()
+    def on_unmount(self) -> None:
+        self.license_db.close()
 
-    def add_license(self, license_data: dict) -> None:
-        license_key = self.license_db.add_license(license_data)
+    async def add_license(self, license_data: dict) -> None:
+        license_key = await self.license_db.add_license(license_data)
         if license_key:
             license_data["id"] = license_key
-            self._table_add_license(license_data)
+            # data_version doesn't move for our own writes, have the watcher read the change log anyway
+            self._data_version = None
+            # shown right away when it goes at the end of the table, the watcher places it otherwise
+            if self._at_end and self._search is None and self._sort == "id" and not self._descending:
+                self._table_add_license(license_data)
 
     @on(Button.Pressed, "#new_license")
     def on_new_license(self, event: Button.Pressed) -> None:
         event.stop()
+        from license_manager.modals.license_form import LicenseDataFormModal
         self.app.push_screen(LicenseDataFormModal(), self._event_new_license)
 
+    @work
     @on(Button.Pressed, "#delete_license")
-    def on_delete_license(self, event: Button.Pressed) -> None:
+    async def on_delete_license(self, event: Button.Pressed) -> None:
         event.stop()
-        license_data = self._get_selected_license()
+        if self._marked:
+            from license_manager.modals.confirm_delete import ConfirmDeleteModal
+            if await self.app.push_screen_wait(ConfirmDeleteModal(len(self._marked))):
+                await self._delete_licenses(set(self._marked))
+            return
+
+        license_data = await self._get_selected_license()
         if not license_data:
             self.app.notify(f"No license selected", severity="warning")
             return
         
-        if self.license_db.delete_license(int(license_data["id"])):
+        if await self.license_db.delete_license(int(license_data["id"])):
             self._table_remove_license(license_data["id"])
+            self._data_version = None
+
+    async def _delete_licenses(self, ids: set[int]) -> None:
+        # one transaction for the database and one rebuild of the table, however many licenses
+        seq = await self.license_db.last_license_change()
+        deleted = await self.license_db.delete_licenses(ids)
+        last_seq = await self.license_db.last_license_change()
+        # the change log holds nothing but these deletes, the watcher needn't replay them
+        if seq == self._change_seq and last_seq - seq == deleted:
+            self._change_seq = last_seq
+        self._data_version = None
+        self._marked -= ids
+        table = self.query_one(DataTable)
+        # the cursor moves to the first kept license below it, which may only be on the next page
+        cursor_row = sum(1 for row in self._rows[:table.cursor_row] if row[0] not in ids) if table.row_count else 0
+        self._rows = [row for row in self._rows if row[0] not in ids]
+        if not self._rows:
+            await self._load_licenses()
+        else:
+            self._render_rows(self._rows[min(cursor_row, len(self._rows) - 1)][0])
+            if len(self._rows) - cursor_row < self.PREFETCH_ROWS:
+                await self._load_next_page()
+                if cursor_row < table.row_count: table.move_cursor(row=cursor_row)
+        self.app.notify(f"Deleted {deleted} licenses", severity="information")
 
     @work
     @on(Button.Pressed, "#export_license")
     async def on_export_license(self, event: Button.Pressed) -> None:
         event.stop()
-        
-        license_data = self._get_selected_license()
+        from textual_fspicker import FileSave, Filters
+        from license_manager.utils.license_io import license_file_text
+
+        license_data = await self._get_selected_license()
         if not license_data:
             self.app.notify(f"No license selected", severity="warning")
             return
@@ -76,16 +191,126 @@ class LicenseTablePane(TabPane):
                      default_file=Path(license_data["hwid"] + ".lic")))
         if not license_file: return
         
-        del license_data["id"]
-        del license_data["canonical"]
         with open(license_file, 'w') as f:
-            json.dump(license_data, f, indent=4)
+            f.write(license_file_text(license_data))
         self.app.notify(f"License saved to {license_file}", severity="information")
 
+    @work
+    @on(Button.Pressed, "#export_licenses")
+    async def on_export_licenses(self, event: Button.Pressed) -> None:
+        event.stop()
+        if not (db_path := self.license_db_path):
+            self.app.notify("No license database loaded", severity="warning")
+            return
+        from textual_fspicker import FileSave, Filters, SelectDirectory
+        from license_manager.modals.export_options import ExportOptionsModal
+        options = await self.app.push_screen_wait(ExportOptionsModal(len(self._marked), self._search is not None))
+        if not options: return
+        scope, fmt = options
+
+        if fmt == "lic":
+            target = await self.app.push_screen_wait(
+                SelectDirectory(title="Export Licenses To", location=self._db_folder()))
+        else:
+            target = await self.app.push_screen_wait(
+                FileSave(title="Export Licenses To",
+                         filters=Filters(
+                            ("JSONL" if fmt == "jsonl" else "Zip", lambda p: p.suffix.lower() == "." + fmt),
+                            ("All", lambda _: True)
+                         ),
+                         location=self._db_folder(),
+                         default_file=Path("licenses." + fmt)))
+        if not target: return
+
+        ids = set(self._marked) if scope == "marked" else None
+        search = self._search if scope == "search" else None
+        total = len(ids) if ids is not None else await self.license_db.count_licenses(search)
+        self._export_licenses(db_path, str(target), fmt, ids, search, total)
+
+    @work(thread=True, exclusive=True, group="export")
+    def _export_licenses(self, db_path: str, target: str, fmt: str, ids: set[int]|None, search: str|None, total: int) -> None:
+        from license_manager.utils.license_io import export_licenses
+        progress = self.query_one("#task_progress", ProgressBar)
+        self.app.call_from_thread(self._task_started, progress)
+        try:
+            exported = export_licenses(
+                db_path, target, fmt, ids=ids, search=search,
+                progress=lambda exported: self.app.call_from_thread(progress.update, total=total, progress=exported)
+            )
+        finally:
+            self.app.call_from_thread(self._task_finished, progress)
+        self.app.call_from_thread(self.app.notify, f"Exported {exported} licenses to {target}", severity="information")
+
+    @work
+    @on(Button.Pressed, "#import_licenses")
+    async def on_import_licenses(self, event: Button.Pressed) -> None:
+        event.stop()
+        if not (db_path := self.license_db_path):
+            self.app.notify("No license database loaded", severity="warning")
+            return
+        from textual_fspicker import FileOpen, Filters, SelectDirectory
+        from license_manager.modals.import_options import ImportOptionsModal
+        source = await self.app.push_screen_wait(ImportOptionsModal())
+        if source == "folder":
+            path = await self.app.push_screen_wait(
+                SelectDirectory(title="Import Licenses From", location=self._db_folder()))
+        elif source == "file":
+            path = await self.app.push_screen_wait(
+                FileOpen(title="Import Licenses From",
+                         filters=Filters(
+                            ("Licenses", lambda p: p.suffix.lower() in (".lic", ".jsonl", ".zip")),
+                            ("All", lambda _: True)
+                         ),
+                         location=self._db_folder()))
+        else: return
+        if path: self._import_licenses(db_path, str(path))
+
+    @work(thread=True, exclusive=True, group="import")
+    def _import_licenses(self, db_path: str, path: str) -> None:
+        from license_manager.utils.license_io import import_licenses
+        progress = self.query_one("#task_progress", ProgressBar)
+        self.app.call_from_thread(self._task_started, progress)
+        try:
+            stats = import_licenses(
+                db_path, [path],
+                progress=lambda stats: self.app.call_from_thread(progress.update, progress=stats.read)
+            )
+        finally:
+            self.app.call_from_thread(self._task_finished, progress)
+        self.app.call_from_thread(self._import_finished, stats)
+
+    def _import_finished(self, stats: "ImportStats") -> None:
+        # one table refresh for the whole import
+        if stats.imported:
+            self.call_later(self._load_licenses)
+        self.app.notify(f"Imported {stats.imported} licenses, skipped {stats.duplicates} duplicates and {stats.invalid} invalid",
+                        severity="information")
+
+    def action_toggle_mark(self) -> None:
+        table = self.query_one(DataTable)
+        if not table.row_count: return
+        row_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key
+        license_id = int(str(row_key.value))
+        if license_id in self._marked:
+            self._marked.discard(license_id)
+            table.update_cell(row_key, "marked", "")
+        else:
+            self._marked.add(license_id)
+            table.update_cell(row_key, "marked", self.MARK)
+        table.action_cursor_down()
+
+    def action_clear_marks(self) -> None:
+        table = self.query_one(DataTable)
+        for license_id in self._marked:
+            if str(license_id) in table.rows:
+                table.update_cell(str(license_id), "marked", "")
+        self._marked.clear()
+
     @work
     @on(Button.Pressed, "#load_licenses")
     async def on_load_licenses(self, event: Button.Pressed) -> None:
         event.stop()
+        from textual_fspicker import FileOpen, Filters
         license_db_file = await self.app.push_screen_wait(
             FileOpen(title="Open License Database", 
                      must_exist=False,
@@ -94,25 +319,318 @@ class LicenseTablePane(TabPane):
                         ("All", lambda _: True)
                      ),
                      location=self._db_folder()))
-        self._change_db(license_db_file)
+        await self._change_db(license_db_file)
+
+    @on(Button.Pressed, "#audit_licenses")
+    async def on_audit_licenses(self, event: Button.Pressed) -> None:
+        event.stop()
+        signing_pane = self.app.query_one(SigningAuthorityPane)
+        signer = signing_pane.signing_authority
+        if not signer:
+            self.app.notify("No signing authority loaded", severity="warning")
+            return
+        db_path = self.license_db_path
+        if not db_path or not await self.license_db.connected():
+            self.app.notify("No license database loaded", severity="warning")
+            return
+        verify_key = signer.get_verification_key()
+        # licenses signed with any key of the keyring are valid, earlier keys only recognised
+        keyring_keys = [key for key in signing_pane.keyring.verification_keys().values() if key != verify_key]
+        foreign_keys = [key for key in signing_pane.known_verification_keys() if key != verify_key and key not in keyring_keys]
+        self._audit_licenses(db_path, verify_key, foreign_keys, keyring_keys)
+
+    @work(thread=True, exclusive=True, group="audit")
+    def _audit_licenses(self, db_path: str, verify_key: str, foreign_keys: list[str], keyring_keys: list[str]) -> None:
+        from license_manager.utils.audit import audit_licenses
+        # runs in its own thread with its own connection, verification is spread over a process pool
+        progress = self.query_one("#task_progress", ProgressBar)
+        self.app.call_from_thread(self._task_started, progress)
+        try:
+            report = audit_licenses(
+                db_path, verify_key, foreign_keys, jobs=os.cpu_count() or 1,
+                progress=lambda report: self.app.call_from_thread(progress.update, total=report.total, progress=report.checked),
+                keyring_keys=keyring_keys
+            )
+        finally:
+            self.app.call_from_thread(self._task_finished, progress)
+        self.app.call_from_thread(self._audit_finished, report)
+
+    def _audit_finished(self, report: "AuditReport") -> None:
+        if report.flagged:
+            from license_manager.modals.audit_report import AuditReportModal
+            self.app.push_screen(AuditReportModal(report))
+        else:
+            self.app.notify(f"All {report.checked} licenses verified", severity="information")
+
+    def _task_started(self, progress: ProgressBar) -> None:
+        progress.update(total=None, progress=0)
+        progress.display = True
+
+    def _task_finished(self, progress: ProgressBar) -> None:
+        progress.display = False
+
+    @on(Input.Changed, "#search_input")
+    def on_search_changed(self, event: Input.Changed) -> None:
+        event.stop()
+        self._search_licenses(event.value, self.SEARCH_DEBOUNCE)
+
+    @on(Input.Submitted, "#search_input")
+    @on(Button.Pressed, "#search_licenses")
+    def on_search_submitted(self, event: Input.Submitted|Button.Pressed) -> None:
+        event.stop()
+        self._search_licenses(self.query_one("#search_input", Input).value)
+
+    @work(exclusive=True, group="search")
+    async def _search_licenses(self, text: str, delay: float = 0) -> None:
+        # a newer search cancels this worker while it sleeps, which debounces typing
+        if delay: await asyncio.sleep(delay)
+        search = LicenseDB.fts_query(text)
+        if search == self._search and delay: return
+        self._search = search
+        await self._load_licenses()
+
+    @on(DataTable.HeaderSelected, "#license_table")
+    async def on_header_selected(self, event: DataTable.HeaderSelected) -> None:
+        event.stop()
+        column = str(event.column_key.value)
+        if column not in LicenseDB.DISPLAY_COLUMNS: return
+        if column == self._sort:
+            self._descending = not self._descending
+        else:
+            self._sort, self._descending = column, False
+        with self.ctx.batch():
+            self.ctx["license_sort"] = self._sort
+            self.ctx["license_sort_descending"] = self._descending
+        self._update_sort_labels(event.data_table)
+        await self._load_around_cursor()
+
+    @on(DataTable.RowHighlighted, "#license_table")
+    async def on_license_highlighted(self, event: DataTable.RowHighlighted) -> None:
+        table = event.data_table
+        if table.cursor_row >= table.row_count - self.PREFETCH_ROWS:
+            await self._load_next_page()
+        elif table.cursor_row < self.PREFETCH_ROWS:
+            await self._load_previous_page()
 
-    def _event_new_license(self, result: dict|None) -> None:
+    async def _on_table_scroll(self, scroll_y: float) -> None:
+        if self._restoring: return
+        table = self.query_one(DataTable)
+        if table.scroll_y >= table.max_scroll_y - self.PREFETCH_ROWS:
+            await self._load_next_page()
+        elif table.scroll_y < self.PREFETCH_ROWS:
+            await self._load_previous_page()
+
+    async def _event_new_license(self, result: dict|None) -> None:
         if result:
-            self.add_license(result)
+            await self.add_license(result)
+
+    async def _load_licenses(self) -> None:
+        self._generation += 1
+        self._rows = []
+        self._at_start = True
+        self._at_end = False
+        self._loading_page = False
+        self._table_clear_licenses()
+        await self._sync_change_position()
+        await self._load_next_page()
+
+    async def _sync_change_position(self) -> None:
+        # taken before the rows are read, changes racing the reload are applied again, which is harmless
+        self._data_version = await self.license_db.data_version()
+        self._change_seq = await self.license_db.last_license_change()
+
+    async def _watch_changes(self) -> None:
+        # PRAGMA data_version only moves when another connection commits, the change log is read then.
+        # Pages in flight are left to finish first, the next tick catches up
+        if self._watching or self._loading_page or not self.license_db_path: return
+        self._watching = True
+        try:
+            data_version = await self.license_db.data_version()
+            if data_version == self._data_version: return
+            changes = await self.license_db.license_changes(self._change_seq, self.MAX_CHANGES)
+            if self._loading_page: return
+            if changes is None or len(changes) >= self.MAX_CHANGES:
+                await self._sync_change_position()
+                await self._load_around_cursor()
+                return
+            deleted = {license_id for _, license_id, op in changes if op == "delete"}
+            changed = {license_id for _, license_id, op in changes} - deleted
+            rows = await self.license_db.get_license_rows(changed, self._search) if changed else []
+            if self._loading_page or rows is None: return
+            self._apply_changes(deleted, changed, rows)
+            self._data_version = data_version
+            if changes: self._change_seq = changes[-1][0]
+        finally:
+            self._watching = False
+
+    def _apply_changes(self, deleted: set[int], changed: set[int], rows: list[tuple]) -> None:
+        # `rows` are the current display rows of the `changed` (inserted or updated) licenses that
+        # still match the search. Cells are updated in place, rows added and removed one by one and
+        # the table is only reordered when a change moves a row
+        table = self.query_one(DataTable)
+        cursor_key, offset = None, 0
+        if table.row_count:
+            cursor_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value
+            offset = table.cursor_row - round(table.scroll_y)
+        current = {row[0]: row for row in rows}
+        gone = deleted | (changed - current.keys())
+        for row in self._rows:
+            if row[0] in gone and str(row[0]) in table.rows:
+                table.remove_row(str(row[0]))
+        self._marked -= deleted
+        kept = [row for row in self._rows if row[0] not in gone]
+
+        in_window = self._window_filter(kept)
+        window = {row[0]: row for row in kept}
+        for license_id, row in current.items():
+            if license_id in window and not in_window(row):
+                table.remove_row(str(license_id))
+                del window[license_id]
+            elif license_id in window:
+                for column, (old, new) in zip(LicenseDB.DISPLAY_COLUMNS, zip(window[license_id], row)):
+                    if old != new: table.update_cell(str(license_id), column, "" if new is None else new)
+                window[license_id] = row
+            elif in_window(row):
+                self._table_add_row(table, row)
+                window[license_id] = row
 
-    def _load_licenses(self) -> None:
-        licenses = self.license_db.list_licenses()
-        if not licenses: return
-        for license in licenses:
-            self._table_add_license(license)
+        self._rows = sorted(window.values(), key=self._sort_key, reverse=self._descending)
+        order = {str(row[0]): index for index, row in enumerate(self._rows)}
+        if [row.key.value for row in table.ordered_rows] != list(order):
+            table.sort("id", key=lambda license_id: order[str(license_id)])
+        # keep the cursor on the same license at the same height in the viewport
+        if cursor_key in order and order[cursor_key] != table.cursor_row:
+            cursor_row = order[cursor_key]
+            self._restoring = True
+            table.move_cursor(row=cursor_row, scroll=False)
 
-    def _change_db(self, db_file: Path|None) -> None:
+            def restore_scroll() -> None:
+                table.scroll_to(y=max(0, cursor_row - offset), animate=False, immediate=True)
+                self._restoring = False
+            self.call_after_refresh(restore_scroll)
+
+    def _sort_key(self, row: tuple) -> tuple:
+        # the order of LicenseDB.list_license_page: SQLite's NULL < numbers < text < blobs, then id
+        value = row[LicenseDB.DISPLAY_COLUMNS.index(self._sort)]
+        rank = 0 if value is None else 1 if isinstance(value, (int, float)) else 2 if isinstance(value, str) else 3
+        return (rank, value if value is not None else 0, row[0])
+
+    def _window_filter(self, rows: list[tuple]):
+        # whether a row sorts into the loaded slice, an end that was reached is open
+        first = None if self._at_start or not rows else self._sort_key(rows[0])
+        last = None if self._at_end or not rows else self._sort_key(rows[-1])
+        if self._descending: first, last = last, first
+
+        def in_window(row: tuple) -> bool:
+            key = self._sort_key(row)
+            return (first is None or key >= first) and (last is None or key <= last)
+        return in_window
+
+    async def _load_around_cursor(self) -> None:
+        # reload in the current order with the highlighted license in the middle of the window
+        table = self.query_one(DataTable)
+        if not table.row_count:
+            await self._load_licenses()
+            return
+        cursor_id = int(str(table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value))
+        anchor = next(row for row in self._rows if row[0] == cursor_id)
+        self._generation += 1
+        self._loading_page = False
+        before = await self._fetch_page(before=anchor)
+        if before is None: return
+        after = await self._fetch_page(after=anchor)
+        if after is None: return
+        self._rows = [*before, anchor, *after]
+        self._at_start = len(before) < self.PAGE_SIZE
+        self._at_end = len(after) < self.PAGE_SIZE
+        self._render_rows()
+
+    async def _load_next_page(self) -> None:
+        if self._at_end: return
+        rows = await self._fetch_page(after=self._rows[-1] if self._rows else None)
+        if rows is None: return
+        if len(rows) < self.PAGE_SIZE:
+            self._at_end = True
+        if not rows: return
+        self._rows.extend(rows)
+        evict = len(self._rows) - self.MAX_PAGES * self.PAGE_SIZE
+        if evict > 0:
+            del self._rows[:evict]
+            self._at_start = False
+            self._render_rows()
+        else:
+            self._table_add_rows(self.query_one(DataTable), rows)
+
+    async def _load_previous_page(self) -> None:
+        if self._at_start or not self._rows: return
+        rows = await self._fetch_page(before=self._rows[0])
+        if rows is None: return
+        if len(rows) < self.PAGE_SIZE:
+            self._at_start = True
+        if not rows: return
+        self._rows[:0] = rows
+        evict = len(self._rows) - self.MAX_PAGES * self.PAGE_SIZE
+        if evict > 0:
+            del self._rows[-evict:]
+            self._at_end = False
+        self._render_rows()
+
+    async def _fetch_page(self, after: tuple|None = None, before: tuple|None = None) -> list[tuple]|None:
+        # the page following `after` or preceding `before`, both display rows, in the current order.
+        # None when a page is already in flight or the view was reloaded while fetching
+        if self._loading_page: return None
+        generation = self._generation
+        self._loading_page = True
+        sort_index = LicenseDB.DISPLAY_COLUMNS.index(self._sort)
+        try:
+            rows = await self.license_db.list_license_page(
+                (after[sort_index], after[0]) if after else None, self.PAGE_SIZE, self._search,
+                self._sort, self._descending, before=(before[sort_index], before[0]) if before else None)
+        finally:
+            if generation == self._generation: self._loading_page = False
+        if generation != self._generation: return None
+        return rows or []
+
+    def _render_rows(self, cursor_id: int|None = None) -> None:
+        # rebuild the table from the window, keeping the cursor on the same license (or on
+        # `cursor_id`) and the cursor at the same height in the viewport
+        table = self.query_one(DataTable)
+        offset = 0
+        if table.row_count:
+            if cursor_id is None: cursor_id = int(str(table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value))
+            offset = table.cursor_row - round(table.scroll_y)
+        self._restoring = True
+        self._table_clear_licenses()
+        self._table_add_rows(table, self._rows)
+        cursor_row = next((index for index, row in enumerate(self._rows) if row[0] == cursor_id), 0)
+        table.move_cursor(row=cursor_row, scroll=False)
+
+        def restore_scroll() -> None:
+            table.scroll_to(y=max(0, cursor_row - offset), animate=False, immediate=True)
+            self._restoring = False
+        self.call_after_refresh(restore_scroll)
+
+    async def _change_db(self, db_file: Path|None) -> None:
         if db_file:
-            self.app.ctx["license_db"] = str(db_file)
-            self.license_db_path = str(db_file)
-            self.license_db.change_db(db_file)
-            self._table_clear_licenses()
-            self._load_licenses()
+            try:
+                await self.license_db.change_db(str(db_file))
+            except (sqlite3.Error, RuntimeError, OSError) as e:
+                # the previous database was closed, show an empty table rather than stale rows
+                self.license_db_path = None
+                self.app.notify(f"Could not open license database: {e}", severity="error")
+            else:
+                self.license_db_path = str(db_file)
+                self.ctx["license_db"] = str(db_file)
+            self._marked.clear()
+            await self._load_licenses()
+
+    def _update_sort_labels(self, table: DataTable) -> None:
+        for label, key in zip(self.COLUMNS, LicenseDB.DISPLAY_COLUMNS):
+            column = table.columns[ColumnKey(key)]
+            if key == self._sort: label += self.SORT_ARROWS[self._descending]
+            column.label = Text(label)
+            column.content_width = max(column.content_width, column.label.cell_len)
+        table.refresh()
 
     def _db_folder(self) -> Path:
         if self.license_db_path is not None: license_db_folder = os.path.dirname(os.path.realpath(self.license_db_path))
@@ -121,119 +639,34 @@ class LicenseTablePane(TabPane):
 
     def _table_add_license(self, license_data: dict) -> None:
         table = self.query_one(DataTable)
-        key = table.add_row(
-            license_data.get("id", ""),
-            license_data.get("customer", ""),
-            license_data.get("product", ""),
-            license_data.get("issued_at", ""),
-            license_data.get("expires_at", ""),
-            license_data.get("features", ""),
-            license_data.get("hwid", ""),
-            key=str(license_data["id"])
-        )
+        row = tuple(license_data.get(column, "") for column in LicenseDB.DISPLAY_COLUMNS)
+        self._rows.append(row)
+        self._table_add_row(table, row)
+
+    def _table_add_rows(self, table: DataTable, rows: list[tuple]) -> None:
+        with timer("table.add_rows", rows=len(rows)):
+            for row in rows:
+                self._table_add_row(table, row)
+
+    def _table_add_row(self, table: DataTable, row: tuple) -> None:
+        # row holds LicenseDB.DISPLAY_COLUMNS, id first
+        mark = self.MARK if row[0] in self._marked else ""
+        table.add_row(mark, *("" if value is None else value for value in row), key=str(row[0]))
 
     def _table_remove_license(self, license_key: str) -> None:
         table = self.query_one(DataTable)
         table.remove_row(str(license_key))
+        self._marked.discard(int(license_key))
+        self._rows = [row for row in self._rows if row[0] != int(license_key)]
 
     def _table_clear_licenses(self) -> None:
         table = self.query_one(DataTable)
-        table.clear()
+        with timer("table.clear", rows=table.row_count):
+            table.clear()
 
-    def _get_selected_license(self) -> dict|None:
+    async def _get_selected_license(self) -> dict|None:
         table = self.query_one(DataTable)
-        row_data = table.get_row_at(table.cursor_coordinate.row)
-        license_data = self.license_db.get_license(row_data[0])
+        if not table.row_count: return None
+        row_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key
+        license_data = await self.license_db.get_license(int(str(row_key.value)))
         return license_data
-
-class LicenseDB:
-    def __init__(self, db_path: str) -> None:
-        """Initialize connection to a SQLite3 database."""
-        self.conn = None
-        if db_path and len(db_path):
-            self.db_path = db_path
-            self.conn: Optional[sqlite3.Connection] = None
-            self._connect()
-            self._init_schema()
-
-    def connected(self) -> bool:
-        return self.conn is not None
-
-    def change_db(self, new_path: Path) -> None:
-        """Switch to a different database file."""
-        self.db_path = new_path
-        self._connect()
-        self._init_schema()
-
-    def add_license(self, license_data: dict) -> int|None:
-        if not self.conn: return
-
-        with self.conn:
-            cur = self.conn.execute(
-                """
-                INSERT INTO licenses (customer, product, issued_at, expires_at, features, hwid, signature, canonical)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (license_data.get("customer", ""),
-                 license_data.get("product", ""), 
-                 license_data.get("issued_at", ""), 
-                 license_data.get("expires_at", ""), 
-                 license_data.get("features", ""), 
-                 license_data.get("hwid", ""),
-                 license_data.get("signature", ""),
-                 license_data.get("canonical", ""))
-            )
-
-            return cur.lastrowid
-
-    def get_license(self, license_id: int) -> Optional[Dict[str, Any]]:
-        if not self.conn: return
-        """Retrieve a license by its ID."""
-        cur = self.conn.execute("SELECT * FROM licenses WHERE id = ?", (license_id,))
-        row = cur.fetchone()
-        return dict(row) if row else None
-
-    def list_licenses(self) -> Optional[List[Dict[str, Any]]]:
-        if not self.conn: return None
-        """Retrieve all licenses."""
-        cur = self.conn.execute("SELECT * FROM licenses")
-        return [dict(row) for row in cur.fetchall()]
-
-    def delete_license(self, license_id: int) -> bool:
-        if not self.conn: return False
-        """Delete a license. Returns True if deleted."""
-        with self.conn:
-            cur = self.conn.execute("DELETE FROM licenses WHERE id = ?", (license_id,))
-            return cur.rowcount > 0
-
-    def close(self) -> None:
-        if self.conn:
-            self.conn.close()
-            self.conn = None
-
-    def _connect(self) -> None:
-        if self.conn:
-            self.conn.close()
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row  # results as dict-like rows
-
-    def _init_schema(self) -> None:
-        if not self.conn: return
-        """Ensure the licenses table exists."""
-        with self.conn:
-            self.conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS licenses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    customer TEXT,
-                    product TEXT,
-                    issued_at TEXT,
-                    expires_at TEXT,
-                    features TEXT,
-                    hwid TEXT NOT NULL,
-                    signature TEXT NOT NULL,
-                    canonical TEXT NOT NULL
-                )
-                """
-            )
\ No newline at end of file
@@ -0,0 +1,69 @@
+from textual import on, work
+from textual.app import ComposeResult
+from textual.widgets import TabPane, DataTable, Button, Static
+from textual.containers import Horizontal
+from license_manager.utils.instrumentation import instrumentation
+from pathlib import Path
+
+class PerformancePane(TabPane):
+    """Live latency stats of the instrumented hooks, with the JSONL timing log switch."""
+
+    COLUMNS = ("Hook", "Calls", "Rows", "Mean ms", "p50 ms", "p95 ms", "p99 ms", "Max ms")
+    # seconds between refreshes while the pane is shown
+    REFRESH_INTERVAL = 1.0
+
+    def compose(self) -> ComposeResult:
+        with Horizontal(classes="performance_actions"):
+            yield Button("Reset", id="reset_stats")
+            yield Button("Start Log", id="toggle_timing_log")
+            yield Static("", id="timing_log_status")
+        yield DataTable(zebra_stripes=True, cursor_type="row", id="stats_table")
+
+    def on_mount(self) -> None:
+        table = self.query_one(DataTable)
+        for label in self.COLUMNS:
+            table.add_column(label, key=label)
+        self._update_log_status()
+        self.set_interval(self.REFRESH_INTERVAL, self._refresh_stats)
+
+    @on(Button.Pressed, "#reset_stats")
+    def on_reset_stats(self, event: Button.Pressed) -> None:
+        event.stop()
+        instrumentation.reset()
+        self.query_one(DataTable).clear()
+
+    @work
+    @on(Button.Pressed, "#toggle_timing_log")
+    async def on_toggle_timing_log(self, event: Button.Pressed) -> None:
+        event.stop()
+        if instrumentation.log_path:
+            instrumentation.stream_to(None)
+        else:
+            from textual_fspicker import FileSave, Filters
+            log_file = await self.app.push_screen_wait(
+                FileSave(title="Stream Timings To",
+                         filters=Filters(
+                            ("JSONL", lambda p: p.suffix.lower() == ".jsonl"),
+                            ("All", lambda _: True)
+                         ),
+                         default_file=Path("timings.jsonl")))
+            if not log_file: return
+            instrumentation.stream_to(str(log_file))
+        self._update_log_status()
+
+    def _refresh_stats(self) -> None:
+        if not self.display: return
+        table = self.query_one(DataTable)
+        for name, stats in sorted(instrumentation.snapshot().items()):
+            values = (name, stats.count, stats.rows, f"{stats.mean_ms:.2f}", f"{stats.percentile_ms(0.5):.2f}",
+                      f"{stats.percentile_ms(0.95):.2f}", f"{stats.percentile_ms(0.99):.2f}", f"{stats.max * 1000:.2f}")
+            if name in table.rows:
+                for label, value in zip(self.COLUMNS[1:], values[1:]):
+                    table.update_cell(name, label, value)
+            else:
+                table.add_row(*values, key=name)
+
+    def _update_log_status(self) -> None:
+        log_path = instrumentation.log_path
+        self.query_one("#toggle_timing_log", Button).label = "Stop Log" if log_path else "Start Log"
+        self.query_one("#timing_log_status", Static).update(f"Logging timings to {log_path}" if log_path else "")
@@ -1,41 +1,52 @@
 from textual import on, work
 from textual.app import ComposeResult
-from textual.widgets import TabPane, Button, Static, Label, Input
+from textual.widgets import TabPane, Button, Static, Label, Input, DataTable
 from textual.containers import Horizontal, Container
-from textual_fspicker import FileOpen, FileSave
-from nacl import signing, encoding
 from pathlib import Path
+from typing import TYPE_CHECKING, cast
 import os
-import base64
-import pyperclip
-
-class SigningAuthority():
-    def __init__(self, signing_key: signing.SigningKey|None= None, signing_key_str: str|None = None, signing_key_file: str|None = None) -> None:
-        if signing_key:
-            self.signing_key = signing_key
-        elif signing_key_str:
-            self.signing_key = signing.SigningKey(signing_key_str.encode('utf-8'), encoder=encoding.URLSafeBase64Encoder)
-        elif signing_key_file:
-            with open(signing_key_file, 'r') as f:
-                key_data = f.read().strip()
-            self.signing_key = signing.SigningKey(key_data.encode('utf-8'), encoder=encoding.URLSafeBase64Encoder)
-        else:
-            self.signing_key = signing.SigningKey.generate()
-
-    def get_signing_key(self) -> str:
-        return self.signing_key.encode(encoder=encoding.URLSafeBase64Encoder).decode('utf-8')
-
-    def get_verification_key(self) -> str:
-        return self.signing_key.verify_key.encode(encoder=encoding.URLSafeBase64Encoder).decode('utf-8')
-
-    def sign(self, data: str) -> str:
-        signed = self.signing_key.sign(data.encode('utf-8')).signature
-        return base64.urlsafe_b64encode(signed).decode('utf-8')
-    
+
+# nacl, the file pickers and the clipboard are only imported once a key is generated, opened,
+# saved or copied, which keeps them out of startup
+if TYPE_CHECKING:
+    from license_manager.app import RightHandLicenseManager
+    from license_manager.utils.app_context import AppContext
+    from license_manager.utils.keyring import Keyring
+    from license_manager.utils.signing import SigningAuthority
+
+def key_file_errors() -> tuple[type[Exception], ...]:
+    """What reading a key file raises: OSError, ValueError for text that isn't a urlsafe base64 key and
+    nacl's errors for a key it rejects. Only called in except clauses, so nacl is imported on an error."""
+    from nacl.exceptions import CryptoError
+    return (OSError, ValueError, CryptoError)
+
 class SigningAuthorityPane(TabPane):
+    KEYRING_COLUMNS = ("Key ID", "Default", "Products", "File")
+
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
-        self.signing_authority: SigningAuthority|None = None
+        self._keyring: "Keyring|None" = None
+        # key id of the key shown in the key fields
+        self._shown: str|None = None
+
+    @property
+    def keyring(self) -> "Keyring":
+        """Every key generated or opened this session, loaded once and kept in memory."""
+        if self._keyring is None:
+            from license_manager.utils.keyring import Keyring
+            self._keyring = Keyring()
+        return self._keyring
+
+    @property
+    def signing_authority(self) -> "SigningAuthority|None":
+        """The default key, signing every product without a key of its own."""
+        if self._keyring is None: return None
+        return self._keyring.get(self._keyring.default)
+
+    @property
+    def ctx(self) -> "AppContext":
+        """The app's persistent state."""
+        return cast("RightHandLicenseManager", self.app).ctx
 
     def compose(self) -> ComposeResult:
         with Container(id="signing_authority_container"):
@@ -43,6 +54,8 @@ class SigningAuthorityPane(TabPane):
                 yield Button("Generate Keys", id="generate")
                 yield Button("Open Keys", id="open")
                 yield Button("Save Keys", id="save")
+                yield Button("Make Default", id="make_default")
+                yield Button("Remove", id="remove_key")
             with Horizontal():
                 yield Static("Current Key:", classes="option_label")
                 yield Input("", disabled=True, id="current_key", classes="crypto_key")
@@ -53,23 +66,41 @@ class SigningAuthorityPane(TabPane):
                 yield Static("Verification Key:", classes="option_label")
                 yield Input("", disabled=True, id="verification_key", classes="crypto_key")
                 yield Button("Copy", id="copy_verification_key")
+            with Horizontal():
+                yield Static("Products:", classes="option_label")
+                yield Input("", placeholder="products signed with this key (CSV)", id="key_products", classes="crypto_key")
+            yield DataTable(cursor_type="row", id="keyring_table")
         yield Container()
 
     def on_mount(self) -> None:
-        last_key = self.app.ctx["last_key"]
-        if (last_key): self._load_key(last_key)
-        pass
+        table = self.query_one("#keyring_table", DataTable)
+        for label in self.KEYRING_COLUMNS:
+            table.add_column(label, key=label)
+        # the pane isn't the first tab, load the keys once the first frame is on screen
+        if self.ctx["last_key"] or self.ctx["keyring"]: self.call_after_refresh(self._load_keyring)
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         event.stop()
         if event.button.id == "generate":
-            self.signing_authority = SigningAuthority()
-            self.query_one("#signing_key", Input).value = self.signing_authority.get_signing_key()
-            self.query_one("#verification_key", Input).value = self.signing_authority.get_verification_key()
-            self.query_one("#current_key", Input).value = ""
+            from license_manager.utils.signing import SigningAuthority
+            key_id = self.keyring.add(SigningAuthority())
+            self.keyring.default = key_id
+            self._show_key(key_id)
+            self._remember_key(key_id)
+        elif event.button.id == "make_default":
+            if self._shown:
+                self.keyring.default = self._shown
+                if key_file := self.keyring.key_file(self._shown): self.ctx["last_key"] = key_file
+                self._refresh_keyring_table()
+        elif event.button.id == "remove_key":
+            if self._shown:
+                self.keyring.remove(self._shown)
+                self._save_keyring()
+                self._show_key(self.keyring.default)
         elif event.button.id == "copy_verification_key":
-            if self.signing_authority:
-                pyperclip.copy(self.signing_authority.get_verification_key())
+            if authority := self.keyring.get(self._shown):
+                import pyperclip
+                pyperclip.copy(authority.get_verification_key())
                 self.app.notify("Verification key copied to clipboard", severity="information")
             else:
                 self.app.notify("No signing authority loaded", severity="warning")
@@ -77,35 +108,117 @@ class SigningAuthorityPane(TabPane):
     @on(Button.Pressed, "#open")
     @work
     async def open_key(self) -> None:
+        from textual_fspicker import FileOpen
         if open_key := await self.app.push_screen_wait(FileOpen(title="Open Signing Key File", location=self._key_folder())):
-            self._load_key(str(open_key))
-            self.app.ctx["last_key"] = str(open_key)
+            try:
+                with self.ctx.batch():
+                    self._load_key(str(open_key))
+                    self._save_keyring()
+            except key_file_errors() as e:
+                self.app.notify(f"Can't open key file {open_key}: {e}", severity="error")
 
     @on(Button.Pressed, "#save")
     @work
     async def save_key(self) -> None:
-        if self.signing_authority is None:
+        if self.keyring.get(self._shown) is None:
             self.app.notify("No signing authority to save", severity="warning")
             return
+        from textual_fspicker import FileSave
         if save_key := await self.app.push_screen_wait(FileSave(title="Save Signing Key File", location=self._key_folder())):
             self._save_key(str(save_key))
 
+    @on(Input.Submitted, "#key_products")
+    def on_key_products_submitted(self, event: Input.Submitted) -> None:
+        event.stop()
+        if not self._shown: return
+        self.keyring.assign(self._shown, [product.strip() for product in event.value.split(",") if product.strip()])
+        self._save_keyring()
+        self._refresh_keyring_table()
+
+    @on(DataTable.RowSelected, "#keyring_table")
+    def on_keyring_selected(self, event: DataTable.RowSelected) -> None:
+        event.stop()
+        self._show_key(event.row_key.value)
+
+    def _load_keyring(self) -> None:
+        # a missing, unreadable or corrupted key file is reported and skipped, the other keys still load
+        with self.ctx.batch():
+            for entry in self.ctx["keyring"] or []:
+                try:
+                    key_id = self.keyring.load(entry["file"])
+                except key_file_errors() as e:
+                    self.app.notify(f"Can't open key file {entry['file']}: {e}", severity="warning")
+                    continue
+                self.keyring.assign(key_id, entry["products"])
+                self._remember_key(key_id)
+            if last_key := self.ctx["last_key"]:
+                try:
+                    self._load_key(last_key)
+                    return
+                except key_file_errors() as e:
+                    self.app.notify(f"Can't open key file {last_key}: {e}", severity="warning")
+        self._show_key(self.keyring.default)
+
     def _load_key(self, key_file: str) -> None:
-        self.signing_authority = SigningAuthority(signing_key_file=key_file)
-        self.query_one("#signing_key", Input).value = self.signing_authority.get_signing_key()
-        self.query_one("#verification_key", Input).value = self.signing_authority.get_verification_key()
-        self.query_one("#current_key", Input).value = key_file
+        key_id = self.keyring.load(key_file)
+        # the key opened last signs every product without a key of its own
+        self.keyring.default = key_id
+        with self.ctx.batch():
+            self.ctx["last_key"] = key_file
+            self._remember_key(key_id)
+        self._show_key(key_id)
+
+    def _show_key(self, key_id: str|None) -> None:
+        self._shown = key_id
+        authority = self.keyring.get(key_id)
+        self.query_one("#signing_key", Input).value = authority.get_signing_key() if authority else ""
+        self.query_one("#verification_key", Input).value = authority.get_verification_key() if authority else ""
+        self.query_one("#current_key", Input).value = (self.keyring.key_file(key_id) or "") if key_id else ""
+        self.query_one("#key_products", Input).value = ", ".join(self.keyring.products(key_id)) if key_id else ""
+        self._refresh_keyring_table()
+
+    def _refresh_keyring_table(self) -> None:
+        table = self.query_one("#keyring_table", DataTable)
+        table.clear()
+        for key_id in self.keyring:
+            table.add_row(key_id, "✓" if key_id == self.keyring.default else "", ", ".join(self.keyring.products(key_id)),
+                          self.keyring.key_file(key_id) or "(not saved)", key=key_id)
+        if self._shown is not None and self._shown in self.keyring:
+            table.move_cursor(row=table.get_row_index(self._shown))
+
+    def known_verification_keys(self) -> list[str]:
+        """Verification keys of every signing authority generated or opened so far, oldest first."""
+        return list(self.ctx.get("verification_keys", []))
+
+    def _remember_key(self, key_id: str) -> None:
+        # licenses signed with earlier keys are reported as foreign rather than tampered by audits
+        authority = self.keyring.get(key_id)
+        if authority is None: return
+        verification_key = authority.get_verification_key()
+        known = self.known_verification_keys()
+        if verification_key not in known:
+            self.ctx["verification_keys"] = [*known, verification_key]
+
+    def _save_keyring(self) -> None:
+        # keys that were never saved to a file don't outlive the session
+        self.ctx["keyring"] = [{"file": key_file, "products": self.keyring.products(key_id)}
+                                   for key_id in self.keyring if (key_file := self.keyring.key_file(key_id))]
 
     def _save_key(self, key_file: str) -> None:
-        if self.signing_authority is None: return
+        authority = self.keyring.get(self._shown)
+        if authority is None: return
 
         with open(key_file, "w") as f:
-            f.write(self.signing_authority.get_signing_key())
+            f.write(authority.get_signing_key())
 
-        self.app.ctx["last_key"] = key_file
-        self.query_one("#current_key", Input).value = key_file
+        self.keyring.add(authority, key_file)
+        with self.ctx.batch():
+            if self._shown == self.keyring.default:
+                self.ctx["last_key"] = key_file
+            self._save_keyring()
+        self._show_key(self._shown)
 
     def _key_folder(self) -> Path:
-        if self.app.ctx["last_key"] is not None: key_folder = os.path.dirname(os.path.realpath(self.app.ctx["last_key"]))
+        if self.ctx["last_key"] is not None: key_folder = os.path.dirname(os.path.realpath(self.ctx["last_key"]))
         else: key_folder = "."
-        return Path(key_folder)
\ No newline at end of file
+        return Path(key_folder)
@@ -0,0 +1,91 @@
+# SPDX-FileCopyrightText: 2025-present Mariano Renzi <mariano@renzi.com.ar>
+#
+# SPDX-License-Identifier: MIT
+"""Benchmarks, run one with `python -m tests.benchmarks.<name>` from the repository root.
+
+Each benchmark prints its measurements and writes them as JSON (see `write_results`) so runs on
+different commits or machines can be compared.
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[2]
+RESULTS_DIR = ROOT / "bench_results"
+
+# benchmark this checkout when the package isn't installed in the environment
+if importlib.util.find_spec("license_manager") is None:
+    sys.path.insert(0, str(ROOT / "src"))
+
+# stands in for an Ed25519 signature where only the size matters
+PLACEHOLDER_SIGNATURE = "A" * 86 + "=="
+
+def sample_licenses(count: int, start: int = 0) -> Iterator[dict]:
+    """Licenses with realistic field sizes, unsigned, `start` offsets the generated hwids."""
+    from license_manager.utils.signing import canonical_json
+    for i in range(start, start + count):
+        license_data = {
+            "customer": f"Customer {i % 997}",
+            "product": f"product-{i % 13}",
+            "issued_at": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "expires_at": f"2027-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "features": ",".join(f"feature{j}" for j in range(i % 5)),
+            "hwid": f"{i:016x}",
+            "signature": PLACEHOLDER_SIGNATURE,
+        }
+        license_data["canonical"] = canonical_json(license_data)
+        yield license_data
+
+def timed(function: Callable[[], object], repeat: int = 5) -> list[float]:
+    """Seconds taken by each of `repeat` calls of `function`."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def summarize(samples: list[float]) -> dict:
+    """Min, median and max of timings in seconds, reported in milliseconds."""
+    return {
+        "runs": len(samples),
+        "min_ms": round(min(samples) * 1000, 3),
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+def write_results(name: str, results: dict, path: str|Path|None = None) -> Path:
+    """Write `results` with the environment they were measured in, by default to bench_results/<name>.json."""
+    path = Path(path) if path else RESULTS_DIR / f"{name}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "benchmark": name,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n")
+    return path
+
+def _git_commit() -> str|None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def src_env(**extra: str) -> dict:
+    """Environment for benchmark subprocesses, importing license_manager from this checkout."""
+    env = dict(os.environ, **extra)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (str(ROOT / "src"), env.get("PYTHONPATH"))))
+    return env
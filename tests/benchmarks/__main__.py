@@ -0,0 +1,30 @@
+"""Run every benchmark, writing bench_results/<name>.json for each.
+
+    python -m tests.benchmarks [--quick]
+
+--quick uses small databases and few runs, to check the benchmarks themselves still work.
+"""
+from tests.benchmarks import license_db, service, signing, startup, table
+import argparse
+import sys
+
+def main(argv: list[str]|None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args(argv)
+
+    quick = args.quick
+    failed = 0
+    for name, benchmark, benchmark_args in (
+        ("startup", startup.main, ["--runs", "3"] if quick else []),
+        ("license_db", license_db.main, ["--sizes", "10000", "--ops", "200"] if quick else []),
+        ("signing", signing.main, ["--count", "2000", "--runs", "2"] if quick else []),
+        ("table", table.main, ["--size", "10000", "--runs", "1", "--pages", "2"] if quick else []),
+        ("service", service.main, ["--duration", "1", "--connections", "8"] if quick else []),
+    ):
+        print(f"== {name}")
+        failed |= benchmark(benchmark_args)
+    return failed
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""LicenseDB benchmark: add, list, page, get and delete at growing database sizes.
+
+    python -m tests.benchmarks.license_db [--sizes 10000 100000 1000000] [--ops 1000]
+
+Databases are built once per size in a temporary folder with add_licenses, every operation is
+then timed against the same file.
+"""
+from license_manager.utils.license_db import LicenseDB
+from tests.benchmarks import sample_licenses, summarize, timed, write_results
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+def build_db(path: str, size: int, batch_size: int = 10000) -> float:
+    """Fill a new database at `path` with `size` licenses, returns the seconds it took."""
+    db = LicenseDB(path)
+    start = time.perf_counter()
+    for offset in range(0, size, batch_size):
+        db.add_licenses(sample_licenses(min(batch_size, size - offset), offset))
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed
+
+def bench_size(path: str, size: int, ops: int) -> dict:
+    results: dict = {"build_s": round(build_db(path, size), 3), "file_mb": 0.0}
+    db = LicenseDB(path)
+    rng = random.Random(size)
+    try:
+        ids = [rng.randint(1, size) for _ in range(ops)]
+        start = time.perf_counter()
+        for license_id in ids:
+            db.get_license(license_id)
+        results["get_license_us"] = round((time.perf_counter() - start) / ops * 1e6, 2)
+
+        new_licenses = list(sample_licenses(ops, size))
+        start = time.perf_counter()
+        added = [db.add_license(license_data) for license_data in new_licenses]
+        results["add_license_us"] = round((time.perf_counter() - start) / ops * 1e6, 2)
+
+        start = time.perf_counter()
+        for license_id in added:
+            db.delete_license(license_id)
+        results["delete_license_us"] = round((time.perf_counter() - start) / ops * 1e6, 2)
+
+        results["first_page"] = summarize(timed(lambda: db.list_license_page(limit=200), repeat=20))
+        deep = (size - 300, size - 300)
+        results["deep_page"] = summarize(timed(lambda: db.list_license_page(deep, limit=200), repeat=20))
+        results["sorted_page"] = summarize(timed(lambda: db.list_license_page(limit=200, sort="expires_at", descending=True), repeat=20))
+        search = LicenseDB.fts_query("product-7")
+        results["search_page"] = summarize(timed(lambda: db.list_license_page(limit=200, search=search), repeat=20))
+        # every row as dicts, this is what mounting the table used to do
+        results["list_licenses"] = summarize(timed(db.list_licenses, repeat=3))
+    finally:
+        db.close()
+    results["file_mb"] = round(os.path.getsize(path) / 2**20, 1)
+    return results
+
+def main(argv: list[str]|None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--ops", type=int, default=1000, help="single-row operations timed per size")
+    parser.add_argument("--output", help="results file (default: bench_results/license_db.json)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for size in args.sizes:
+            result = results[str(size)] = bench_size(os.path.join(folder, f"licenses-{size}.db"), size, args.ops)
+            print(f"{size:>9} rows: built in {result['build_s']:.1f}s ({result['file_mb']} MB), "
+                  f"add {result['add_license_us']:.0f}us, get {result['get_license_us']:.0f}us, "
+                  f"delete {result['delete_license_us']:.0f}us, page {result['first_page']['median_ms']:.2f}ms, "
+                  f"deep page {result['deep_page']['median_ms']:.2f}ms, sorted page {result['sorted_page']['median_ms']:.2f}ms, "
+                  f"search page {result['search_page']['median_ms']:.2f}ms, list all {result['list_licenses']['median_ms']:.0f}ms")
+    print(f"results written to {write_results('license_db', results, args.output)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
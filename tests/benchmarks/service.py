@@ -0,0 +1,151 @@
+"""Licensing service load test: requests per second and latency of each endpoint under concurrency.
+
+    python -m tests.benchmarks.service [--connections 64] [--duration 5]
+    python -m tests.benchmarks.service --socket /run/rhlm.sock   # an already running `rhlm serve`
+
+Without --socket or --port a server is started with `rhlm serve` on a temporary database, key and
+Unix socket. Every endpoint is then loaded in turn by `--connections` keep-alive connections,
+each sending its next request as soon as the previous answer arrives.
+"""
+from license_manager.utils.signing import SigningAuthority
+from tests.benchmarks import write_results, src_env
+from typing import Any
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+class Client:
+    """One keep-alive HTTP/1.1 connection to the service."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, socket: str|None, host: str, port: int) -> "Client":
+        if socket:
+            return cls(*await asyncio.open_unix_connection(socket))
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def request(self, method: str, target: str, body: object = None) -> tuple[int, Any]:
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.writer.write(f"{method} {target} HTTP/1.1\r\nHost: rhlm\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length": length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self) -> None:
+        self.writer.close()
+
+def license_fields(i: int) -> dict:
+    return {"customer": f"Customer {i % 997}", "product": f"product-{i % 13}", "expires_at": "2027-01-31",
+            "features": "feature0,feature1", "hwid": f"load-{i:012x}"}
+
+async def load(clients: list[Client], duration: float, make_request) -> dict:
+    """Keep every client busy with `make_request(i)` requests for `duration` seconds."""
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(10**12))
+    deadline = time.perf_counter() + duration
+
+    async def worker(client: Client) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            method, target, body = make_request(next(counter))
+            start = time.perf_counter()
+            status, _ = await client.request(method, target, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200: errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(client) for client in clients))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_sec": round(len(latencies) / elapsed),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+async def run(args: argparse.Namespace) -> dict:
+    clients = [await Client.connect(args.socket, args.host, args.port) for _ in range(args.connections)]
+    try:
+        results: dict = {"connections": args.connections, "duration_s": args.duration}
+        signed: list[dict] = []
+
+        def sign(i: int):
+            return "POST", "/sign", license_fields(i)
+        results["sign"] = await load(clients, args.duration, sign)
+        # licenses to verify and look up
+        for i in range(0, 200):
+            signed.append((await clients[0].request("POST", "/sign", license_fields(10**9 + i)))[1])
+
+        rng = random.Random(0)
+        # as a pipeline would send a license file it was handed, without the database id
+        submitted = [{name: value for name, value in license_data.items() if name != "id"} for license_data in signed]
+        results["verify"] = await load(clients, args.duration, lambda i: ("POST", "/verify", rng.choice(submitted)))
+        results["verify_by_id"] = await load(clients, args.duration, lambda i: ("POST", "/verify", {"id": rng.choice(signed)["id"]}))
+        results["lookup"] = await load(clients, args.duration, lambda i: ("GET", f"/lookup?hwid={rng.choice(signed)['hwid']}", None))
+        results["list"] = await load(clients, args.duration, lambda i: ("GET", f"/licenses?after={rng.randint(0, 1000)}&limit=50", None))
+        return results
+    finally:
+        for client in clients:
+            client.close()
+
+def main(argv: list[str]|None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=64, help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds each endpoint is loaded")
+    parser.add_argument("--socket", help="Unix socket of a running server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="TCP port of a running server")
+    parser.add_argument("--output", help="results file (default: bench_results/service.json)")
+    args = parser.parse_args(argv)
+
+    server = None
+    with tempfile.TemporaryDirectory() as folder:
+        if not args.socket and not args.port:
+            key_file = os.path.join(folder, "signing.key")
+            with open(key_file, "w") as f:
+                f.write(SigningAuthority().get_signing_key())
+            args.socket = os.path.join(folder, "rhlm.sock")
+            server = subprocess.Popen([sys.executable, "-m", "license_manager", "serve", "--db", os.path.join(folder, "licenses.db"),
+                                       "--key", key_file, "--socket", args.socket],
+                                      env=src_env(XDG_CONFIG_HOME=folder), stderr=subprocess.DEVNULL)
+            deadline = time.monotonic() + 30
+            while not os.path.exists(args.socket):
+                if server.poll() is not None or time.monotonic() > deadline:
+                    print("service did not start", file=sys.stderr)
+                    return 1
+                time.sleep(0.05)
+        try:
+            results = asyncio.run(run(args))
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    for name in ("sign", "verify", "verify_by_id", "lookup", "list"):
+        stats = results[name]
+        print(f"{name:13} {stats['requests_per_sec']:>7} req/s  p50 {stats['p50_ms']:.2f} ms  p99 {stats['p99_ms']:.2f} ms"
+              f"  ({stats['errors']} errors)")
+    print(f"results written to {write_results('service', results, args.output)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Signing benchmark: SigningAuthority.sign throughput and canonical payload building.
+
+    python -m tests.benchmarks.signing [--count 20000]
+
+The payload is built the way LicenseDataFormModal.do_sign builds it, from the form values.
+"""
+from datetime import date
+from license_manager.utils.signing import SigningAuthority, canonical_json
+from tests.benchmarks import summarize, timed, write_results
+import argparse
+import sys
+
+def form_data(i: int) -> dict:
+    return {
+        "customer": f"Customer {i % 997}",
+        "product": f"product-{i % 13}",
+        "issued_at": date.today().strftime("%Y-%m-%d"),
+        "expires_at": "2027-01-31",
+        "features": "feature0,feature1,feature2",
+        "hwid": f"{i:016x}",
+    }
+
+def main(argv: list[str]|None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20000, help="payloads built and signed per run")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="results file (default: bench_results/signing.json)")
+    args = parser.parse_args(argv)
+
+    signer = SigningAuthority()
+    payloads = [canonical_json(form_data(i)) for i in range(args.count)]
+    canonical = timed(lambda: [canonical_json(form_data(i)) for i in range(args.count)], args.runs)
+    sign = timed(lambda: [signer.sign(payload) for payload in payloads], args.runs)
+    results = {
+        "count": args.count,
+        "canonical_json": summarize(canonical),
+        "canonical_json_per_sec": round(args.count / min(canonical)),
+        "sign": summarize(sign),
+        "sign_per_sec": round(args.count / min(sign)),
+    }
+    print(f"canonical json: {results['canonical_json_per_sec']} payloads/sec")
+    print(f"sign:           {results['sign_per_sec']} signatures/sec")
+    print(f"results written to {write_results('signing', results, args.output)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Startup benchmark: import time and time to first paint of the UI in headless mode.
+
+    python -m tests.benchmarks.startup [--runs 10] [--db licenses.db] [--max-first-paint-ms 800]
+
+Every run is a fresh interpreter with its own empty config folder, so nothing is cached between
+runs except by the OS. Fails when a module that should only load on first use was imported by
+the time the first frame is painted, or when the median time to first paint exceeds the budget.
+"""
+from pathlib import Path
+from tests.benchmarks import summarize, src_env, write_results
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+
+# only needed once a button is pressed, must not be imported before the first paint
+DEFERRED_MODULES = ("nacl", "pyperclip", "textual_fspicker", "textual_timepiece")
+
+def measure_import(module: str) -> float:
+    """Seconds to import `module` in a fresh interpreter."""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    output = subprocess.run([sys.executable, "-c", code], env=src_env(), capture_output=True, text=True, check=True)
+    return float(output.stdout)
+
+def measure_startup(db: str|None = None) -> dict:
+    """Run the UI once headless in a fresh interpreter and return the child's measurements."""
+    with tempfile.TemporaryDirectory() as config_home:
+        if db:
+            context = Path(config_home, "rhlm", "context.json")
+            context.parent.mkdir()
+            context.write_text(json.dumps({"license_db": str(Path(db).resolve())}))
+        result = Path(config_home, "result.json")
+        subprocess.run([sys.executable, "-m", "tests.benchmarks.startup", "--child", str(result)],
+                       env=src_env(XDG_CONFIG_HOME=config_home), check=True)
+        return json.loads(result.read_text())
+
+def _child(result: str) -> None:
+    start = time.perf_counter()
+    from license_manager.app import RightHandLicenseManager
+    from textual.widgets import DataTable
+    imported = time.perf_counter()
+    timings: dict = {}
+
+    async def auto_pilot(pilot) -> None:
+        app = pilot.app
+        # ready to process input, let the pending refresh paint the first frame
+        await pilot.pause()
+        timings["first_paint"] = time.perf_counter() - start
+        timings["deferred_loaded"] = [module for module in DEFERRED_MODULES if module in sys.modules]
+        table = app.query_one("#license_table", DataTable)
+        if app.ctx["license_db"]:
+            deadline = time.perf_counter() + 30
+            while not table.row_count and time.perf_counter() < deadline:
+                await pilot.pause(0.005)
+        timings["table_loaded"] = time.perf_counter() - start
+        timings["rows"] = table.row_count
+        app.exit()
+
+    RightHandLicenseManager().run(headless=True, size=(120, 40), auto_pilot=auto_pilot)
+    timings["import"] = imported - start
+    Path(result).write_text(json.dumps(timings))
+
+def main(argv: list[str]|None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--db", help="license database to open, the table starts empty without one")
+    parser.add_argument("--max-first-paint-ms", type=float, help="fail when the median time to first paint is higher")
+    parser.add_argument("--output", help="results file (default: bench_results/startup.json)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        _child(args.child)
+        return 0
+
+    cli_import = [measure_import("license_manager.__main__") for _ in range(args.runs)]
+    runs = [measure_startup(args.db) for _ in range(args.runs)]
+    deferred_loaded = sorted({module for run in runs for module in run["deferred_loaded"]})
+    results = {
+        "cli_import": summarize(cli_import),
+        "ui_import": summarize([run["import"] for run in runs]),
+        "first_paint": summarize([run["first_paint"] for run in runs]),
+        "table_loaded": summarize([run["table_loaded"] for run in runs]),
+        "rows": runs[0]["rows"],
+        "deferred_loaded": deferred_loaded,
+    }
+    path = write_results("startup", results, args.output)
+
+    for name in ("cli_import", "ui_import", "first_paint", "table_loaded"):
+        print(f"{name:14} median {results[name]['median_ms']:8.1f} ms  (min {results[name]['min_ms']:.1f}, max {results[name]['max_ms']:.1f})")
+    print(f"results written to {path}")
+
+    failed = False
+    if deferred_loaded:
+        print(f"imported before the first paint: {', '.join(deferred_loaded)}", file=sys.stderr)
+        failed = True
+    if args.max_first_paint_ms and results["first_paint"]["median_ms"] > args.max_first_paint_ms:
+        print(f"median time to first paint {results['first_paint']['median_ms']:.1f} ms is over {args.max_first_paint_ms} ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
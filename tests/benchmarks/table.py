@@ -0,0 +1,85 @@
+"""License table benchmark: mounting and populating LicenseTablePane in a headless app.
+
+    python -m tests.benchmarks.table [--size 100000] [--runs 5]
+
+Times the app from construction until the first page is in the table, each page down key press
+while scrolling through several pages and re-sorting by a column, against a database of `size`
+licenses.
+"""
+from pathlib import Path
+from tests.benchmarks import summarize, write_results
+from tests.benchmarks.license_db import build_db
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+async def run_once(pages: int) -> dict:
+    from license_manager.app import RightHandLicenseManager
+    from license_manager.widgets.license_table import LicenseTablePane
+    from textual.widgets import DataTable
+
+    start = time.perf_counter()
+    app = RightHandLicenseManager()
+    async with app.run_test(size=(160, 50)) as pilot:
+        table = app.query_one("#license_table", DataTable)
+        while not table.row_count:
+            await pilot.pause(0.001)
+        populated = time.perf_counter() - start
+
+        pane = app.query_one(LicenseTablePane)
+        table.focus()
+        start = time.perf_counter()
+        # the window evicts rows, so follow the highlighted license rather than the cursor row
+        target = pages * pane.PAGE_SIZE
+        presses = 0
+        while int(str(table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value)) < target:
+            await pilot.press("pagedown")
+            presses += 1
+        # per key press, each one waits for the table to settle
+        paged = (time.perf_counter() - start) / presses
+
+        start = time.perf_counter()
+        column = table.ordered_columns[5]
+        table.post_message(DataTable.HeaderSelected(table, column.key, 5, column.label))
+        while pane._sort != "expires_at" or pane._loading_page:
+            await pilot.pause(0.001)
+        await pilot.pause()
+        sorted_ = time.perf_counter() - start
+        rows = table.row_count
+    return {"populate": populated, "page_down": paged, "sort": sorted_, "rows": rows}
+
+def main(argv: list[str]|None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="licenses in the database")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=5, help="pages to scroll through")
+    parser.add_argument("--output", help="results file (default: bench_results/table.json)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = os.path.join(folder, "licenses.db")
+        build_db(db_path, args.size)
+        # a config folder of its own, pointing the app at the benchmark database
+        os.environ["XDG_CONFIG_HOME"] = folder
+        context = Path(folder, "rhlm", "context.json")
+        context.parent.mkdir()
+        context.write_text(json.dumps({"license_db": db_path}))
+        runs = [asyncio.run(run_once(args.pages)) for _ in range(args.runs)]
+
+    results = {
+        "size": args.size,
+        "pages": args.pages,
+        "rows_in_table": max(run["rows"] for run in runs),
+        **{name: summarize([run[name] for run in runs]) for name in ("populate", "page_down", "sort")},
+    }
+    for name, label in (("populate", "mount and first page"), ("page_down", "page down key"), ("sort", "sort by expiry")):
+        print(f"{label:22} median {results[name]['median_ms']:8.1f} ms")
+    print(f"results written to {write_results('table', results, args.output)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
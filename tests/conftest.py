@@ -0,0 +1,39 @@
+from license_manager.utils.license_db import LicenseDB
+from license_manager.utils.signing import SigningAuthority, canonical_json
+import pytest
+
+def make_license(signer: SigningAuthority, **fields) -> dict:
+    """A signed license, fields default to a valid license for hwid "hw0"."""
+    license_data = {
+        "customer": "ACME",
+        "product": "rhlm",
+        "issued_at": "2025-01-01",
+        "expires_at": "2026-01-01",
+        "features": "a,b",
+        "hwid": "hw0",
+        **fields,
+    }
+    license_data["canonical"] = canonical_json(license_data)
+    license_data["signature"] = signer.sign(license_data["canonical"])
+    return license_data
+
+@pytest.fixture
+def signer() -> SigningAuthority:
+    return SigningAuthority()
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    return str(tmp_path / "licenses.db")
+
+@pytest.fixture
+def db(db_path):
+    db = LicenseDB(db_path)
+    yield db
+    db.close()
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch) -> str:
+    """Folder AppContext keeps its state in instead of the user's config folder."""
+    config_dir = str(tmp_path / "config")
+    monkeypatch.setattr("license_manager.utils.app_context.user_config_dir", lambda app_name: config_dir)
+    return config_dir
@@ -0,0 +1,55 @@
+from license_manager.utils.app_context import AppContext
+from tests.benchmarks import src_env
+import json
+import os
+import subprocess
+import sys
+import time
+import pytest
+
+@pytest.fixture
+def saves(monkeypatch) -> list[dict]:
+    """Every state AppContext writes, in order."""
+    saves: list[dict] = []
+    save = AppContext._save
+    def counting_save(self):
+        saves.append(dict(self.context))
+        save(self)
+    monkeypatch.setattr(AppContext, "_save", counting_save)
+    return saves
+
+def stored(config_dir: str) -> dict:
+    with open(os.path.join(config_dir, "context.json")) as f:
+        return json.load(f)
+
+def test_changes_are_flushed_once_after_the_delay(config_dir, saves):
+    ctx = AppContext("rhlm", flush_delay=0.2)
+    ctx["a"] = 1
+    ctx["b"] = 2
+    ctx.update(c=3)
+    assert saves == [] and not os.path.exists(os.path.join(config_dir, "context.json"))
+    deadline = time.monotonic() + 5
+    while not saves and time.monotonic() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.3)
+    assert saves == [{"a": 1, "b": 2, "c": 3}]
+    assert stored(config_dir) == {"a": 1, "b": 2, "c": 3}
+    assert AppContext("rhlm")["c"] == 3
+
+def test_batch_writes_once_when_the_outermost_batch_exits(config_dir, saves):
+    ctx = AppContext("rhlm", flush_delay=0, fsync=True)
+    with ctx.batch():
+        ctx["a"] = 1
+        with ctx.batch():
+            ctx["b"] = 2
+        ctx["c"] = 3
+        assert saves == []
+    assert saves == [{"a": 1, "b": 2, "c": 3}]
+    ctx["d"] = 4
+    assert len(saves) == 2 and stored(config_dir)["d"] == 4
+    assert [name for name in os.listdir(config_dir)] == ["context.json"]
+
+def test_pending_changes_are_written_on_exit(tmp_path):
+    code = "from license_manager.utils.app_context import AppContext; AppContext('rhlm', flush_delay=60)['a'] = 1"
+    subprocess.run([sys.executable, "-c", code], env={**src_env(), "XDG_CONFIG_HOME": str(tmp_path)}, check=True, timeout=30)
+    assert stored(str(tmp_path / "rhlm")) == {"a": 1}
@@ -0,0 +1,33 @@
+from license_manager.utils.audit import FOREIGN, MALFORMED, MISMATCH, OK, TAMPERED, audit_licenses
+from license_manager.utils.signing import SigningAuthority
+from tests.conftest import make_license
+import pytest
+
+@pytest.fixture
+def audited_db(db, signer):
+    previous = SigningAuthority()
+    db.add_licenses([
+        make_license(signer, hwid="ok"),
+        {**make_license(signer, hwid="mismatch"), "customer": "edited"},
+        {**make_license(signer, hwid="tampered"), "canonical": '{"edited":true}'},
+        make_license(previous, hwid="foreign"),
+        {**make_license(signer, hwid="malformed"), "signature": "not base64!"},
+    ])
+    return previous
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_audit_statuses(audited_db, db_path, signer, jobs):
+    report = audit_licenses(db_path, signer.get_verification_key(), [audited_db.get_verification_key()], jobs=jobs, batch_size=2)
+    assert {finding.hwid: finding.status for finding in report.findings} == \
+           {"mismatch": MISMATCH, "tampered": TAMPERED, "foreign": FOREIGN, "malformed": MALFORMED}
+    assert report.counts == {OK: 1, MISMATCH: 1, TAMPERED: 1, FOREIGN: 1, MALFORMED: 1}
+    assert (report.total, report.checked, report.flagged) == (5, 5, 4)
+
+def test_unknown_key_is_tampered(audited_db, db_path, signer):
+    report = audit_licenses(db_path, signer.get_verification_key())
+    assert {finding.hwid: finding.status for finding in report.findings}["foreign"] == TAMPERED
+
+def test_findings_are_capped_but_counted(audited_db, db_path, signer):
+    report = audit_licenses(db_path, signer.get_verification_key(), max_findings=2)
+    assert len(report.findings) == 2
+    assert report.flagged == 4
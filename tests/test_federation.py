@@ -0,0 +1,92 @@
+from license_manager.utils.federation import FederatedLicenseDB
+from license_manager.utils.license_db import AsyncLicenseDB, LicenseDB
+from tests.conftest import make_license
+import asyncio
+import sqlite3
+import pytest
+
+@pytest.fixture
+def sources(tmp_path, signer):
+    """Three databases: east and west with 3 licenses each, hw1 in both, and an empty one."""
+    paths = []
+    for name, hwids in (("east", ("hw0", "hw1", "hw2")), ("west", ("hw1", "hw3", "hw4")), ("empty", ())):
+        path = str(tmp_path / f"{name}.db")
+        db = LicenseDB(path)
+        db.add_licenses([make_license(signer, hwid=hwid, customer=f"{name} corp") for hwid in hwids])
+        db.close()
+        paths.append(path)
+    return paths
+
+@pytest.fixture
+def federated(sources):
+    federated = FederatedLicenseDB(sources)
+    yield federated
+    federated.close()
+
+def test_find_tags_rows_with_their_source(federated):
+    rows = federated.find_licenses("hw1")
+    assert [(row[0], row[1], row[-1]) for row in rows] == [("east", 2, "hw1"), ("west", 1, "hw1")]
+    assert federated.find_licenses("nowhere") == []
+    assert FederatedLicenseDB().find_licenses("hw1") is None
+
+def test_pages_cross_source_boundaries(federated):
+    seen, after = [], None
+    while page := federated.list_license_page(after, limit=2):
+        seen.extend((row[0], row[1]) for row in page)
+        after = (page[-1][0], page[-1][1])
+    assert seen == [("east", 1), ("east", 2), ("east", 3), ("west", 1), ("west", 2), ("west", 3)]
+    assert federated.count_licenses() == 6
+
+def test_search_and_count_every_source(federated):
+    search = LicenseDB.fts_query("west")
+    assert federated.count_licenses(search) == 3
+    rows = federated.list_license_page(None, 10, search)
+    assert {row[0] for row in rows} == {"west"}
+    assert federated.count_licenses(LicenseDB.fts_query("hw1")) == 2
+
+def test_sources_are_read_only_and_named_uniquely(sources, tmp_path, signer):
+    other = tmp_path / "other"
+    other.mkdir()
+    LicenseDB(str(other / "east.db")).close()
+    federated = FederatedLicenseDB([*sources, str(other / "east.db")])
+    try:
+        assert [name for name, _ in federated.sources] == ["east", "west", "empty", "east-2"]
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            federated.conn.execute("DELETE FROM src0.licenses")
+    finally:
+        federated.close()
+
+def test_attach_limit(sources):
+    federated = FederatedLicenseDB()
+    with pytest.raises(ValueError, match="at most"):
+        federated.change_sources(sources * 10)
+    assert not federated.connected()
+
+def test_async_wrapper_owns_a_federated_db(sources):
+    async def scenario():
+        federated = AsyncLicenseDB(FederatedLicenseDB)
+        try:
+            names = await federated.change_sources(sources)
+            return names, await federated.find_licenses("hw3")
+        finally:
+            federated.close()
+
+    names, rows = asyncio.run(scenario())
+    assert names == ["east", "west", "empty"]
+    assert [(row[0], row[1]) for row in rows] == [("west", 2)]
+
+def test_missing_and_foreign_files_are_refused_untouched(sources, tmp_path):
+    federated = FederatedLicenseDB()
+    missing = tmp_path / "sub" / "none.db"
+    with pytest.raises(FileNotFoundError):
+        federated.change_sources([sources[0], str(missing)])
+    assert not missing.parent.exists() and not federated.connected()
+
+    other = tmp_path / "other.db"
+    conn = sqlite3.connect(other)
+    conn.execute("CREATE TABLE notes (text TEXT)")
+    conn.close()
+    with pytest.raises(RuntimeError, match="schema version 0"):
+        federated.change_sources([str(other)])
+    assert [row[0] for row in sqlite3.connect(other).execute("SELECT name FROM sqlite_master")] == ["notes"]
+    assert sorted(path.name for path in tmp_path.iterdir() if path.name.startswith("other")) == ["other.db"]
@@ -0,0 +1,38 @@
+from license_manager.utils.instrumentation import Instrumentation, count_rows, instrumentation
+import json
+
+def test_histogram_and_percentiles():
+    stats = Instrumentation()
+    for ms in (0.3, 0.4, 0.8, 3, 40):
+        stats.record("hook", ms / 1000, rows=2)
+    hook = stats.snapshot()["hook"]
+    assert (hook.count, hook.rows) == (5, 10)
+    assert round(hook.mean_ms, 2) == 8.9
+    assert hook.percentile_ms(0.5) == 1
+    assert hook.percentile_ms(0.99) == 40
+
+def test_timer_and_decorator_record_rows():
+    stats = Instrumentation()
+    with stats.timer("block") as timing:
+        timing.rows = 3
+    listed = stats.instrument("listed", rows=count_rows)(lambda: [1, 2])
+    assert listed() == [1, 2]
+    snapshot = stats.snapshot()
+    assert snapshot["block"].rows == 3 and snapshot["listed"].rows == 2
+
+def test_stream_to_jsonl(tmp_path):
+    stats = Instrumentation()
+    log = tmp_path / "timings.jsonl"
+    stats.stream_to(str(log))
+    stats.record("hook", 0.002, rows=5)
+    stats.stream_to(None)
+    stats.record("hook", 0.002)
+    lines = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len(lines) == 1
+    assert lines[0]["name"] == "hook" and lines[0]["ms"] == 2.0 and lines[0]["rows"] == 5
+
+def test_license_db_queries_are_instrumented(db):
+    instrumentation.reset()
+    db.list_license_page()
+    db.get_license(1)
+    assert {"db.list_license_page", "db.get_license"} <= set(instrumentation.snapshot())
@@ -0,0 +1,77 @@
+from license_manager.utils.audit import OK, audit_licenses
+from license_manager.utils.issue import issue_licenses
+from license_manager.utils.keyring import Keyring
+from license_manager.utils.signing import SigningAuthority, key_id
+from tests.conftest import make_license
+import pytest
+
+@pytest.fixture
+def key_files(tmp_path):
+    files = []
+    for name in ("default", "pro"):
+        path = tmp_path / f"{name}.key"
+        path.write_text(SigningAuthority().get_signing_key())
+        files.append(str(path))
+    return files
+
+def test_key_files_are_read_once(key_files, monkeypatch):
+    keyring = Keyring()
+    default = keyring.load(key_files[0])
+    monkeypatch.setattr("builtins.open", None)
+    assert keyring.load(key_files[0]) == default
+    assert keyring.key_file(default) == key_files[0]
+
+def test_sign_picks_the_product_key(key_files):
+    keyring = Keyring()
+    default, pro = keyring.load(key_files[0]), keyring.load(key_files[1])
+    keyring.assign(pro, ["pro"])
+    assert keyring.default == default
+    signed = {product: keyring.sign({"product": product, "hwid": "hw"}) for product in ("pro", "basic")}
+    assert {product: data["key_id"] for product, data in signed.items()} == {"pro": pro, "basic": default}
+    assert signed["pro"]["key_id"] == key_id(keyring.get(pro).get_verification_key())
+
+    keyring.remove(default)
+    assert keyring.default == pro and keyring.products(pro) == ["pro"]
+
+def test_issue_and_audit_with_product_keys(db, db_path, key_files):
+    default, pro = (SigningAuthority(signing_key_file=path) for path in key_files)
+    records = [{"product": product, "hwid": f"hw{i}"} for i, product in enumerate(["pro", "basic", "pro"])]
+    stats = issue_licenses(records, db, default.get_signing_key(), product_keys={"pro": pro.get_signing_key()})
+    assert stats.issued == 3
+    assert [row["key_id"] for row in db.list_licenses()] == [pro.get_key_id(), default.get_key_id(), pro.get_key_id()]
+
+    report = audit_licenses(db_path, default.get_verification_key(), keyring_keys=[pro.get_verification_key()])
+    assert report.counts == {OK: 3}
+    # licenses without a key id are still checked against every key
+    db.add_license(make_license(pro, hwid="legacy"))
+    report = audit_licenses(db_path, default.get_verification_key(), keyring_keys=[pro.get_verification_key()])
+    assert report.counts == {OK: 4}
+
+def test_wrong_key_id_falls_back_to_the_other_keys(db, db_path, signer):
+    other = SigningAuthority()
+    db.add_license({**make_license(signer), "key_id": other.get_key_id()})
+    report = audit_licenses(db_path, signer.get_verification_key(), keyring_keys=[other.get_verification_key()])
+    assert report.counts == {OK: 1}
+
+def test_pane_skips_and_reports_bad_key_files(key_files, tmp_path, config_dir, monkeypatch):
+    from license_manager.app import RightHandLicenseManager
+    from license_manager.utils.app_context import AppContext
+    from license_manager.widgets.signing_authority import SigningAuthorityPane
+    import asyncio
+    garbage, short, missing = tmp_path / "garbage.key", tmp_path / "short.key", tmp_path / "missing.key"
+    garbage.write_bytes(b"\xff\xfe not a key")
+    short.write_text("QUJD")
+    AppContext("rhlm", flush_delay=0).update(
+        keyring=[{"file": path, "products": ["pro"]} for path in (key_files[0], str(garbage), str(missing))], last_key=str(short))
+    notes: list[str] = []
+    monkeypatch.setattr(RightHandLicenseManager, "notify", lambda self, message, **kwargs: notes.append(message))
+
+    async def main():
+        app = RightHandLicenseManager()
+        async with app.run_test() as pilot:
+            for _ in range(10):
+                await pilot.pause(0.05)
+            return list(app.query_one(SigningAuthorityPane).keyring)
+
+    assert asyncio.run(main()) == [SigningAuthority(signing_key_file=key_files[0]).get_key_id()]
+    assert [note.split(":")[0] for note in notes] == [f"Can't open key file {path}" for path in (garbage, missing, short)]
@@ -0,0 +1,253 @@
+from license_manager.utils import license_db
+from license_manager.utils.license_db import MIGRATIONS, LicenseDB
+from license_manager.utils.canonical import LICENSE_FIELDS, canonical_json
+from tests.conftest import make_license
+import json
+import sqlite3
+import pytest
+
+COLUMN = {column: index for index, column in enumerate(LicenseDB.DISPLAY_COLUMNS)}
+
+@pytest.fixture
+def filled_db(db, signer):
+    # repeated and missing expiry dates exercise ties and NULL ordering
+    db.add_licenses(make_license(signer, hwid=f"hw{i:03d}", customer=f"customer{i % 7}",
+                                 expires_at=None if i % 5 == 0 else f"2026-{i % 4 + 1:02d}-01")
+                    for i in range(50))
+    return db
+
+def page_through(db, limit, **kwargs):
+    rows, after = [], None
+    sort_index = COLUMN[kwargs.get("sort", "id")]
+    while page := db.list_license_page(after, limit, **kwargs):
+        rows += page
+        after = (page[-1][sort_index], page[-1][0])
+    return rows
+
+def test_pages_cover_every_license_once(filled_db):
+    rows = page_through(filled_db, 7)
+    assert [row[0] for row in rows] == list(range(1, 51))
+
+def test_page_before_a_row(filled_db):
+    page = filled_db.list_license_page(before=(21, 21), limit=5)
+    assert [row[0] for row in page] == [16, 17, 18, 19, 20]
+
+@pytest.mark.parametrize("sort", ["customer", "expires_at", "hwid", "id"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_sorted_pages_match_a_full_sort(filled_db, sort, descending):
+    rows = page_through(filled_db, 6, sort=sort, descending=descending)
+    index = COLUMN[sort]
+    # NULLs first ascending, last descending, ties by id
+    expected = sorted(rows, key=lambda row: (row[index] is not None, row[index] or "", row[0]), reverse=descending)
+    assert rows == expected
+    assert len({row[0] for row in rows}) == 50
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_sorted_page_before_a_row(filled_db, descending):
+    rows = page_through(filled_db, 10, sort="expires_at", descending=descending)
+    anchor = rows[30]
+    page = filled_db.list_license_page(before=(anchor[COLUMN["expires_at"]], anchor[0]), limit=8,
+                                       sort="expires_at", descending=descending)
+    assert page == rows[22:30]
+
+@pytest.mark.parametrize("sort", LicenseDB.DISPLAY_COLUMNS)
+def test_every_sort_column_is_read_from_an_index(db, sort):
+    plan = " ".join(row[-1] for row in db.conn.execute(
+        f"EXPLAIN QUERY PLAN SELECT * FROM licenses WHERE {sort} > ? ORDER BY {sort} DESC, id DESC LIMIT 200", ("x",)))
+    # customer and hwid lead composite indexes, only ties are sorted for them
+    assert "TEMP B-TREE FOR ORDER BY" not in plan
+
+def test_unknown_sort_column_is_rejected(filled_db):
+    with pytest.raises(ValueError):
+        filled_db.list_license_page(sort="signature; DROP TABLE licenses")
+
+def test_search_matches_prefixes_in_every_column(filled_db):
+    search = LicenseDB.fts_query("customer3 hw0")
+    rows = page_through(filled_db, 2, search=search)
+    assert {row[COLUMN["customer"]] for row in rows} == {"customer3"}
+    assert len(rows) == filled_db.count_licenses(search) == 7
+
+def test_search_with_sort(filled_db):
+    search = LicenseDB.fts_query("customer3")
+    rows = page_through(filled_db, 3, search=search, sort="expires_at", descending=True)
+    assert [row[0] for row in rows] == [row[0] for row in page_through(filled_db, 50, sort="expires_at", descending=True)
+                                        if row[COLUMN["customer"]] == "customer3"]
+
+def test_search_index_follows_updates_and_deletes(filled_db):
+    search = LicenseDB.fts_query("hw007")
+    filled_db.conn.execute("UPDATE licenses SET hwid = 'moved' WHERE id = 8")
+    assert filled_db.count_licenses(search) == 0
+    assert filled_db.count_licenses(LicenseDB.fts_query("moved")) == 1
+    filled_db.delete_license(8)
+    assert filled_db.count_licenses(LicenseDB.fts_query("moved")) == 0
+
+def test_fts_query_quotes_terms():
+    assert LicenseDB.fts_query('  a"b  c ') == '"a""b"* "c"*'
+    assert LicenseDB.fts_query("   ") is None
+
+def test_iter_license_batches_by_ids(filled_db):
+    batches = list(filled_db.iter_license_batches(("id", "hwid"), batch_size=2, ids=[5, 3, 42, 999]))
+    assert batches == [[(3, "hw002"), (5, "hw004")], [(42, "hw041")]]
+
+def test_unversioned_database_is_migrated(db_path):
+    # a database created before schema versioning, with a row already in it
+    conn = sqlite3.connect(db_path)
+    conn.execute(MIGRATIONS[0][0])
+    conn.execute("INSERT INTO licenses (customer, product, hwid, signature, canonical) VALUES ('c', 'p', 'old-hwid', 's', '{}')")
+    conn.commit()
+    conn.close()
+
+    db = LicenseDB(db_path)
+    assert db.schema_version() == len(MIGRATIONS)
+    assert db.count_licenses(LicenseDB.fts_query("old-hwid")) == 1
+    indexes = {row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "licenses_hwid_product_issued_at" in indexes and "licenses_hwid" not in indexes
+    db.close()
+
+def test_compact_storage_reads_back_unchanged(db, signer):
+    stored = [make_license(signer, hwid="plain"),
+              {**make_license(signer, hwid="edited"), "customer": "edited"},
+              {**make_license(signer, hwid="malformed"), "signature": "not base64!"}]
+    db.add_licenses(stored)
+    assert [{key: row[key] for key in stored[0]} for row in db.list_licenses()] == stored
+    rows = db.conn.execute("SELECT typeof(signature), typeof(canonical) FROM licenses ORDER BY id").fetchall()
+    # the canonical payload is only kept when the columns no longer rebuild it
+    assert [tuple(row) for row in rows] == [("blob", "null"), ("blob", "blob"), ("text", "null")]
+
+def test_canonical_json_matches_sorted_dumps():
+    license_data = dict(zip(LICENSE_FIELDS, ['quote " and \\', "ünïcode €", None, 42, "tab\tnewline\n", "\x00"]))
+    expected = json.dumps({field: "" if license_data[field] is None else str(license_data[field]) for field in LICENSE_FIELDS},
+                          sort_keys=True, separators=(",", ":"))
+    assert canonical_json(license_data) == expected
+
+def test_text_storage_is_migrated_to_compact(db_path, signer, monkeypatch):
+    monkeypatch.setattr(license_db, "MIGRATIONS", MIGRATIONS[:5])
+    LicenseDB(db_path).close()
+    monkeypatch.undo()
+    licenses = [make_license(signer, hwid=f"hw{i}") for i in range(20)]
+    licenses += [{**make_license(signer, hwid="edited"), "customer": "edited"}, make_license(signer, hwid="deleted")]
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executemany("INSERT INTO licenses (customer, product, issued_at, expires_at, features, hwid, signature, canonical) "
+                     "VALUES (:customer, :product, :issued_at, :expires_at, :features, :hwid, :signature, :canonical)", licenses)
+    conn.execute("DELETE FROM licenses WHERE hwid = 'deleted'")
+    conn.commit()
+    before = [dict(row) for row in conn.execute("SELECT * FROM licenses")]
+    conn.close()
+
+    db = LicenseDB(db_path)
+    assert db.schema_version() == len(MIGRATIONS)
+    assert db.list_licenses() == [{**row, "key_id": None} for row in before]
+    assert db.count_licenses(LicenseDB.fts_query("hw1")) == 11
+    # deleted ids stay retired
+    assert db.add_license(make_license(signer, hwid="new")) == 23
+    db.close()
+
+def test_newer_schema_is_refused_and_left_closed(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA user_version = {len(MIGRATIONS) + 1}")
+    conn.close()
+    db = LicenseDB("")
+    with pytest.raises(RuntimeError):
+        db.change_db(db_path)
+    assert not db.connected()
+
+def test_not_a_database_is_left_closed(tmp_path):
+    path = tmp_path / "notes.db"
+    path.write_text("not a database " * 100)
+    db = LicenseDB("")
+    with pytest.raises(sqlite3.DatabaseError):
+        db.change_db(str(path))
+    assert not db.connected()
+
+def test_import_skips_stored_and_repeated_licenses(db, signer):
+    first = make_license(signer, hwid="a")
+    db.add_license(first)
+    batch = [first, make_license(signer, hwid="b"), make_license(signer, hwid="b"), make_license(signer, hwid="a", product="other")]
+    assert db.import_licenses(batch) == 2
+    assert db.count_licenses() == 3
+
+def test_change_log_records_writes(filled_db):
+    start = filled_db.last_license_change()
+    filled_db.conn.execute("UPDATE licenses SET customer = 'edited' WHERE id = 3")
+    filled_db.delete_license(4)
+    changes = filled_db.license_changes(start)
+    assert [(license_id, op) for _, license_id, op in changes] == [(3, "update"), (4, "delete")]
+    assert filled_db.license_changes(changes[-1][0]) == []
+    assert filled_db.get_license_rows([3, 4, 5], LicenseDB.fts_query("edited")) == [filled_db.list_license_page(before=(4, 4), limit=1)[0]]
+
+def test_pruned_change_log_asks_for_a_reload(db, signer, monkeypatch):
+    monkeypatch.setattr(LicenseDB, "CHANGE_LOG_SIZE", 10)
+    db.add_licenses(make_license(signer, hwid=f"hw{i}") for i in range(25))
+    assert db.license_changes(0) is None
+    assert len(db.license_changes(db.last_license_change() - 10)) == 10
+
+def test_bulk_delete_in_chunks(filled_db, monkeypatch):
+    monkeypatch.setattr(LicenseDB, "MAX_IN_PARAMS", 3)
+    start = filled_db.last_license_change()
+    assert filled_db.delete_licenses([*range(1, 11), 10, 99]) == 10
+    assert filled_db.count_licenses() == 40
+    assert [license_id for _, license_id, _ in filled_db.license_changes(start)] == list(range(1, 11))
+
+def test_row_cache_follows_writes(filled_db, db_path):
+    assert filled_db.get_license(3)["customer"] == "customer2"
+    other = LicenseDB(db_path)
+    with other.conn:
+        other.conn.execute("UPDATE licenses SET customer = 'edited' WHERE id = 3")
+    other.close()
+    assert filled_db.get_license(3)["customer"] == "edited"
+    filled_db.delete_licenses([3])
+    assert filled_db.get_license(3) is None
+
+def test_feature_index_follows_writes(db, signer):
+    db.add_licenses([make_license(signer, hwid="a", features="sso, audit,,sso"),
+                     make_license(signer, hwid="b", features='x"y\\z,\ttab\r\n , audit'),
+                     make_license(signer, hwid="c", features=None)])
+    db.import_licenses([make_license(signer, hwid="d", features="sso")])
+    assert db.feature_counts() == [("audit", 2), ("sso", 2), ("tab", 1), ('x"y\\z', 1)]
+    assert db.count_feature("tab\n") == 1
+    with db.conn:
+        db.conn.execute("UPDATE licenses SET features = 'audit' WHERE id = 1")
+    db.delete_license(2)
+    assert db.feature_counts() == [("audit", 1), ("sso", 1)]
+    assert db.count_feature(" sso ") == 1 and db.count_feature("missing") == 0
+    # the stored features and the signed payload are left as they were
+    assert db.get_license(4)["canonical"] == make_license(signer, hwid="d", features="sso")["canonical"]
+
+def test_licenses_with_feature_pages(filled_db, signer):
+    filled_db.add_licenses(make_license(signer, hwid=f"f{i}", features="a,b" if i % 2 else "c") for i in range(10))
+    ids, after = [], None
+    while page := filled_db.licenses_with_feature("c", after, limit=2):
+        ids += [row[0] for row in page]
+        after = page[-1][0]
+    assert ids == [51, 53, 55, 57, 59]
+    # filled_db licenses have features "a,b"
+    assert filled_db.count_feature("a") == 55
+    assert filled_db.licenses_with_feature("a", 50, limit=1)[0][COLUMN["hwid"]] == "f1"
+
+def test_features_of_stored_licenses_are_indexed_on_migration(db_path, signer, monkeypatch):
+    monkeypatch.setattr(license_db, "MIGRATIONS", MIGRATIONS[:9])
+    db = LicenseDB(db_path)
+    db.add_licenses(make_license(signer, hwid=f"hw{i}", features=f"base, extra{i % 2}") for i in range(6))
+    db.close()
+    monkeypatch.undo()
+    db = LicenseDB(db_path)
+    assert db.feature_counts() == [("base", 6), ("extra0", 3), ("extra1", 3)]
+    db.close()
+
+def test_features_split_before_trimming_blanks_are_split_again(db_path, signer, monkeypatch):
+    monkeypatch.setattr(license_db, "MIGRATIONS", MIGRATIONS[:10])
+    db = LicenseDB(db_path)
+    db.add_licenses([make_license(signer, hwid="a", features="sso,\taudit"), make_license(signer, hwid="b", features="sso")])
+    # as migration 10 stored them, with the tab kept
+    with db.conn:
+        db.conn.execute("INSERT INTO feature_names (name) VALUES (char(9) || 'audit')")
+        db.conn.execute("UPDATE license_features SET feature_id = (SELECT id FROM feature_names WHERE name = char(9) || 'audit') "
+                        "WHERE feature_id = (SELECT id FROM feature_names WHERE name = 'audit')")
+    assert db.feature_counts() == [("\taudit", 1), ("sso", 2)]
+    db.close()
+    monkeypatch.undo()
+    db = LicenseDB(db_path)
+    assert db.schema_version() == len(MIGRATIONS)
+    assert db.feature_counts() == [("audit", 1), ("sso", 2)]
+    db.close()
@@ -0,0 +1,56 @@
+from license_manager.utils.license_io import export_licenses, import_licenses, license_file_text
+from license_manager.utils.license_db import LicenseDB
+from tests.conftest import make_license
+import json
+import zipfile
+import pytest
+
+@pytest.fixture
+def exported_db(db, signer):
+    db.add_licenses([
+        make_license(signer, hwid="hw-1"),
+        make_license(signer, hwid="hw-1", product="other"),
+        make_license(signer, hwid="../escape"),
+    ])
+    return db
+
+def test_lic_file_layout(signer):
+    license_data = make_license(signer)
+    text = license_file_text({**license_data, "id": 1})
+    assert text.startswith('{\n    "customer": "ACME",\n')
+    assert list(json.loads(text)) == ["customer", "product", "issued_at", "expires_at", "features", "hwid", "signature"]
+
+def test_export_names_repeated_and_unsafe_hwids(exported_db, db_path, tmp_path):
+    folder = tmp_path / "out"
+    assert export_licenses(db_path, folder, "lic") == 3
+    assert sorted(path.name for path in folder.iterdir()) == ["_escape.lic", "hw-1-2.lic", "hw-1.lic"]
+
+def test_export_zip_matches_lic_files(exported_db, db_path, tmp_path):
+    export_licenses(db_path, tmp_path / "out", "lic")
+    export_licenses(db_path, tmp_path / "out.zip", "zip")
+    with zipfile.ZipFile(tmp_path / "out.zip") as archive:
+        assert {name: archive.read(name).decode() for name in archive.namelist()} == \
+               {path.name: path.read_text() for path in (tmp_path / "out").iterdir()}
+
+def test_export_marked_ids_and_search(exported_db, db_path, tmp_path):
+    assert export_licenses(db_path, tmp_path / "ids.jsonl", "jsonl", ids=[2, 3]) == 2
+    assert export_licenses(db_path, tmp_path / "search.jsonl", "jsonl", search=LicenseDB.fts_query("other")) == 1
+    assert json.loads((tmp_path / "search.jsonl").read_text())["product"] == "other"
+
+def test_import_round_trip_and_dedupe(exported_db, db_path, tmp_path):
+    export_licenses(db_path, tmp_path / "all.jsonl", "jsonl")
+    (tmp_path / "zipped").mkdir()
+    export_licenses(db_path, tmp_path / "zipped" / "all.zip", "zip")
+    (tmp_path / "bad.lic").write_text("{not json")
+    (tmp_path / "nohwid.lic").write_text(json.dumps({"customer": "x", "signature": "s"}))
+
+    other = str(tmp_path / "other.db")
+    stats = import_licenses(other, [tmp_path / "all.jsonl", tmp_path / "zipped", tmp_path / "bad.lic", tmp_path / "nohwid.lic"])
+    assert (stats.read, stats.imported, stats.invalid, stats.duplicates) == (8, 3, 2, 3)
+
+    # canonical payloads are rebuilt, so imported rows are identical to the exported ones
+    source, target = LicenseDB(db_path), LicenseDB(other)
+    columns = ("id", "hwid", "signature", "canonical")
+    assert list(source.iter_license_batches(columns)) == list(target.iter_license_batches(columns))
+    source.close()
+    target.close()
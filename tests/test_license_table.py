@@ -0,0 +1,182 @@
+from license_manager.app import RightHandLicenseManager
+from license_manager.utils.app_context import AppContext
+from license_manager.utils.license_db import LicenseDB
+from license_manager.widgets.license_table import LicenseTablePane
+from textual.widgets import DataTable
+from tests.conftest import make_license
+from typing import Iterator
+import asyncio
+import time
+import pytest
+
+@pytest.fixture
+def app_db(db_path, config_dir, signer, monkeypatch) -> Iterator[LicenseDB]:
+    """The database the UI opens on start, with 30 licenses whose customers sort in reverse id order."""
+    monkeypatch.setattr(LicenseTablePane, "WATCH_INTERVAL", 0.05)
+    AppContext("rhlm", flush_delay=0)["license_db"] = db_path
+    db = LicenseDB(db_path)
+    db.add_licenses(make_license(signer, hwid=f"hw{i:03d}", customer=f"{'keep' if i % 3 else 'drop'} {29 - i:02d}")
+                    for i in range(30))
+    yield db
+    db.close()
+
+def run_app(scenario, **ctx):
+    """Runs `scenario(pilot, table)` against the app started with `ctx` in its stored state."""
+    if ctx: AppContext("rhlm", flush_delay=0).update(**ctx)
+
+    async def main():
+        app = RightHandLicenseManager()
+        async with app.run_test(size=(160, 40)) as pilot:
+            table = app.query_one("#license_table", DataTable)
+            await wait_for(pilot, lambda: table.row_count > 0)
+            return await scenario(pilot, table)
+    return asyncio.run(main())
+
+async def wait_for(pilot, condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the table"
+        await pilot.pause(0.05)
+    await pilot.pause()
+
+def table_ids(table: DataTable) -> list[int]:
+    return [int(str(row.key.value)) for row in table.ordered_rows]
+
+def cursor_id(table: DataTable) -> int:
+    return int(str(table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value))
+
+def db_ids(db: LicenseDB, **kwargs) -> list[int]:
+    return [row[0] for row in db.list_license_page(None, 1000, **kwargs)]
+
+def test_external_writes_are_placed_in_the_sorted_window(app_db, signer):
+    async def scenario(pilot, table):
+        assert table_ids(table) == db_ids(app_db, sort="customer", descending=True)
+        table.move_cursor(row=10)
+        await pilot.pause()
+        cursor = cursor_id(table)
+        app_db.add_license(make_license(signer, hwid="new", customer="keep 15a"))
+        app_db.conn.execute("UPDATE licenses SET customer = 'aaa' WHERE id = 3")
+        app_db.conn.execute("UPDATE licenses SET product = 'renamed' WHERE id = ?", (cursor,))
+        app_db.delete_license(1)
+        expected = db_ids(app_db, sort="customer", descending=True)
+        await wait_for(pilot, lambda: table_ids(table) == expected)
+        assert 31 in expected and expected[-1] == 3 and 1 not in expected
+        assert cursor_id(table) == cursor and table.cursor_row == expected.index(cursor)
+        assert table.get_cell(str(cursor), "product") == "renamed"
+    run_app(scenario, license_sort="customer", license_sort_descending=True)
+
+def test_external_writes_follow_the_search(app_db, signer):
+    async def scenario(pilot, table):
+        await pilot.click("#search_input")
+        await pilot.press(*"keep", "enter")
+        search = LicenseDB.fts_query("keep")
+        await wait_for(pilot, lambda: table_ids(table) == db_ids(app_db, search=search))
+        table.move_cursor(row=5)
+        await pilot.pause()
+        cursor = cursor_id(table)
+        app_db.add_license(make_license(signer, hwid="new kept", customer="keep new"))
+        app_db.add_license(make_license(signer, hwid="new dropped", customer="drop new"))
+        # id 2 stops matching the search and id 4 starts to
+        app_db.conn.execute("UPDATE licenses SET customer = 'drop now' WHERE id = 2")
+        app_db.conn.execute("UPDATE licenses SET customer = 'keep now' WHERE id = 4")
+        app_db.delete_license(3)
+        expected = db_ids(app_db, search=search)
+        await wait_for(pilot, lambda: table_ids(table) == expected)
+        assert {2, 3, 32}.isdisjoint(expected) and {4, 31} <= set(expected)
+        assert cursor_id(table) == cursor and table.cursor_row == expected.index(cursor)
+    run_app(scenario)
+
+def test_paging_keeps_a_bounded_window(app_db, signer, monkeypatch):
+    monkeypatch.setattr(LicenseTablePane, "PAGE_SIZE", 20)
+    monkeypatch.setattr(LicenseTablePane, "MAX_PAGES", 3)
+    monkeypatch.setattr(LicenseTablePane, "PREFETCH_ROWS", 5)
+    app_db.add_licenses(make_license(signer, hwid=f"more{i:03d}") for i in range(170))
+
+    async def scroll(pilot, table, row, done) -> int:
+        # moves the cursor to `row` until `done`, returns the most rows the table held meanwhile
+        most = 0
+        for _ in range(30):
+            if done(): break
+            table.move_cursor(row=row(table))
+            await pilot.pause(0.05)
+            most = max(most, table.row_count)
+        return most
+
+    async def scenario(pilot, table):
+        assert table_ids(table) == list(range(1, 21))
+        most = await scroll(pilot, table, lambda table: table.row_count - 1, lambda: table_ids(table)[-1] == 200)
+        # the cursor stays on the license it was on while pages load and older ones are evicted
+        assert most <= 60 and table_ids(table) == list(range(141, 201))
+        assert cursor_id(table) == 180 and table.cursor_row == table_ids(table).index(180)
+        most = await scroll(pilot, table, lambda table: 0, lambda: table_ids(table)[0] == 1)
+        assert most <= 60 and table_ids(table) == list(range(1, 61))
+        assert cursor_id(table) == 21 and table.cursor_row == 20
+    run_app(scenario)
+
+def test_typing_searches_once_after_a_pause(app_db, monkeypatch):
+    monkeypatch.setattr(LicenseTablePane, "SEARCH_DEBOUNCE", 0.3)
+    searches = []
+    load_licenses = LicenseTablePane._load_licenses
+    async def counting_load(self):
+        searches.append(self._search)
+        await load_licenses(self)
+    monkeypatch.setattr(LicenseTablePane, "_load_licenses", counting_load)
+
+    async def scenario(pilot, table):
+        searches.clear()
+        await pilot.click("#search_input")
+        await pilot.press(*"drop 1")
+        # still typing, the table isn't filtered yet
+        assert searches == [] and table.row_count == 30
+        expected = db_ids(app_db, search=LicenseDB.fts_query("drop 1"))
+        await wait_for(pilot, lambda: table_ids(table) == expected)
+        assert searches == [LicenseDB.fts_query("drop 1")] and len(expected) == 3
+        await pilot.press(*["backspace"] * 6)
+        await wait_for(pilot, lambda: table.row_count == 30)
+        assert searches == [LicenseDB.fts_query("drop 1"), None]
+    run_app(scenario)
+
+def test_header_click_sorts_around_the_cursor(app_db):
+    async def click_header(pilot, table, key: str) -> None:
+        # the header row is the first line of the table, columns are laid out left to right
+        keys = [column.key.value for column in table.ordered_columns]
+        x = sum(column.get_render_width(table) for column in table.ordered_columns[:keys.index(key)]) + 1
+        await pilot.click("#license_table", offset=(x, 0))
+
+    async def scenario(pilot, table):
+        table.move_cursor(row=10)
+        await pilot.pause()
+        cursor = cursor_id(table)
+        for descending in (False, True):
+            await click_header(pilot, table, "customer")
+            expected = db_ids(app_db, sort="customer", descending=descending)
+            await wait_for(pilot, lambda: table_ids(table) == expected)
+            assert cursor_id(table) == cursor and table.cursor_row == expected.index(cursor)
+            assert str(table.columns["customer"].label).endswith(LicenseTablePane.SORT_ARROWS[descending])
+    run_app(scenario)
+    assert AppContext("rhlm")["license_sort"] == "customer" and AppContext("rhlm")["license_sort_descending"]
+
+def test_marked_licenses_are_deleted_together(app_db):
+    async def scenario(pilot, table):
+        table.focus()
+        table.move_cursor(row=3)
+        await pilot.press("space", "space", "space")
+        table.move_cursor(row=10)
+        await pilot.press("space")
+        marked = [license_id for license_id in table_ids(table) if table.get_cell(str(license_id), "marked")]
+        assert marked == [4, 5, 6, 11] and cursor_id(table) == 12
+
+        await pilot.click("#delete_license")
+        await pilot.pause()
+        await pilot.press("escape")
+        await pilot.pause()
+        assert db_ids(app_db) == list(range(1, 31))
+
+        await pilot.click("#delete_license")
+        await pilot.pause()
+        await pilot.click("#accept")
+        expected = [license_id for license_id in range(1, 31) if license_id not in marked]
+        await wait_for(pilot, lambda: table_ids(table) == expected)
+        assert db_ids(app_db) == expected
+        assert cursor_id(table) == 12 and not any(table.get_cell(str(license_id), "marked") for license_id in expected)
+    run_app(scenario)
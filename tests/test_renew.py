@@ -0,0 +1,47 @@
+from license_manager.utils.audit import audit_licenses
+from license_manager.utils.keyring import Keyring
+from license_manager.utils.renew import expiring_ids, expiry_window, renew_licenses, renewed_expiry
+from license_manager.utils.verify import LicenseVerifier, OK
+from tests.conftest import make_license
+import pytest
+
+@pytest.fixture
+def expiry_db(db, signer):
+    # ids 1-10 expire on consecutive days from 2025-01-01, 11 never expires
+    db.add_licenses([*(make_license(signer, hwid=f"hw{i}", expires_at=f"2025-01-{i + 1:02d}") for i in range(10)),
+                     make_license(signer, hwid="perpetual", expires_at="")])
+    return db
+
+def test_expiring_window_pages(expiry_db):
+    since, until = expiry_window(4, today="2025-01-03")
+    assert (since, until) == ("2025-01-03", "2025-01-07")
+    assert expiry_db.count_expiring(since, until) == 5
+    first = expiry_db.expiring_licenses(since, until, limit=2)
+    rest = expiry_db.expiring_licenses(since, until, after=(first[-1][4], first[-1][0]), limit=10)
+    assert [row[0] for row in first + rest] == [3, 4, 5, 6, 7]
+    assert expiring_ids(expiry_db, "", "2025-01-02", page_size=1) == [1, 2]
+
+def test_renewed_expiry_never_shortens():
+    assert renewed_expiry("2025-03-01", 30, today="2025-02-01") == "2025-03-31"
+    assert renewed_expiry("2025-01-01", 30, today="2025-02-01") == "2025-03-03"
+    assert renewed_expiry("", 1, today="2025-02-01") == "2025-02-02"
+
+def test_renew_resigns_and_exports(expiry_db, db_path, signer, tmp_path):
+    keyring = Keyring.from_keys(signer.get_signing_key())
+    stats = renew_licenses(db_path, keyring, [1, 2, 3], extend_days=365, today="2025-01-02", export_to=tmp_path / "renewed",
+                           chunk_size=2)
+    assert (stats.total, stats.renewed, stats.exported, stats.skipped) == (3, 3, 3, 0)
+    assert [expiry_db.get_license(i)["expires_at"] for i in (1, 2, 3, 4)] == ["2026-01-02", "2026-01-02", "2026-01-03", "2025-01-04"]
+    assert expiry_db.get_license(1)["issued_at"] == "2025-01-01"
+
+    report = audit_licenses(db_path, signer.get_verification_key())
+    assert report.flagged == 0
+    verified = LicenseVerifier([signer.get_verification_key()]).scan([tmp_path / "renewed"], today="2025-06-01")
+    assert verified.counts == {OK: 3}
+
+def test_renewal_leaves_the_search_index_alone(expiry_db):
+    with expiry_db.conn:
+        expiry_db.conn.execute("UPDATE licenses SET expires_at = '2030-01-01' WHERE id = 1")
+    assert expiry_db.count_licenses(expiry_db.fts_query("hw0")) == 1
+    triggers = {row[0]: row[1] for row in expiry_db.conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")}
+    assert "UPDATE OF customer, product, features, hwid" in triggers["licenses_fts_au"]
@@ -0,0 +1,97 @@
+from license_manager.utils.keyring import Keyring
+from license_manager.utils.service import LicenseService
+from license_manager.utils.signing import SigningAuthority
+import asyncio
+import json
+
+def run_service(db_path, scenario, signer=None):
+    """Run `scenario(service)` against a started service and return its result."""
+    async def main():
+        service = LicenseService(db_path, Keyring.from_keys((signer or SigningAuthority()).get_signing_key()), readers=2)
+        await service.start(path=db_path + ".sock")
+        try:
+            return await scenario(service)
+        finally:
+            await service.close()
+    return asyncio.run(main())
+
+def request(service, method, target, body=None):
+    return service.dispatch(method, target, json.dumps(body).encode("utf-8") if body is not None else b"")
+
+def test_concurrent_signs_share_transactions(db_path):
+    async def scenario(service):
+        return await asyncio.gather(*(request(service, "POST", "/sign", {"customer": "ACME", "hwid": f"hw{i}"}) for i in range(50)))
+
+    responses = run_service(db_path, scenario)
+    assert {status for status, _ in responses} == {200}
+    assert sorted(payload["id"] for _, payload in responses) == list(range(1, 51))
+    assert [payload["hwid"] for _, payload in responses] == [f"hw{i}" for i in range(50)]
+
+def test_verify_lookup_and_list(db_path, signer):
+    async def scenario(service):
+        _, signed = await request(service, "POST", "/sign", {"customer": "ACME", "hwid": "hw0", "features": "a,b"})
+        submitted = {name: value for name, value in signed.items() if name != "id"}
+        return {
+            "signed": signed,
+            "by_id": await request(service, "POST", "/verify", {"id": signed["id"]}),
+            "submitted": await request(service, "POST", "/verify", submitted),
+            "tampered": await request(service, "POST", "/verify", {**submitted, "features": "a,b,c"}),
+            "missing": await request(service, "POST", "/verify", {"id": 99}),
+            "lookup": await request(service, "GET", "/lookup?hwid=hw0"),
+            "list": await request(service, "GET", "/licenses?limit=1"),
+            "next": await request(service, "GET", f"/licenses?after={signed['id']}"),
+            "features": await request(service, "GET", "/features"),
+            "with_feature": await request(service, "GET", "/licenses?feature=b"),
+        }
+
+    results = run_service(db_path, scenario, signer)
+    signed = results["signed"]
+    assert signed["key_id"] == signer.get_key_id() and signed["signature"]
+    assert results["by_id"] == (200, {"id": signed["id"], "status": "ok"})
+    assert results["submitted"] == (200, {"id": None, "status": "ok"})
+    assert results["tampered"][1]["status"] == "tampered"
+    assert results["missing"][0] == 404
+    assert results["lookup"] == (200, {"licenses": [signed]})
+    assert results["list"][1]["next"] == signed["id"]
+    assert results["next"] == (200, {"licenses": [], "next": None})
+    assert results["features"] == (200, {"features": {"a": 1, "b": 1}})
+    assert [license_data["id"] for license_data in results["with_feature"][1]["licenses"]] == [signed["id"]]
+
+def test_http_errors_over_the_socket(db_path):
+    async def scenario(service):
+        reader, writer = await asyncio.open_unix_connection(db_path + ".sock")
+        answers = []
+        for method, target, body in (("GET", "/sign", b""), ("GET", "/nowhere", b""), ("POST", "/sign", b"{"),
+                                     ("POST", "/sign", b'{"customer": "ACME"}'), ("GET", "/licenses?limit=x", b"")):
+            writer.write(f"{method} {target} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while (line := await reader.readline()) != b"\r\n":
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length": length = int(value)
+            answers.append((status, "error" in json.loads(await reader.readexactly(length))))
+        writer.close()
+        return answers
+
+    # the connection is kept alive across all five requests
+    assert run_service(db_path, scenario) == [(405, True), (404, True), (400, True), (400, True), (400, True)]
+
+def test_bad_field_types_fail_only_their_own_request(db_path):
+    async def scenario(service):
+        bodies = [{"customer": "ACME", "hwid": f"hw{i}"} for i in range(5)] + [{"hwid": "bad", "features": ["a"]}]
+        return await asyncio.gather(*(request(service, "POST", "/sign", body) for body in bodies))
+
+    responses = run_service(db_path, scenario)
+    assert [status for status, _ in responses] == [200] * 5 + [400]
+    assert responses[-1][1] == {"error": "features must be a string"}
+
+def test_invalid_content_length_closes_the_connection(db_path):
+    async def scenario(service):
+        reader, writer = await asyncio.open_unix_connection(db_path + ".sock")
+        writer.write(b"POST /sign HTTP/1.1\r\nContent-Length: lots\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        return response
+
+    response = run_service(db_path, scenario)
+    assert response.startswith(b"HTTP/1.1 400 Bad Request\r\n") and b"Connection: close" in response
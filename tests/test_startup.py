@@ -0,0 +1,14 @@
+from tests.benchmarks import src_env
+from tests.benchmarks.startup import measure_startup
+import subprocess
+import sys
+
+def test_cli_starts_without_textual():
+    code = "import sys, license_manager.__main__; print(' '.join(sorted(sys.modules)))"
+    modules = subprocess.run([sys.executable, "-c", code], env=src_env(), capture_output=True, text=True, check=True).stdout.split()
+    assert "textual" not in modules
+    assert "nacl" not in modules
+
+def test_first_paint_defers_heavy_modules():
+    result = measure_startup()
+    assert result["deferred_loaded"] == []
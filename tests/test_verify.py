@@ -0,0 +1,57 @@
+from license_manager.utils.license_io import license_file_text
+from license_manager.utils.signing import SigningAuthority
+from license_manager.utils.verify import EXPIRED, FOREIGN, INVALID, MALFORMED, OK, TAMPERED, WRONG_HWID, LicenseVerifier
+from tests.conftest import make_license
+import os
+import pytest
+
+@pytest.fixture
+def license_tree(tmp_path, signer):
+    previous = SigningAuthority()
+    files = {
+        "ok": make_license(signer, hwid="ok", expires_at="2030-01-01"),
+        "nested/expired": make_license(signer, hwid="expired", expires_at="2020-01-01"),
+        "tampered": {**make_license(signer, hwid="tampered"), "features": "a,b,c"},
+        "foreign": make_license(previous, hwid="foreign"),
+        "malformed": {**make_license(signer, hwid="malformed"), "signature": "not base64!"},
+    }
+    for name, license_data in files.items():
+        path = tmp_path / "licenses" / f"{name}.lic"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(license_file_text(license_data))
+    (tmp_path / "licenses" / "invalid.lic").write_text("{not json")
+    (tmp_path / "licenses" / "notes.txt").write_text("skipped")
+    return tmp_path / "licenses", previous
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_scan_statuses(license_tree, signer, jobs):
+    folder, previous = license_tree
+    verifier = LicenseVerifier([signer.get_verification_key()], [previous.get_verification_key()])
+    report = verifier.scan([folder], today="2025-06-01", jobs=jobs, batch_size=2)
+    assert {os.path.basename(finding.path): finding.status for finding in report.findings} == {
+        "expired.lic": EXPIRED, "tampered.lic": TAMPERED, "foreign.lic": FOREIGN, "malformed.lic": MALFORMED, "invalid.lic": INVALID}
+    assert (report.checked, report.flagged, report.counts[OK]) == (6, 5, 1)
+
+def test_verify_one_file_checks_hwid(license_tree, signer):
+    folder, _ = license_tree
+    verifier = LicenseVerifier([signer.get_verification_key()])
+    assert verifier.verify_file(folder / "ok.lic", hwid="ok", today="2025-06-01").status == OK
+    assert verifier.verify_file(folder / "ok.lic", hwid="other", today="2025-06-01").status == WRONG_HWID
+    assert verifier.verify_file(folder / "ok.lic", today="2031-01-01").status == EXPIRED
+
+def test_cache_skips_unchanged_files(license_tree, signer, tmp_path):
+    folder, _ = license_tree
+    cache_file = str(tmp_path / "cache.json")
+    key = signer.get_verification_key()
+    assert LicenseVerifier([key], cache_file=cache_file).scan([folder]).cached == 0
+
+    # an edited file is verified again, a copy of a known file only hashed
+    (folder / "ok.lic").write_text(license_file_text({**make_license(signer, hwid="ok"), "customer": "edited"}))
+    (folder / "copy.lic").write_bytes((folder / "tampered.lic").read_bytes())
+    report = LicenseVerifier([key], cache_file=cache_file).scan([folder])
+    assert (report.checked, report.cached) == (7, 6)
+    # without the previous key its license counts as tampered too
+    assert report.counts[TAMPERED] == 4
+
+    # verdicts reached with other keys aren't reused
+    assert LicenseVerifier([SigningAuthority().get_verification_key()], cache_file=cache_file).scan([folder]).cached == 0